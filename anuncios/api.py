@@ -2,11 +2,13 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from core.condicional import etag_lista
 from .models import Anuncio
 from .serializers import AnuncioSerializer
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etag_lista("anuncios")
 def lista_anuncios_api(request):
     """
     Entrega la lista de anuncios en formato JSON para la App Móvil.
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-19 05:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def crear_tabla_si_falta(apps, schema_editor):
+    # La app no tenía migraciones: en las bases existentes la tabla ya está
+    Anuncio = apps.get_model('anuncios', 'Anuncio')
+    if Anuncio._meta.db_table not in schema_editor.connection.introspection.table_names():
+        schema_editor.create_model(Anuncio)
+
+
+def borrar_tabla(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model('anuncios', 'Anuncio'))
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.CreateModel(
+                name='Anuncio',
+                fields=[
+                    ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                    ('titulo', models.CharField(max_length=200, verbose_name='Título del Anuncio')),
+                    ('contenido', models.TextField(verbose_name='Contenido del Mensaje')),
+                    ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                    ('autor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='anuncios_creados', to=settings.AUTH_USER_MODEL)),
+                ],
+                options={
+                    'verbose_name': 'Anuncio',
+                    'verbose_name_plural': 'Anuncios',
+                    'ordering': ['-fecha_creacion'],
+                },
+            ),
+        ]),
+        migrations.RunPython(crear_tabla_si_falta, borrar_tabla),
+    ]
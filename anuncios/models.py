@@ -11,6 +11,8 @@ class Anuncio(models.Model):
         related_name="anuncios_creados"
     )
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Sincronización incremental de la app (core.sincronizacion)
+    actualizado_el = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.titulo
@@ -1,11 +1,15 @@
 # proyecto-tesis/core/api.py
 
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 # Importamos el modelo Perfil para acceder y actualizar el token
 from core.models import Perfil 
 from django.db import IntegrityError # Importamos para un manejo de errores más robusto
+from core import sincronizacion
 
 class RegistrarFCMTokenView(APIView):
     """
@@ -40,4 +44,18 @@ class RegistrarFCMTokenView(APIView):
             return Response({"error": "Perfil de usuario no encontrado."}, status=400)
         except IntegrityError:
             # Si hay un problema de base de datos (ej. token demasiado largo, aunque max_length=255 debería cubrirlo)
-            return Response({"error": "Error al guardar el token debido a un problema de integridad de datos."}, status=500)
\ No newline at end of file
+            return Response({"error": "Error al guardar el token debido a un problema de integridad de datos."}, status=500)
+
+@api_view(["GET"])
+@authentication_classes([TokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def api_sincronizar(request):
+    """
+    Sincronización incremental de la app: ?entidades=anuncios,foro y un
+    cursor por entidad (?foro=<cursor>). Por entidad devuelve 'cambios',
+    'eliminados', el 'cursor' siguiente, 'hay_mas' y 'reiniciar'.
+    """
+    try:
+        return Response(sincronizacion.sincronizar(request))
+    except sincronizacion.CursorInvalido as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,47 @@
+# core/cache_redis.py
+"""
+Backend de cache Redis que sobrevive a una caída de Redis.
+
+La cache "default" guarda solo datos recalculables: contadores del inicio,
+versiones de las ETag, panel BI y PDF. Si Redis no responde, este backend
+registra el error y se comporta como una cache vacía (get -> default,
+add -> False, set/delete sin efecto): las páginas se calculan desde la base
+en vez de responder 500. Lo que sí necesita Redis (lock del ETL) usa la
+cache "etl" con el RedisCache normal.
+"""
+import logging
+from functools import wraps
+
+from django.core.cache.backends.redis import RedisCache
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+def _tolerante(metodo, al_fallar):
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        try:
+            return metodo(self, *args, **kwargs)
+        except RedisError as e:
+            logger.warning("Cache Redis no disponible (%s): %s", metodo.__name__, e)
+            return al_fallar(*args, **kwargs)
+    return envoltura
+
+
+class RedisCacheTolerante(RedisCache):
+    get = _tolerante(RedisCache.get, lambda key, default=None, version=None: default)
+    get_many = _tolerante(RedisCache.get_many, lambda keys, version=None: {})
+    has_key = _tolerante(RedisCache.has_key, lambda key, version=None: False)
+    add = _tolerante(RedisCache.add, lambda *args, **kwargs: False)
+    set = _tolerante(RedisCache.set, lambda *args, **kwargs: None)
+    set_many = _tolerante(RedisCache.set_many, lambda data, *args, **kwargs: list(data))
+    touch = _tolerante(RedisCache.touch, lambda *args, **kwargs: False)
+    delete = _tolerante(RedisCache.delete, lambda *args, **kwargs: False)
+    delete_many = _tolerante(RedisCache.delete_many, lambda *args, **kwargs: None)
+    # Sin Redis no hay valor que incrementar: mismo aviso que una clave inexistente
+    incr = _tolerante(RedisCache.incr, lambda key, *args, **kwargs: _no_existe(key))
+
+
+def _no_existe(key):
+    raise ValueError(f"Key '{key}' not found.")
@@ -0,0 +1,98 @@
+# core/condicional.py
+"""
+GET condicional (ETag / If-None-Match) para las listas que la app consulta
+cada pocos segundos.
+
+Cada recurso ("anuncios", "foro", "votaciones", ...) tiene un contador de
+versión en la cache compartida. Las señales de sus modelos lo suben al
+confirmar cualquier alta, baja o cambio (ver core.signals). La ETag de una
+lista sale de esas versiones, del usuario si la respuesta depende de él y
+de la query string. Si coincide con If-None-Match se responde 304 antes de
+consultar la base o serializar.
+
+Un contador que desaparece de la cache (reinicio de Redis) vuelve con otro
+valor, así que a lo más se pierde un 304, nunca se entrega una lista vieja.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import etag
+
+PREFIJO = "core:version"
+
+
+# =========================
+# Versiones
+# =========================
+def _clave(recurso):
+    return f"{PREFIJO}:{recurso}"
+
+
+def version(recurso):
+    clave = _clave(recurso)
+    valor = cache.get(clave)
+    if valor is None:
+        # Nunca repetir un valor que ya circuló: parte desde el reloj
+        cache.add(clave, time.time_ns(), timeout=None)
+        valor = cache.get(clave)
+    if valor is None:
+        # Cache caída: una versión nueva en cada petición, nunca un 304 viejo
+        valor = f"sin-cache-{time.time_ns()}"
+    return valor
+
+
+def subir_version(*recursos):
+    """Invalida las ETag de los recursos cuando la transacción confirma."""
+    def subir():
+        for recurso in recursos:
+            try:
+                cache.incr(_clave(recurso))
+            except ValueError:
+                cache.set(_clave(recurso), time.time_ns(), timeout=None)
+    transaction.on_commit(subir)
+
+
+def invalidador(*recursos):
+    """Receptor de señales que sube la versión de 'recursos'."""
+    def receptor(**kwargs):
+        subir_version(*recursos)
+    return receptor
+
+
+# =========================
+# Decorador
+# =========================
+def etag_lista(*recursos, por_usuario=False, validador=None):
+    """
+    Decorador para vistas GET de listas (funciones DRF bajo @api_view o,
+    con method_decorator, el 'list' de un ViewSet).
+
+    - recursos: contadores de los que depende la respuesta.
+    - por_usuario: la respuesta incluye datos del usuario (likes, "ya voté").
+    - validador(request): algo barato que cambia sin escrituras, por ejemplo
+      las votaciones que vencen con la hora.
+    """
+    def calcular(request, *args, **kwargs):
+        partes = [f"{r}:{version(r)}" for r in recursos]
+        if por_usuario:
+            partes.append(f"u:{request.user.pk or 0}")
+        if validador:
+            partes.append(str(validador(request)))
+        partes.append(request.META.get("QUERY_STRING", ""))
+        return hashlib.md5("|".join(partes).encode()).hexdigest()
+
+    def decorador(vista):
+        condicional = etag(calcular)(vista)
+
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            respuesta = condicional(request, *args, **kwargs)
+            # Que el teléfono guarde la copia pero pregunte siempre con If-None-Match
+            patch_cache_control(respuesta, private=True, no_cache=True)
+            return respuesta
+        return envoltura
+    return decorador
@@ -0,0 +1,80 @@
+# core/contadores.py
+"""
+Contadores de las tarjetas del inicio (core.views.home).
+
+Se calculan todos juntos y se guardan en una sola clave de cache con un TTL
+corto: varios dependen de la hora (publicaciones de las últimas 24 h,
+votaciones no cerradas, talleres no terminados), así que no se pueden
+mantener solo con incrementos. Para que un cambio se vea al tiro, las
+señales de los modelos involucrados borran la clave al confirmar la
+transacción (ver core.signals).
+"""
+import calendar
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from foro.models import Publicacion
+from recursos.models import SolicitudReserva
+from reuniones.models import Reunion
+from talleres.models import Taller
+from votaciones.models import Votacion
+
+CLAVE = "core:contadores_inicio"
+TTL = getattr(settings, "CONTADORES_INICIO_TTL", 60)
+
+ESTADOS_TALLER_EXCLUIDOS = ['CANCELADO', 'FINALIZADO', 'REALIZADO', 'SUSPENDIDO']
+
+
+def talleres_con_cupos(hoy=None):
+    """Talleres vigentes con cupos libres, del que termina primero al último."""
+    hoy = hoy or timezone.now()
+    return Taller.objects.annotate(
+        inscritos_count=Count('inscripcion')
+    ).annotate(
+        cupos_remanentes=F('cupos_totales') - F('inscritos_count')
+    ).filter(
+        fecha_termino__gte=hoy,
+        cupos_remanentes__gt=0
+    ).exclude(
+        estado__in=ESTADOS_TALLER_EXCLUIDOS
+    ).order_by('fecha_termino')
+
+
+def calcular():
+    hoy = timezone.now()
+    num_dias_mes = calendar.monthrange(hoy.year, hoy.month)[1]
+    fin_mes = hoy.replace(day=num_dias_mes, hour=23, minute=59, second=59)
+
+    return {
+        'total_vecinos_registrados': User.objects.count(),
+        'reuniones_pendientes_mes': Reunion.objects.filter(
+            fecha__gte=hoy, fecha__lte=fin_mes, estado='PROGRAMADA'
+        ).count(),
+        'nuevas_publicaciones_24h': Publicacion.objects.filter(
+            fecha_creacion__gte=hoy - timedelta(days=1)
+        ).count(),
+        'votaciones_activas': Votacion.objects.filter(activa=True, fecha_cierre__gt=hoy).count(),
+        # COUNT(*) sobre la subconsulta agrupada, sin traer los talleres
+        'talleres_con_cupos': talleres_con_cupos(hoy).count(),
+        'solicitudes_pendientes': SolicitudReserva.objects.filter(estado="PENDIENTE").count(),
+    }
+
+
+def obtener():
+    """Los contadores del inicio: una lectura de cache, o se recalculan si expiraron."""
+    valores = cache.get(CLAVE)
+    if valores is None:
+        valores = calcular()
+        cache.set(CLAVE, valores, timeout=TTL)
+    return valores
+
+
+def invalidar(**kwargs):
+    """Receptor de señales: borra los contadores cuando la transacción confirma."""
+    transaction.on_commit(lambda: cache.delete(CLAVE))
@@ -0,0 +1,218 @@
+# core/media.py
+"""
+Servir archivos de MEDIA desde Django con soporte de reproducción y caché.
+
+Reemplaza a django.views.static.serve para /media/:
+- HTTP Range (206 / 416): los audios de las actas y los videos del foro se
+  pueden adelantar sin bajar el archivo completo.
+- GET condicional con ETag y Last-Modified (304).
+- Modo MEDIA_SENDFILE = "x-accel" (nginx) o "x-sendfile" (apache/caddy): Django
+  solo revisa permisos y el proxy entrega los bytes (y resuelve los Range),
+  así un worker de gunicorn no queda tomado durante la descarga.
+
+Los permisos siguen en Django: PERMISOS_POR_CARPETA indica qué carpetas de
+MEDIA son privadas y quién puede verlas.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from core.authz import can
+
+MODO_SENDFILE = getattr(settings, "MEDIA_SENDFILE", "")
+# Prefijo interno (location "internal" en nginx) que apunta a MEDIA_ROOT
+PREFIJO_ACCEL = getattr(settings, "MEDIA_ACCEL_PREFIJO", "/media-interno/")
+TAMANO_BLOQUE = 64 * 1024
+
+# carpeta (prefijo de la ruta relativa) -> (recurso, acción) de core.roles
+PERMISOS_POR_CARPETA = {
+    "audios_reuniones/": ("actas", "edit"),
+}
+
+# Tipos que mimetypes no conoce en todas las plataformas
+mimetypes.add_type("audio/webm", ".webm")
+mimetypes.add_type("audio/ogg", ".ogg")
+mimetypes.add_type("audio/mp4", ".m4a")
+mimetypes.add_type("image/webp", ".webp")
+
+_RANGO = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+# =========================
+# Permisos
+# =========================
+def permiso_requerido(ruta):
+    for carpeta, permiso in PERMISOS_POR_CARPETA.items():
+        if ruta.startswith(carpeta):
+            return permiso
+    return None
+
+
+def _usuario(request):
+    """Usuario de la sesión o, para la app móvil, del header 'Authorization: Token ...'."""
+    if request.user.is_authenticated:
+        return request.user
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.exceptions import AuthenticationFailed
+    try:
+        resultado = TokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        resultado = None
+    return resultado[0] if resultado else request.user
+
+
+def puede_ver(user, ruta):
+    permiso = permiso_requerido(ruta)
+    return permiso is None or can(user, *permiso)
+
+
+# =========================
+# Cabeceras
+# =========================
+def etiqueta(estado):
+    return f'"{estado.st_mtime_ns:x}-{estado.st_size:x}"'
+
+
+def leer_rango(cabecera, tamano):
+    """
+    'bytes=a-b' -> (inicio, fin) inclusivo, o None si no aplica (sin cabecera,
+    varios rangos o sintaxis desconocida: se responde el archivo completo).
+    Lanza ValueError si el rango no se puede satisfacer (416).
+    """
+    if not cabecera:
+        return None
+    m = _RANGO.match(cabecera.strip())
+    if not m:
+        return None
+    inicio, fin = m.groups()
+    if inicio == "" and fin == "":
+        return None
+    if inicio == "":
+        # 'bytes=-N': los últimos N bytes
+        largo = int(fin)
+        if largo == 0:
+            raise ValueError("rango vacío")
+        return max(0, tamano - largo), tamano - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio >= tamano or inicio > fin:
+        raise ValueError("rango fuera del archivo")
+    return inicio, fin
+
+
+def _if_range_vigente(request, etag, modificado):
+    """Sin If-Range, o si coincide con la versión actual, el Range vale."""
+    valor = request.headers.get("If-Range")
+    if not valor:
+        return True
+    if valor.startswith('"') or valor.startswith("W/"):
+        return valor == etag
+    return parse_http_date_safe(valor) == modificado
+
+
+def _leer_bloques(ruta, inicio, largo):
+    with open(ruta, "rb") as f:
+        f.seek(inicio)
+        while largo > 0:
+            bloque = f.read(min(TAMANO_BLOQUE, largo))
+            if not bloque:
+                break
+            largo -= len(bloque)
+            yield bloque
+
+
+# =========================
+# Vista
+# =========================
+def servir_archivo(request, ruta_absoluta, ruta_relativa):
+    """Respuesta para un archivo ya autorizado (Range, ETag, sendfile)."""
+    try:
+        estado = os.stat(ruta_absoluta)
+    except OSError:
+        raise Http404("Archivo no encontrado.")
+    if not Path(ruta_absoluta).is_file():
+        raise Http404("Archivo no encontrado.")
+
+    etag = etiqueta(estado)
+    modificado = int(estado.st_mtime)
+    tipo, codificacion = mimetypes.guess_type(ruta_absoluta)
+    tipo = tipo or "application/octet-stream"
+
+    no_modificado = get_conditional_response(request, etag=etag, last_modified=modificado)
+    if no_modificado is not None:
+        return _cabeceras_cache(no_modificado, etag, modificado, ruta_relativa)
+
+    if MODO_SENDFILE:
+        respuesta = HttpResponse(content_type=tipo)
+        if MODO_SENDFILE == "x-accel":
+            respuesta["X-Accel-Redirect"] = PREFIJO_ACCEL + ruta_relativa
+        else:
+            respuesta["X-Sendfile"] = str(ruta_absoluta)
+    else:
+        rango = None
+        if _if_range_vigente(request, etag, modificado):
+            try:
+                rango = leer_rango(request.headers.get("Range"), estado.st_size)
+            except ValueError:
+                respuesta = HttpResponse(status=416)
+                respuesta["Content-Range"] = f"bytes */{estado.st_size}"
+                return respuesta
+
+        if rango is None:
+            respuesta = FileResponse(open(ruta_absoluta, "rb"), content_type=tipo)
+        else:
+            inicio, fin = rango
+            largo = fin - inicio + 1
+            respuesta = StreamingHttpResponse(
+                _leer_bloques(ruta_absoluta, inicio, largo), status=206, content_type=tipo
+            )
+            respuesta["Content-Length"] = str(largo)
+            respuesta["Content-Range"] = f"bytes {inicio}-{fin}/{estado.st_size}"
+        respuesta["Accept-Ranges"] = "bytes"
+
+    if codificacion:
+        respuesta["Content-Encoding"] = codificacion
+    return _cabeceras_cache(respuesta, etag, modificado, ruta_relativa)
+
+
+def _cabeceras_cache(respuesta, etag, modificado, ruta_relativa):
+    respuesta["ETag"] = etag
+    respuesta["Last-Modified"] = http_date(modificado)
+    # Lo privado no debe quedar en cachés compartidas
+    respuesta["Cache-Control"] = "private, no-cache" if permiso_requerido(ruta_relativa) else "public, max-age=3600"
+    return respuesta
+
+
+@require_safe
+def servir_media(request, path, document_root=None):
+    """/media/<path>: revisa permisos de la carpeta y entrega el archivo."""
+    raiz = document_root or settings.MEDIA_ROOT
+    # Normalizada antes de revisar permisos: 'archivos/../audios_reuniones/x' es audios_reuniones/x
+    ruta_relativa = posixpath.normpath(path.replace("\\", "/")).lstrip("/")
+    if ruta_relativa.startswith("..") or ruta_relativa == ".":
+        raise Http404("Archivo no encontrado.")
+    try:
+        ruta_absoluta = safe_join(str(raiz), ruta_relativa)
+    except SuspiciousFileOperation:
+        raise Http404("Archivo no encontrado.")
+
+    user = _usuario(request)
+    if not puede_ver(user, ruta_relativa):
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return HttpResponseForbidden("No tienes permiso para ver este archivo.")
+
+    return servir_archivo(request, ruta_absoluta, ruta_relativa)
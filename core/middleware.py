@@ -1,7 +1,12 @@
 # core/middleware.py
+import time
+
+from django.db import connection
 from django.shortcuts import redirect
 from django.urls import reverse
 
+from .rendimiento import Muestra, buffer
+
 class ForcePasswordChangeMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -24,4 +29,59 @@ class ForcePasswordChangeMiddleware:
                         return redirect('cambiar_password_obligatorio')
 
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
+
+class MonitorRendimientoMiddleware:
+    """
+    Mide cada petición (latencia, consultas SQL y su tiempo, tamaño de la respuesta)
+    y la deja en el buffer de core.rendimiento, que la vuelca al datamart.
+    """
+    EXCLUIR = ("/static/", "/media/", "/favicon.ico")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path.startswith(self.EXCLUIR):
+            return self.get_response(request)
+
+        db = {"n": 0, "ms": 0.0}
+
+        def medir_sql(execute, sql, params, many, context):
+            t0 = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db["n"] += 1
+                db["ms"] += (time.perf_counter() - t0) * 1000
+
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(medir_sql):
+            response = self.get_response(request)
+        ms = (time.perf_counter() - inicio) * 1000
+
+        buffer.registrar(Muestra(
+            ruta=self._ruta(request),
+            metodo=request.method,
+            status=response.status_code,
+            ms=ms,
+            n_queries=db["n"],
+            ms_db=db["ms"],
+            bytes=self._tamano(response),
+        ))
+        return response
+
+    @staticmethod
+    def _ruta(request):
+        # Patrón de la URL ('reuniones/<int:pk>/'), no la ruta concreta:
+        # así el número de grupos no crece con cada ID.
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "<sin ruta>"
+        return "/" + match.route if match.route else (match.view_name or "<sin ruta>")
+
+    @staticmethod
+    def _tamano(response):
+        if response.streaming:
+            return int(response.get("Content-Length") or 0)
+        return len(response.content)
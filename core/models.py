@@ -98,3 +98,22 @@ class Perfil(models.Model):
 
     class Meta:
         constraints = [models.CheckConstraint(name="rut_not_empty", check=~Q(rut=""))]
+
+
+class Eliminacion(models.Model):
+    """
+    Lápida de un registro borrado, para que la sincronización incremental
+    pueda avisar la baja a la app (core.sincronizacion).
+    """
+    entidad = models.CharField(max_length=20)
+    objeto_id = models.PositiveBigIntegerField()
+    eliminado_el = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Bajas de una entidad posteriores al cursor del teléfono
+            models.Index(fields=["entidad", "eliminado_el", "id"], name="core_elim_sync_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.entidad} {self.objeto_id}"
@@ -0,0 +1,180 @@
+# core/rendimiento.py
+"""
+Buffer en memoria de métricas por petición y volcado periódico al datamart.
+
+Cada proceso (worker de gunicorn) guarda sus muestras en un deque acotado;
+cada RENDIMIENTO_INTERVALO_FLUSH segundos un hilo aparte las agrega por ruta
+(p50/p95/p99, errores, consultas SQL, bytes) y escribe una fila por ruta en
+datamart.FactRendimientoRuta. Las peticiones nunca esperan esa escritura.
+"""
+import atexit
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+TAMANO_BUFFER = getattr(settings, "RENDIMIENTO_TAMANO_BUFFER", 20000)
+INTERVALO_FLUSH = getattr(settings, "RENDIMIENTO_INTERVALO_FLUSH", 60)
+
+Muestra = namedtuple("Muestra", "ruta metodo status ms n_queries ms_db bytes")
+
+
+# =========================
+# Helpers
+# =========================
+def percentil(ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not ordenados:
+        return 0.0
+    k = max(0, math.ceil(p / 100 * len(ordenados)) - 1)
+    return float(ordenados[k])
+
+
+def _instancia():
+    return f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+
+def agregar_muestras(muestras):
+    """Agrupa por (ruta, método) y devuelve un dict con los agregados de cada grupo."""
+    grupos = defaultdict(list)
+    for m in muestras:
+        grupos[(m.ruta, m.metodo)].append(m)
+
+    resultado = {}
+    for clave, filas in grupos.items():
+        tiempos = sorted(f.ms for f in filas)
+        n = len(filas)
+        resultado[clave] = {
+            "total_peticiones": n,
+            "errores_4xx": sum(1 for f in filas if 400 <= f.status < 500),
+            "errores_5xx": sum(1 for f in filas if f.status >= 500),
+            "suma_ms": sum(tiempos),
+            "p50_ms": percentil(tiempos, 50),
+            "p95_ms": percentil(tiempos, 95),
+            "p99_ms": percentil(tiempos, 99),
+            "max_ms": tiempos[-1],
+            "promedio_queries": sum(f.n_queries for f in filas) / n,
+            "promedio_ms_db": sum(f.ms_db for f in filas) / n,
+            "promedio_bytes": int(sum(f.bytes for f in filas) / n),
+        }
+    return resultado
+
+
+# =========================
+# Buffer
+# =========================
+class BufferRendimiento:
+    """Ring buffer por proceso. 'registrar' es O(1) y solo toma un lock corto."""
+
+    def __init__(self, tamano=TAMANO_BUFFER, intervalo=INTERVALO_FLUSH):
+        self._muestras = deque(maxlen=tamano)
+        self._lock = threading.Lock()
+        self._intervalo = intervalo
+        self._ultimo_flush = time.monotonic()
+        self._inicio_ventana = timezone.now()
+        self._volcando = False
+
+    def registrar(self, muestra):
+        with self._lock:
+            self._muestras.append(muestra)
+            toca_volcar = (
+                not self._volcando
+                and time.monotonic() - self._ultimo_flush >= self._intervalo
+            )
+            if toca_volcar:
+                self._volcando = True
+        if toca_volcar:
+            threading.Thread(target=self.volcar, name="flush-rendimiento", daemon=True).start()
+
+    def _drenar(self):
+        with self._lock:
+            muestras = list(self._muestras)
+            self._muestras.clear()
+            inicio, fin = self._inicio_ventana, timezone.now()
+            self._inicio_ventana = fin
+            self._ultimo_flush = time.monotonic()
+        return muestras, inicio, fin
+
+    def volcar(self):
+        """Agrega lo acumulado y lo escribe en el datamart (se ejecuta fuera de la petición)."""
+        try:
+            muestras, inicio, fin = self._drenar()
+            if not muestras:
+                return
+            from datamart.models import FactRendimientoRuta
+
+            instancia = _instancia()
+            FactRendimientoRuta.objects.bulk_create([
+                FactRendimientoRuta(
+                    ventana_inicio=inicio,
+                    ventana_fin=fin,
+                    ruta=ruta[:255],
+                    metodo=metodo,
+                    instancia=instancia,
+                    **agregados,
+                )
+                for (ruta, metodo), agregados in agregar_muestras(muestras).items()
+            ])
+        except Exception as e:
+            logger.warning("No se pudieron volcar métricas de rendimiento: %s", e)
+        finally:
+            self._volcando = False
+            # Este hilo abrió su propia conexión: no dejarla colgando
+            connections.close_all()
+
+
+buffer = BufferRendimiento()
+atexit.register(buffer.volcar)
+
+
+# =========================
+# Lectura (ETL)
+# =========================
+def resumen_periodo(desde, hasta=None):
+    """
+    Agregados globales de FactRendimientoRuta entre 'desde' y 'hasta'
+    (tiempo medio ponderado, p95 aproximado, disponibilidad y errores).
+    Devuelve None si no hay datos en el período.
+    """
+    from django.db.models import F, Sum
+
+    from datamart.models import FactRendimientoRuta
+
+    hasta = hasta or timezone.now()
+    qs = FactRendimientoRuta.objects.filter(ventana_fin__gt=desde, ventana_fin__lte=hasta)
+    totales = qs.aggregate(
+        peticiones=Sum("total_peticiones"),
+        suma_ms=Sum("suma_ms"),
+        errores_5xx=Sum("errores_5xx"),
+        # Los percentiles de distintas ventanas no se pueden mezclar exactamente;
+        # se aproxima con el promedio ponderado por número de peticiones.
+        p95_ponderado=Sum(F("p95_ms") * F("total_peticiones")),
+    )
+    peticiones = totales["peticiones"] or 0
+    if not peticiones:
+        return None
+
+    fallos_votacion = (
+        qs.filter(ruta__contains="votacion").aggregate(n=Sum("errores_5xx"))["n"] or 0
+    )
+    return {
+        "peticiones": peticiones,
+        "tiempo_medio_ms": totales["suma_ms"] / peticiones,
+        "p95_ms": totales["p95_ponderado"] / peticiones,
+        "disponibilidad": 100.0 * (1 - (totales["errores_5xx"] or 0) / peticiones),
+        "fallos_votacion": fallos_votacion,
+    }
+
+
+def ultimas_24_horas():
+    return resumen_periodo(timezone.now() - timedelta(hours=24))
@@ -86,5 +86,9 @@ ROLE_MATRIX: Dict[str, Dict[str, List[str]]] = {
         "create": ROL_DIRECTIVA,
         "edit":   ROL_DIRECTIVA,
         "delete": ROL_DIRECTIVA,
+    },
+    "datamart": {
+        "export": ROL_DIRECTIVA,  # Tablas Dim/Fact completas (datos personales)
+        "compromiso": ROL_DIRECTIVA,  # Ranking de compromiso por vecino
     }
 }
\ No newline at end of file
@@ -27,4 +27,89 @@ def asegurar_email_unico(sender, instance, **kwargs):
         
         # Buscar si existe otro usuario (excluyendo al actual si es una edición)
         if User.objects.filter(email=instance.email).exclude(pk=instance.pk).exists():
-            raise ValidationError(f"El correo {instance.email} ya está asociado a otra cuenta.")
\ No newline at end of file
+            raise ValidationError(f"El correo {instance.email} ya está asociado a otra cuenta.")
+
+# --- Contadores del inicio (core.contadores) ---
+# Cualquier alta, baja o cambio en estos modelos puede mover una tarjeta del inicio
+from django.db.models.signals import post_save
+from core import contadores
+from foro.models import Publicacion
+from recursos.models import SolicitudReserva
+from reuniones.models import Reunion
+from talleres.models import Inscripcion, Taller
+from votaciones.models import Votacion
+
+for _modelo in (Reunion, Publicacion, Votacion, Taller, Inscripcion, SolicitudReserva):
+    post_save.connect(contadores.invalidar, sender=_modelo, dispatch_uid=f"contadores_save_{_modelo.__name__}")
+    post_delete.connect(contadores.invalidar, sender=_modelo, dispatch_uid=f"contadores_delete_{_modelo.__name__}")
+
+
+@receiver(post_save, sender=User, dispatch_uid="contadores_usuario_nuevo")
+def invalidar_contadores_usuario(sender, instance, created, **kwargs):
+    # Solo las altas: cada login guarda last_login y no cambia el total
+    if created:
+        contadores.invalidar()
+
+
+post_delete.connect(contadores.invalidar, sender=User, dispatch_uid="contadores_delete_User")
+
+
+# --- ETag de las listas de la app (core.condicional) ---
+# Modelo -> recurso cuya versión sube con cada alta, baja o cambio
+from anuncios.models import Anuncio
+from core import condicional
+from foro.models import ArchivoAdjunto, Comentario
+from reuniones.models import Acta, Asistencia
+from votaciones.models import Opcion, Voto
+
+RECURSOS_POR_MODELO = {
+    Anuncio: "anuncios",
+    Publicacion: "foro",
+    Comentario: "foro",
+    ArchivoAdjunto: "foro",
+    Votacion: "votaciones",
+    Opcion: "votaciones",
+    Voto: "votaciones",
+    Taller: "talleres",
+    Inscripcion: "talleres",
+    Reunion: "reuniones",
+    Acta: "reuniones",
+    Asistencia: "reuniones",
+}
+for _modelo, _recurso in RECURSOS_POR_MODELO.items():
+    _receptor = condicional.invalidador(_recurso)
+    # weak=False: el receptor es una clausura sin otra referencia
+    post_save.connect(_receptor, sender=_modelo, weak=False, dispatch_uid=f"version_save_{_modelo.__name__}")
+    post_delete.connect(_receptor, sender=_modelo, weak=False, dispatch_uid=f"version_delete_{_modelo.__name__}")
+
+
+# --- Sincronización incremental de la app (core.sincronizacion) ---
+from core import sincronizacion
+from recursos.models import Recurso
+
+for _modelo in sincronizacion.ENTIDAD_POR_MODELO:
+    post_delete.connect(
+        sincronizacion.registrar_eliminacion, sender=_modelo, dispatch_uid=f"sync_eliminacion_{_modelo.__name__}"
+    )
+
+# Hijo -> (modelo sincronizado, lookup hacia el hijo, atributo del hijo): lo que
+# cambia en el hijo se ve en la fila del padre, así que se marca actualizado_el
+PADRES_SINCRONIZADOS = {
+    Acta: (Reunion, "pk", "reunion_id"),
+    Asistencia: (Reunion, "pk", "reunion_id"),
+    Inscripcion: (Taller, "pk", "taller_id"),
+    Opcion: (Votacion, "pk", "votacion_id"),
+    Voto: (Votacion, "opciones", "opcion_id"),
+    SolicitudReserva: (Recurso, "pk", "recurso_id"),
+}
+
+
+def _tocar_padre(sender, instance, **kwargs):
+    modelo, lookup, atributo = PADRES_SINCRONIZADOS[sender]
+    # Agrupado por ventana: una votación concurrida no se escribe en cada voto
+    sincronizacion.tocar(modelo.objects.filter(**{lookup: getattr(instance, atributo)}))
+
+
+for _modelo in PADRES_SINCRONIZADOS:
+    post_save.connect(_tocar_padre, sender=_modelo, dispatch_uid=f"sync_padre_save_{_modelo.__name__}")
+    post_delete.connect(_tocar_padre, sender=_modelo, dispatch_uid=f"sync_padre_delete_{_modelo.__name__}")
@@ -0,0 +1,220 @@
+# core/sincronizacion.py
+"""
+Sincronización incremental ("cambios desde") para la app móvil.
+
+En vez de bajar al abrirse las listas completas de anuncios, reuniones,
+talleres, votaciones, recursos y publicaciones del foro, la app guarda un
+cursor por entidad y pide solo lo que cambió desde entonces:
+
+- cambios: filas con 'actualizado_el' posterior al cursor, en el mismo
+  formato que las listas de la API;
+- eliminados: ids borrados (lápidas core.Eliminacion) o que cambiaron y ya
+  no se muestran (publicación oculta, taller que dejó de estar programado,
+  votación desactivada).
+
+Las dos partes se recorren por keyset (fecha, id) sobre índices. Lo escrito
+en los últimos MARGEN_SEGUNDOS queda para la llamada siguiente, así no se
+pierde una transacción que confirma tarde con una fecha anterior.
+"""
+import base64
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from anuncios.models import Anuncio
+from anuncios.serializers import AnuncioSerializer
+from foro.models import Publicacion
+from foro.paginacion import serializar_publicaciones_completas
+from recursos.models import Recurso
+from recursos.serializers import RecursoSerializer
+from reuniones.models import Reunion
+from reuniones.serializers import ReunionSerializer
+from talleres.models import Taller
+from talleres.serializers import TallerSerializer
+from votaciones.api import _dto_votacion
+from votaciones.models import Votacion
+
+from .models import Eliminacion
+
+LIMITE_SINCRONIZACION = 200
+MARGEN_SEGUNDOS = 5
+# Un padre (votación, taller, publicación...) se marca a lo más una vez por
+# ventana aunque sus hijos cambien muchas veces (ver tocar)
+VENTANA_TOQUE_SEGUNDOS = 10
+# Lápidas más antiguas se borran (core.tasks.purgar_eliminaciones); un cursor
+# más viejo que esto obliga a la app a bajar la entidad completa
+RETENCION_ELIMINACIONES_DIAS = getattr(settings, "SYNC_RETENCION_ELIMINACIONES_DIAS", 90)
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+# =========================
+# Entidades
+# =========================
+def _serializador(clase):
+    return lambda request, qs: clase(qs, many=True, context={"request": request}).data
+
+
+# nombre -> (modelo, filtro de lo que la app muestra, serializar(request, qs))
+ENTIDADES = {
+    "anuncios": (Anuncio, Q(), _serializador(AnuncioSerializer)),
+    "reuniones": (
+        Reunion, Q(),
+        lambda request, qs: ReunionSerializer(
+            qs.select_related("acta", "creada_por"), many=True, context={"request": request}
+        ).data,
+    ),
+    "talleres": (
+        Taller, Q(estado=Taller.Estado.PROGRAMADO),
+        lambda request, qs: TallerSerializer(
+            qs.annotate(inscritos_count=Count("inscripcion")), many=True, context={"request": request}
+        ).data,
+    ),
+    "votaciones": (
+        Votacion, Q(activa=True),
+        lambda request, qs: [_dto_votacion(v, request.user) for v in qs.prefetch_related("opciones")],
+    ),
+    "recursos": (Recurso, Q(), _serializador(RecursoSerializer)),
+    "foro": (Publicacion, Q(visible=True), serializar_publicaciones_completas),
+}
+ENTIDAD_POR_MODELO = {modelo: nombre for nombre, (modelo, _, _) in ENTIDADES.items()}
+
+
+# =========================
+# Cursores (cambios|eliminados)
+# =========================
+def _posicion_a_texto(posicion):
+    return f"{posicion[0].isoformat()},{posicion[1]}" if posicion else ""
+
+
+def _texto_a_posicion(texto):
+    if not texto:
+        return None
+    fecha, pk = texto.split(",")
+    return datetime.fromisoformat(fecha), int(pk)
+
+
+def codificar_cursor(cambios, eliminados):
+    texto = f"{_posicion_a_texto(cambios)}|{_posicion_a_texto(eliminados)}"
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    """Cursor opaco -> (posición de cambios, posición de eliminados); cada una (fecha, id) o None."""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        cambios, eliminados = base64.urlsafe_b64decode(cursor + relleno).decode().split("|")
+        return _texto_a_posicion(cambios), _texto_a_posicion(eliminados)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise CursorInvalido("Cursor inválido.") from e
+
+
+def _despues_de(campo_fecha, posicion):
+    fecha, pk = posicion
+    return Q(**{f"{campo_fecha}__gt": fecha}) | Q(**{campo_fecha: fecha, "id__gt": pk})
+
+
+# =========================
+# Sincronización
+# =========================
+def sincronizar_entidad(request, nombre, cursor=None, limite=LIMITE_SINCRONIZACION):
+    """
+    Cambios de una entidad desde 'cursor' (None: primera sincronización).
+    Devuelve {"cambios", "eliminados", "cursor", "hay_mas", "reiniciar"}.
+    """
+    modelo, visible, serializar = ENTIDADES[nombre]
+    ahora = timezone.now()
+    hasta = ahora - timedelta(seconds=MARGEN_SEGUNDOS)
+
+    pos_cambios = pos_eliminados = None
+    reiniciar = False
+    if cursor:
+        pos_cambios, pos_eliminados = decodificar_cursor(cursor)
+        if pos_eliminados and pos_eliminados[0] < ahora - timedelta(days=RETENCION_ELIMINACIONES_DIAS):
+            # Las lápidas de entonces ya no existen: se vuelve a bajar todo
+            pos_cambios = pos_eliminados = None
+            reiniciar = True
+    primera = not cursor or reiniciar
+
+    filas = modelo.objects.filter(actualizado_el__lte=hasta)
+    if pos_cambios:
+        filas = filas.filter(_despues_de("actualizado_el", pos_cambios))
+    claves = list(filas.order_by("actualizado_el", "id").values_list("actualizado_el", "id")[:limite + 1])
+    hay_mas = len(claves) > limite
+    claves = claves[:limite]
+    if claves:
+        pos_cambios = claves[-1]
+
+    ids = [pk for _, pk in claves]
+    mostrados = modelo.objects.filter(visible, pk__in=ids)
+    ids_mostrados = set(mostrados.values_list("pk", flat=True))
+    # Primera vez la app no tiene nada guardado: lo que no se muestra no es una baja
+    eliminados = [] if primera else [pk for pk in ids if pk not in ids_mostrados]
+
+    if primera:
+        # Las lápidas anteriores no interesan: la app recién baja la lista completa
+        pos_eliminados = (hasta, 0)
+    else:
+        lapidas = Eliminacion.objects.filter(entidad=nombre, eliminado_el__lte=hasta)
+        if pos_eliminados:
+            lapidas = lapidas.filter(_despues_de("eliminado_el", pos_eliminados))
+        lapidas = list(lapidas.order_by("eliminado_el", "id").values_list("eliminado_el", "id", "objeto_id")[:limite + 1])
+        mas_lapidas = len(lapidas) > limite
+        lapidas = lapidas[:limite]
+        if lapidas:
+            pos_eliminados = lapidas[-1][:2]
+        if not mas_lapidas:
+            # Ya no quedan lápidas hasta 'hasta': el cursor avanza igual, así no
+            # envejece en una entidad sin bajas ni fuerza un reinicio
+            pos_eliminados = max(pos_eliminados or (hasta, 0), (hasta, 0))
+        hay_mas = hay_mas or mas_lapidas
+        eliminados.extend(objeto_id for _, _, objeto_id in lapidas)
+
+    return {
+        "cambios": serializar(request, mostrados.order_by("actualizado_el", "id")) if ids_mostrados else [],
+        "eliminados": sorted(set(eliminados)),
+        "cursor": codificar_cursor(pos_cambios, pos_eliminados),
+        "hay_mas": hay_mas,
+        "reiniciar": reiniciar,
+    }
+
+
+def sincronizar(request):
+    """
+    Todas las entidades pedidas. Parámetros: ?entidades=anuncios,foro (todas
+    si no viene) y un cursor por entidad con su nombre (?foro=<cursor>).
+    """
+    pedidas = request.query_params.get("entidades")
+    nombres = [n for n in pedidas.split(",") if n in ENTIDADES] if pedidas else list(ENTIDADES)
+    return {
+        nombre: sincronizar_entidad(request, nombre, request.query_params.get(nombre) or None)
+        for nombre in nombres
+    }
+
+
+def tocar(queryset):
+    """
+    Marca como cambiadas las filas de 'queryset' sin escribir la misma fila
+    en cada voto, inscripción o comentario: la fecha queda al final de la
+    ventana y el UPDATE solo toca filas cuya fecha ya pasó. Lo que cambie
+    dentro de la ventana sale igual en la siguiente sincronización.
+    """
+    ahora = timezone.now()
+    return queryset.filter(actualizado_el__lte=ahora).update(
+        actualizado_el=ahora + timedelta(seconds=VENTANA_TOQUE_SEGUNDOS)
+    )
+
+
+def registrar_eliminacion(sender, instance, **kwargs):
+    """Receptor post_delete: deja la lápida de un registro sincronizado."""
+    Eliminacion.objects.create(entidad=ENTIDAD_POR_MODELO[sender], objeto_id=instance.pk)
+
+
+def purgar_eliminaciones():
+    limite = timezone.now() - timedelta(days=RETENCION_ELIMINACIONES_DIAS)
+    borradas, _ = Eliminacion.objects.filter(eliminado_el__lt=limite).delete()
+    return borradas
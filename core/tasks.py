@@ -0,0 +1,10 @@
+# core/tasks.py
+from celery import shared_task
+
+from .sincronizacion import purgar_eliminaciones
+
+
+@shared_task(ignore_result=True)
+def purgar_eliminaciones_antiguas():
+    """Borra las lápidas de la sincronización más viejas que la retención."""
+    return purgar_eliminaciones()
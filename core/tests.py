@@ -1,3 +1,145 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from anuncios.models import Anuncio
+from foro.models import Comentario, Publicacion
+from reuniones.models import EstadoReunion, Reunion
+from talleres.models import Taller
+
+from . import sincronizacion
+from .media import leer_rango
+
+CACHE_LOCAL = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "etl": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "etl"},
+}
+
+
+class LeerRangoTests(SimpleTestCase):
+    def test_sin_rango_aplicable(self):
+        for cabecera in (None, "", "bytes=-", "bytes=0-1,5-9", "items=0-9"):
+            self.assertIsNone(leer_rango(cabecera, 100), cabecera)
+
+    def test_rangos(self):
+        self.assertEqual(leer_rango("bytes=0-9", 100), (0, 9))
+        self.assertEqual(leer_rango("bytes=90-", 100), (90, 99))
+        self.assertEqual(leer_rango("bytes=-10", 100), (90, 99))
+        # Más allá del final se recorta; un sufijo mayor que el archivo lo entrega completo
+        self.assertEqual(leer_rango("bytes=50-500", 100), (50, 99))
+        self.assertEqual(leer_rango("bytes=-500", 100), (0, 99))
+
+    def test_rango_imposible(self):
+        for cabecera in ("bytes=100-", "bytes=20-10", "bytes=-0"):
+            with self.assertRaises(ValueError, msg=cabecera):
+                leer_rango(cabecera, 100)
+
+
+class CursorSincronizacionTests(SimpleTestCase):
+    def test_ida_y_vuelta(self):
+        ahora = timezone.now()
+        for cambios, eliminados in (((ahora, 7), (ahora, 0)), (None, (ahora, 3)), (None, None)):
+            cursor = sincronizacion.codificar_cursor(cambios, eliminados)
+            self.assertEqual(sincronizacion.decodificar_cursor(cursor), (cambios, eliminados))
+
+    def test_cursor_invalido(self):
+        for cursor in ("%%%", "bm9wZQ", "YXxi"):
+            with self.assertRaises(sincronizacion.CursorInvalido, msg=cursor):
+                sincronizacion.decodificar_cursor(cursor)
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class EtagListaTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user("etag", "etag@example.com", "x")
+        token = Token.objects.create(user=self.usuario)
+        self.client.defaults.update(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.url = reverse("api_lista_anuncios")
+
+    def test_304_hasta_que_cambia(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        etag = respuesta["ETag"]
+        self.assertIn("no-cache", respuesta["Cache-Control"])
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Anuncio.objects.create(titulo="Corte de agua", contenido="-", autor=self.usuario)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+@mock.patch.object(sincronizacion, "MARGEN_SEGUNDOS", 0)
+@mock.patch.object(sincronizacion, "VENTANA_TOQUE_SEGUNDOS", 0)
+class SincronizacionTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user("sync", "sync@example.com", "x")
+        token = Token.objects.create(user=self.usuario)
+        self.client.defaults.update(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.url = reverse("api_sincronizar")
+
+    def sincronizar(self, **cursores):
+        respuesta = self.client.get(self.url, {"entidades": "anuncios,foro", **cursores})
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.json()
+
+    def test_primera_e_incremental(self):
+        anuncio = Anuncio.objects.create(titulo="a", contenido="-", autor=self.usuario)
+        borrado = Anuncio.objects.create(titulo="b", contenido="-", autor=self.usuario)
+        publicacion = Publicacion.objects.create(autor=self.usuario, contenido="visible")
+        Publicacion.objects.create(autor=self.usuario, contenido="oculta", visible=False)
+
+        datos = self.sincronizar()
+        self.assertEqual([a["id"] for a in datos["anuncios"]["cambios"]], [anuncio.pk, borrado.pk])
+        self.assertEqual([p["id"] for p in datos["foro"]["cambios"]], [publicacion.pk])
+        self.assertEqual(datos["foro"]["eliminados"], [])
+        cursores = {nombre: datos[nombre]["cursor"] for nombre in datos}
+
+        datos = self.sincronizar(**cursores)
+        self.assertEqual((datos["anuncios"]["cambios"], datos["foro"]["eliminados"]), ([], []))
+        cursores = {nombre: datos[nombre]["cursor"] for nombre in datos}
+
+        borrado_id = borrado.pk
+        borrado.delete()
+        Comentario.objects.create(publicacion=publicacion, autor=self.usuario, contenido="hola")
+        datos = self.sincronizar(**cursores)
+        self.assertEqual(datos["anuncios"]["eliminados"], [borrado_id])
+        self.assertEqual([len(p["comentarios"]) for p in datos["foro"]["cambios"]], [1])
+
+    def test_cambio_de_estado_llega_al_delta(self):
+        reunion = Reunion.objects.create(
+            titulo="Asamblea", tabla="-", fecha=timezone.now(), estado=EstadoReunion.EN_CURSO,
+        )
+        taller = Taller.objects.create(
+            nombre="Huerto", descripcion="-", cupos_totales=10,
+            fecha_inicio=timezone.now() - timedelta(hours=3), fecha_termino=timezone.now() - timedelta(hours=1),
+        )
+        datos = self.client.get(self.url, {"entidades": "reuniones,talleres"}).json()
+        self.assertEqual([t["id"] for t in datos["talleres"]["cambios"]], [taller.pk])
+        cursores = {nombre: datos[nombre]["cursor"] for nombre in datos}
+
+        # Vistas que guardan con update_fields: finalizar la reunión y el
+        # taller vencido (lo cierra la lista de talleres)
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "x"))
+        self.client.post(reverse("reuniones:finalizar_reunion", args=[reunion.pk]))
+        self.client.get(reverse("talleres:lista_talleres"))
+
+        datos = self.client.get(self.url, {"entidades": "reuniones,talleres", **cursores}).json()
+        self.assertEqual([r["estado"] for r in datos["reuniones"]["cambios"]], [EstadoReunion.REALIZADA])
+        self.assertEqual(datos["talleres"]["eliminados"], [taller.pk])
+
+    def test_cursor_de_eliminados_avanza_sin_bajas(self):
+        viejo = sincronizacion.codificar_cursor(None, (timezone.now() - timedelta(days=80), 0))
+        datos = self.sincronizar(anuncios=viejo)
+        self.assertFalse(datos["anuncios"]["reiniciar"])
+        _, eliminados = sincronizacion.decodificar_cursor(datos["anuncios"]["cursor"])
+        self.assertLess(timezone.now() - eliminados[0], timedelta(minutes=1))
+
+    def test_cursor_invalido(self):
+        self.assertEqual(self.client.get(self.url, {"anuncios": "%%%"}).status_code, 400)
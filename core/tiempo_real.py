@@ -0,0 +1,30 @@
+# core/tiempo_real.py
+"""
+Envío de eventos a grupos de Channels desde código síncrono (vistas, señales, tareas).
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def emitir_a_grupo(grupo: str, tipo: str, payload: dict) -> None:
+    """
+    Hace group_send de {"type": tipo, "payload": payload}.
+    Un fallo de Redis nunca debe tumbar la petición que originó el evento.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(grupo, {"type": tipo, "payload": payload})
+    except Exception as e:
+        logger.warning("No se pudo emitir '%s' al grupo %s: %s", tipo, grupo, e)
+
+
+def emitir_al_confirmar(grupo: str, tipo: str, payload: dict) -> None:
+    """Igual que emitir_a_grupo, pero solo cuando la transacción actual se confirma."""
+    transaction.on_commit(lambda: emitir_a_grupo(grupo, tipo, payload))
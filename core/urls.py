@@ -1,7 +1,7 @@
 from django.urls import path
 from .views import home,sin_permiso
 from django.contrib.auth.views import LoginView
-from .api import RegistrarFCMTokenView
+from .api import RegistrarFCMTokenView, api_sincronizar
 from . import api_fcm
 from . import views
 from .views import RequestRecoveryCodeAPI, ResetPasswordWithCodeAPI
@@ -10,6 +10,7 @@ urlpatterns = [
     path("", LoginView.as_view(), name="login"),
     path("sin-permiso/", sin_permiso, name="sin_permiso"),
     path("api/v1/registrar-fcm-token/", RegistrarFCMTokenView.as_view(), name="api_registrar_fcm_token"),
+    path("api/v1/sync/", api_sincronizar, name="api_sincronizar"),
     path("fcm/register/", api_fcm.registrar_fcm_token, name="registrar-fcm-token"),
     path('api/auth/request-code/', RequestRecoveryCodeAPI.as_view()),
     path('api/auth/reset-password-code/', ResetPasswordWithCodeAPI.as_view()),
@@ -2,16 +2,13 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.utils import timezone
-from django.db.models import Count, F
 from datetime import timedelta
-import calendar
 
 # --- IMPORTACIONES DE TUS MODELOS ---
 from reuniones.models import Reunion
 from foro.models import Publicacion
 from votaciones.models import Votacion
-from talleres.models import Taller, Inscripcion
-from recursos.models import SolicitudReserva
+from core import contadores
 
 # --- IMPORTACIONES PARA LA API DE RECUPERACIÓN (DRF) ---
 from rest_framework.views import APIView
@@ -139,43 +136,8 @@ def home(request):
     hoy = timezone.now()
     
     # --- 1. Tarjetas Superiores (Resumen) ---
-    total_vecinos_registrados = User.objects.count()
-
-    # Reuniones mes
-    num_dias_mes = calendar.monthrange(hoy.year, hoy.month)[1]
-    fin_mes = hoy.replace(day=num_dias_mes, hour=23, minute=59, second=59)
-    
-    reuniones_pendientes_mes = Reunion.objects.filter(
-        fecha__gte=hoy,      # Desde hoy
-        fecha__lte=fin_mes,  # Hasta fin de mes
-        estado='PROGRAMADA'
-    ).count()
-
-    # Publicaciones 24h
-    hace_24h = hoy - timedelta(days=1)
-    nuevas_publicaciones_24h = Publicacion.objects.filter(fecha_creacion__gte=hace_24h).count()
-
-    # Votaciones activas
-    votaciones_activas = Votacion.objects.filter(activa=True, fecha_cierre__gt=hoy).count()
-
-    # --- LÓGICA TALLERES (Cupos Disponibles) ---
-    ESTADOS_A_EXCLUIR = ['CANCELADO', 'FINALIZADO', 'REALIZADO', 'SUSPENDIDO']
-
-    talleres_con_cupos_query = Taller.objects.annotate(
-        inscritos_count=Count('inscripcion')
-    ).annotate(
-        cupos_remanentes=F('cupos_totales') - F('inscritos_count')
-    ).filter(
-        fecha_termino__gte=hoy,
-        cupos_remanentes__gt=0
-    ).exclude(
-        estado__in=ESTADOS_A_EXCLUIR
-    ).order_by('fecha_termino')
-
-    talleres_con_cupos_list_completa = list(talleres_con_cupos_query)
-    
-    # Solicitudes pendientes
-    solicitudes_pendientes = SolicitudReserva.objects.filter(estado="PENDIENTE").count()
+    # Una lectura de cache (core.contadores: TTL corto + invalidación por señales)
+    context = dict(contadores.obtener())
 
     # --- 2. Secciones de Actividad ---
     ultimas_publicaciones_foro = Publicacion.objects.order_by('-fecha_creacion')[:3]
@@ -187,20 +149,13 @@ def home(request):
     
     votaciones_activas_list = Votacion.objects.filter(activa=True, fecha_cierre__gt=hoy).order_by('fecha_cierre')[:3]
 
-    context = {
+    context.update({
         'nombre_usuario': request.user.first_name if request.user.first_name else request.user.username,
-        
-        'total_vecinos_registrados': total_vecinos_registrados,
-        'reuniones_pendientes_mes': reuniones_pendientes_mes,
-        'nuevas_publicaciones_24h': nuevas_publicaciones_24h,
-        'votaciones_activas': votaciones_activas,
-        'talleres_con_cupos': len(talleres_con_cupos_list_completa),
-        'solicitudes_pendientes': solicitudes_pendientes,
 
         'ultimas_publicaciones_foro': ultimas_publicaciones_foro,
         'proximas_reuniones': proximas_reuniones,
         'votaciones_activas_list': votaciones_activas_list,
-        'talleres_con_cupos_list': talleres_con_cupos_list_completa[:3],
-    }
+        'talleres_con_cupos_list': contadores.talleres_con_cupos(hoy)[:3],
+    })
     
     return render(request, "core/home.html", context)
\ No newline at end of file
@@ -0,0 +1,74 @@
+# core/vosk_modelo.py
+"""
+Modelo Vosk compartido dentro de cada proceso.
+
+Cargar el modelo tarda varios segundos y ocupa cientos de MB de RAM. Por eso
+se carga una sola vez por proceso (worker de Celery o servidor ASGI) y lo
+reutilizan la transcripción de actas, el dictado en vivo de las reuniones y
+las notas de voz del foro. Cada uso crea su propio KaldiRecognizer, que es
+liviano.
+"""
+import json
+import logging
+import os
+import threading
+import wave
+
+import ffmpeg
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FRECUENCIA = 16000
+FRAMES_POR_LECTURA = 4000
+
+_modelo = None
+_candado = threading.Lock()
+
+
+def modelo():
+    global _modelo
+    if _modelo is None:
+        with _candado:
+            if _modelo is None:
+                from vosk import Model
+                ruta = str(settings.MODEL_PATH)
+                if not os.path.exists(ruta):
+                    raise FileNotFoundError(f"Modelo VOSK no encontrado en {ruta}")
+                logger.info("Cargando modelo Vosk: %s", ruta)
+                _modelo = Model(ruta)
+    return _modelo
+
+
+def reconocedor(frecuencia=FRECUENCIA):
+    from vosk import KaldiRecognizer
+    rec = KaldiRecognizer(modelo(), frecuencia)
+    rec.SetWords(True)
+    return rec
+
+
+def a_wav(origen, destino, duracion_maxima=None):
+    """Convierte cualquier audio a WAV PCM mono 16 kHz; opcionalmente solo los primeros N segundos."""
+    opciones = {"format": "wav", "acodec": "pcm_s16le", "ac": 1, "ar": str(FRECUENCIA)}
+    if duracion_maxima:
+        opciones["t"] = duracion_maxima
+    (
+        ffmpeg
+        .input(origen)
+        .output(destino, **opciones)
+        .run(capture_stdout=True, capture_stderr=True, overwrite_output=True)
+    )
+
+
+def transcribir_wav(ruta):
+    with wave.open(ruta, "rb") as wf:
+        rec = reconocedor(wf.getframerate())
+        partes = []
+        while True:
+            datos = wf.readframes(FRAMES_POR_LECTURA)
+            if not datos:
+                break
+            if rec.AcceptWaveform(datos):
+                partes.append(json.loads(rec.Result()).get("text", ""))
+        partes.append(json.loads(rec.FinalResult()).get("text", ""))
+    return " ".join(p for p in partes if p)
@@ -0,0 +1,39 @@
+# core/ws_auth.py
+"""
+Autenticación de WebSockets con el Token de DRF (app móvil).
+
+El navegador ya llega autenticado por la sesión (AuthMiddlewareStack); la app
+no tiene cookie, así que manda su token en '?token=<key>' o en la cabecera
+'Authorization: Token <key>'. Si viene un token, manda sobre la sesión.
+"""
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+
+
+@database_sync_to_async
+def _usuario_por_token(key):
+    from rest_framework.authtoken.models import Token
+    token = Token.objects.select_related("user").filter(key=key).first()
+    if token is None or not token.user.is_active:
+        return AnonymousUser()
+    return token.user
+
+
+def _leer_token(scope):
+    cabeceras = dict(scope.get("headers") or [])
+    autorizacion = cabeceras.get(b"authorization", b"").decode("latin-1").split()
+    if len(autorizacion) == 2 and autorizacion[0].lower() == "token":
+        return autorizacion[1]
+    valores = parse_qs(scope.get("query_string", b"").decode()).get("token")
+    return valores[0] if valores else None
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    async def __call__(self, scope, receive, send):
+        key = _leer_token(scope)
+        if key:
+            scope = dict(scope, user=await _usuario_por_token(key))
+        return await super().__call__(scope, receive, send)
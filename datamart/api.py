@@ -0,0 +1,59 @@
+# datamart/api.py
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.authz import can
+from datamart.exportacion import (
+    FORMATOS, ErrorExportacion, columnas, exportar, filtra_por_fecha,
+    leer_clave_fecha, nombre_archivo, obtener_modelo, tablas_exportables,
+)
+
+TIPOS_CONTENIDO = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@api_view(["GET"])
+@authentication_classes([TokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def api_exportar_tablas(request):
+    """Catálogo de tablas exportables con sus columnas."""
+    if not can(request.user, "datamart", "export"):
+        return Response({"detail": "No autorizado."}, status=status.HTTP_403_FORBIDDEN)
+    return Response({
+        "formatos": FORMATOS,
+        "tablas": [
+            {"nombre": nombre, "columnas": columnas(modelo), "filtra_por_fecha": filtra_por_fecha(modelo)}
+            for nombre, modelo in tablas_exportables().items()
+        ],
+    })
+
+
+@api_view(["GET"])
+@authentication_classes([TokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def api_exportar_tabla(request, tabla):
+    """
+    Descarga una tabla completa en streaming: ?formato=csv|parquet y, para
+    cargas incrementales, ?desde=AAAAMMDD&hasta=AAAAMMDD sobre fecha_key.
+    """
+    if not can(request.user, "datamart", "export"):
+        return Response({"detail": "No autorizado."}, status=status.HTTP_403_FORBIDDEN)
+
+    formato = request.query_params.get("formato", "csv")
+    try:
+        modelo = obtener_modelo(tabla)
+        desde = leer_clave_fecha(request.query_params.get("desde"))
+        hasta = leer_clave_fecha(request.query_params.get("hasta"))
+        trozos = exportar(modelo, formato, desde, hasta)
+    except ErrorExportacion as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = StreamingHttpResponse(trozos, content_type=TIPOS_CONTENIDO[formato])
+    response["Content-Disposition"] = f'attachment; filename="{nombre_archivo(modelo, formato, desde, hasta)}"'
+    return response
@@ -0,0 +1,46 @@
+# datamart/cache_panel.py
+"""
+Cache del panel BI y del informe PDF.
+
+Los datos solo cambian cuando termina un ETL, así que las claves incluyen un
+número de generación que el ETL incrementa al confirmar. Las entradas viejas
+no se borran: quedan huérfanas y expiran solas.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+CLAVE_GENERACION = "datamart:generacion"
+TIMEOUT = getattr(settings, "PANEL_BI_CACHE_SEGUNDOS", 60 * 60 * 24)
+
+
+def generacion_actual():
+    generacion = cache.get(CLAVE_GENERACION)
+    if generacion is None:
+        # add() no pisa el valor si otro proceso lo creó primero
+        cache.add(CLAVE_GENERACION, 1, timeout=None)
+        generacion = cache.get(CLAVE_GENERACION, 1)
+    return generacion
+
+
+def nueva_generacion():
+    """La llama el ETL al confirmar su transacción: invalida panel y PDF de una vez."""
+    try:
+        return cache.incr(CLAVE_GENERACION)
+    except ValueError:
+        # La clave no existía (cache reiniciada)
+        cache.set(CLAVE_GENERACION, 2, timeout=None)
+        return 2
+
+
+def clave(tipo, mes=None, anio=None):
+    return f"datamart:{tipo}:g{generacion_actual()}:{anio or 0}:{mes or 0}"
+
+
+def obtener_o_calcular(tipo, mes, anio, calcular):
+    """Lee (tipo, mes, anio) de la generación vigente; si no está, lo calcula y lo guarda."""
+    k = clave(tipo, mes, anio)
+    valor = cache.get(k)
+    if valor is None:
+        valor = calcular()
+        cache.set(k, valor, timeout=TIMEOUT)
+    return valor
@@ -0,0 +1,165 @@
+# datamart/compromiso.py
+"""
+Puntaje de compromiso por vecino (FactCompromisoVecino).
+
+Los hechos de asistencia, votos, inscripciones y consultas de actas se
+agregan en SQL: por fuente, una fila por vecino con el total, la última
+fecha y los conteos de las ventanas móviles de 3/6/12 meses (filtros sobre
+fecha_key). Así lo que pasa a Python crece con los vecinos y no con los
+hechos históricos. Con esos arreglos NumPy se calculan, sin bucles por
+vecino, la recencia, la frecuencia y el segmento.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .fechas import clave_fecha
+from .models import (
+    DimVecino, FactAsistenciaReunion, FactCompromisoVecino, FactConsultaActa,
+    FactInscripcionTaller, FactParticipacionVotacion,
+)
+
+# Orden de las columnas de conteo por tipo de participación
+FUENTES = (
+    ("asistencias", FactAsistenciaReunion),
+    ("votos", FactParticipacionVotacion),
+    ("inscripciones", FactInscripcionTaller),
+    ("consultas_actas", FactConsultaActa),
+)
+
+VENTANAS_DIAS = {"participaciones_3m": 91, "participaciones_6m": 182, "participaciones_12m": 365}
+
+# La recencia decae a la mitad cada VIDA_MEDIA_DIAS sin participar
+VIDA_MEDIA_DIAS = 45
+PESO_RECENCIA = 0.5
+UMBRAL_ACTIVO = 60
+
+
+def dias_desde_claves(claves):
+    """Arreglo de claves yyyymmdd -> días desde 1970-01-01 (vectorizado)."""
+    claves = np.asarray(claves, dtype=np.int64)
+    anio, resto = np.divmod(claves, 10000)
+    mes, dia = np.divmod(resto, 100)
+    meses = ((anio - 1970) * 12 + (mes - 1)).astype("timedelta64[M]")
+    fechas = (np.datetime64("1970-01", "M") + meses).astype("datetime64[D]") + (dia - 1).astype("timedelta64[D]")
+    return fechas.astype(np.int64)
+
+
+def _cargar_conteos(modelo, ids_ordenados, hoy):
+    """
+    Hechos de 'modelo' hasta 'hoy', agregados por vecino en SQL. Devuelve
+    (índice de vecino, matriz int64) con las columnas total, última
+    fecha_key y un conteo por ventana de VENTANAS_DIAS.
+    """
+    ventanas = {
+        nombre: Count("id", filter=Q(fecha_key__gt=clave_fecha(hoy - timedelta(days=largo))))
+        for nombre, largo in VENTANAS_DIAS.items()
+    }
+    filas = (
+        modelo.objects.filter(vecino__activo=True, fecha_key__lte=clave_fecha(hoy))
+        .order_by().values("vecino_id")
+        .annotate(total=Count("id"), ultimo=Max("fecha_key"), **ventanas)
+        .values_list("vecino_id", "total", "ultimo", *VENTANAS_DIAS)
+    )
+    datos = np.array(list(filas), dtype=np.int64).reshape(-1, 3 + len(VENTANAS_DIAS))
+    # vecino_id -> posición en el arreglo de vecinos (los ids vienen ordenados)
+    return np.searchsorted(ids_ordenados, datos[:, 0]), datos[:, 1:]
+
+
+def _percentil(valores):
+    """Fracción de vecinos con un valor menor o igual (0 para quien tiene 0)."""
+    if not len(valores):
+        return valores.astype(float)
+    orden = np.sort(valores)
+    rango = np.searchsorted(orden, valores, side="right") / len(valores)
+    return np.where(valores > 0, rango, 0.0)
+
+
+def calcular_compromiso(hoy=None):
+    """
+    Devuelve (ids_vecino, columnas) donde columnas es un dict nombre -> arreglo,
+    alineado con ids_vecino. Solo se cuentan hechos hasta 'hoy' inclusive.
+    """
+    hoy = hoy or timezone.localdate()
+    dia_hoy = dias_desde_claves([clave_fecha(hoy)])[0]
+
+    # Los vecinos desactivados conservan sus hechos pero no se puntúan
+    ids = np.fromiter(
+        DimVecino.objects.filter(activo=True).order_by("id").values_list("id", flat=True), dtype=np.int64
+    )
+    n = len(ids)
+
+    columnas = {nombre: np.zeros(n, dtype=np.int64) for nombre in VENTANAS_DIAS}
+    ultima_clave = np.zeros(n, dtype=np.int64)  # 0 = nunca
+    for nombre, modelo in FUENTES:
+        # Una fila por vecino: cada índice aparece una sola vez por fuente
+        idx, datos = _cargar_conteos(modelo, ids, hoy)
+        columnas[nombre] = np.zeros(n, dtype=np.int64)
+        columnas[nombre][idx] = datos[:, 0]
+        ultima_clave[idx] = np.maximum(ultima_clave[idx], datos[:, 1])
+        for j, ventana in enumerate(VENTANAS_DIAS, start=2):
+            columnas[ventana][idx] += datos[:, j]
+
+    # Última participación (-1 = nunca)
+    participo = ultima_clave > 0
+    ultimo = np.where(participo, dias_desde_claves(np.where(participo, ultima_clave, 19700101)), -1)
+    dias_sin = np.where(participo, dia_hoy - ultimo, -1)
+
+    recencia = np.where(participo, np.exp2(-np.maximum(dias_sin, 0) / VIDA_MEDIA_DIAS), 0.0)
+    frecuencia = _percentil(columnas["participaciones_12m"])
+    puntaje = np.round(100 * (PESO_RECENCIA * recencia + (1 - PESO_RECENCIA) * frecuencia), 1)
+
+    S = FactCompromisoVecino.Segmento
+    segmento = np.select(
+        [~participo, columnas["participaciones_12m"] == 0, columnas["participaciones_3m"] == 0, puntaje >= UMBRAL_ACTIVO],
+        [S.NUNCA.value, S.INACTIVO.value, S.EN_RIESGO.value, S.ACTIVO.value],
+        default=S.OCASIONAL.value,
+    )
+
+    columnas.update({
+        "ultimo_dia": ultimo,
+        "dias_sin_participar": dias_sin,
+        "puntaje_recencia": np.round(recencia, 4),
+        "puntaje_frecuencia": np.round(frecuencia, 4),
+        "puntaje": puntaje,
+        "segmento": segmento,
+    })
+    return ids, columnas
+
+
+def _clave_desde_dia(dia):
+    fecha = np.datetime64(int(dia), "D").astype(object)
+    return clave_fecha(fecha)
+
+
+def cargar_compromiso_vecinos(hoy=None):
+    """Etapa del ETL: reemplaza FactCompromisoVecino completa (una fila por vecino)."""
+    hoy = hoy or timezone.localdate()
+    ids, c = calcular_compromiso(hoy)
+    fecha_key = clave_fecha(hoy)
+
+    filas = [
+        FactCompromisoVecino(
+            vecino_id=int(ids[i]),
+            fecha_key=fecha_key,
+            asistencias=int(c["asistencias"][i]),
+            votos=int(c["votos"][i]),
+            inscripciones=int(c["inscripciones"][i]),
+            consultas_actas=int(c["consultas_actas"][i]),
+            ultima_participacion_key=_clave_desde_dia(c["ultimo_dia"][i]) if c["ultimo_dia"][i] >= 0 else None,
+            dias_sin_participar=int(c["dias_sin_participar"][i]) if c["ultimo_dia"][i] >= 0 else None,
+            participaciones_3m=int(c["participaciones_3m"][i]),
+            participaciones_6m=int(c["participaciones_6m"][i]),
+            participaciones_12m=int(c["participaciones_12m"][i]),
+            puntaje_recencia=float(c["puntaje_recencia"][i]),
+            puntaje_frecuencia=float(c["puntaje_frecuencia"][i]),
+            puntaje=float(c["puntaje"][i]),
+            segmento=str(c["segmento"][i]),
+        )
+        for i in range(len(ids))
+    ]
+    FactCompromisoVecino.objects.all().delete()
+    FactCompromisoVecino.objects.bulk_create(filas, batch_size=1000)
+    return len(filas)
@@ -0,0 +1,539 @@
+# datamart/etl.py
+"""
+ETL incremental del datamart.
+
+- Dimensiones: se proyectan las columnas necesarias del OLTP y se compara un
+  hash por fila con 'hash_origen'; solo se insertan/actualizan (en lote) las
+  filas nuevas o cambiadas y se eliminan las que ya no existen en el origen.
+- Hechos: solo se agregan filas con ID de origen mayor a la marca de agua
+  (EtlWatermark) de su tabla fuente. La marca no pasa de una fila que no se
+  pudo cargar (su dimensión aún no existía): se reintenta en la corrida
+  siguiente. Cada corrida vuelve a leer las últimas MARGEN_IDS filas bajo la
+  marca: el ID se asigna al insertar y no al confirmar, así que una
+  transacción lenta puede aparecer con un ID menor al ya cargado.
+- completo=True borra todo y recarga desde cero (equivale a marcas en 0).
+
+Cada etapa informa filas procesadas y tiempo.
+"""
+import hashlib
+import logging
+import random
+import re
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Exists, Max, Min, OuterRef
+from django.utils import timezone
+
+from core.rendimiento import ultimas_24_horas
+from reuniones.models import Acta, Asistencia, LogConsultaActa, Reunion
+from talleres.models import Inscripcion, Taller
+from votaciones.models import Votacion, Voto
+
+from .cache_panel import nueva_generacion
+from .compromiso import cargar_compromiso_vecinos
+from .fechas import asegurar_dim_fecha, clave_fecha
+from .models import (
+    DimActa, DimFecha, DimReunion, DimTaller, DimVecino, DimVotacion, EtlWatermark,
+    FactAsistenciaReunion, FactCalidadTranscripcion, FactConsultaActa,
+    FactInscripcionTaller, FactMetricasDiarias, FactParticipacionVotacion,
+    FactRendimientoRuta, RollupAsistenciaReunion, RollupConsultaActa,
+    RollupOcupacionTaller, RollupResumen, RollupSector,
+)
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 2000
+# Filas bajo la marca que se releen en cada corrida (las ya cargadas se
+# descartan por anti-join con el hecho)
+MARGEN_IDS = 1000
+
+
+# =========================
+# Helpers
+# =========================
+def _hash_fila(valores):
+    return hashlib.md5(repr(valores).encode("utf-8")).hexdigest()
+
+
+def _en_lotes(iterable, tamano=TAMANO_LOTE):
+    lote = []
+    for item in iterable:
+        lote.append(item)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def leer_marca(tabla):
+    return EtlWatermark.objects.filter(tabla=tabla).values_list("ultimo_id", flat=True).first() or 0
+
+
+def guardar_marca(tabla, ultimo_id):
+    EtlWatermark.objects.update_or_create(tabla=tabla, defaults={"ultimo_id": ultimo_id})
+
+
+def sincronizar_dimension(modelo, campo_oltp, filas, campos, solo_al_insertar=None):
+    """
+    Upsert por lotes de una dimensión.
+
+    'filas' es {id_oltp: {campo: valor}} con los atributos actuales del origen.
+    'solo_al_insertar' (opcional) devuelve atributos que se calculan una sola
+    vez, al crear la fila, y no forman parte del hash.
+    Devuelve el número de filas insertadas + actualizadas + eliminadas.
+    """
+    existentes = {
+        oltp: (pk, h)
+        for oltp, pk, h in modelo.objects.values_list(campo_oltp, "id", "hash_origen")
+    }
+
+    nuevas, cambiadas = [], []
+    for oltp_id, attrs in filas.items():
+        h = _hash_fila(tuple(attrs[c] for c in campos))
+        actual = existentes.get(oltp_id)
+        if actual is None:
+            extra = solo_al_insertar(attrs) if solo_al_insertar else {}
+            nuevas.append(modelo(**{campo_oltp: oltp_id}, hash_origen=h, **attrs, **extra))
+        elif actual[1] != h:
+            cambiadas.append(modelo(pk=actual[0], hash_origen=h, **attrs))
+
+    modelo.objects.bulk_create(nuevas, batch_size=500)
+    modelo.objects.bulk_update(cambiadas, campos + ["hash_origen"], batch_size=500)
+
+    # Lo que ya no está en el origen sale del datamart (arrastra sus hechos)
+    bajas = [oltp for oltp in existentes if oltp not in filas]
+    for lote in _en_lotes(bajas, 500):
+        modelo.objects.filter(**{f"{campo_oltp}__in": lote}).delete()
+
+    return len(nuevas) + len(cambiadas) + len(bajas)
+
+
+# =========================
+# Etapas: dimensiones
+# =========================
+def cargar_dim_fechas():
+    """Asegura DimFecha desde el dato más antiguo del OLTP hasta un año adelante."""
+    hoy = timezone.localdate()
+    minimos = [
+        Reunion.objects.aggregate(v=Min("fecha"))["v"],
+        LogConsultaActa.objects.aggregate(v=Min("fecha_consulta"))["v"],
+        Inscripcion.objects.aggregate(v=Min("fecha_inscripcion"))["v"],
+        Votacion.objects.aggregate(v=Min("fecha_cierre"))["v"],
+    ]
+    desde = min([timezone.localtime(v).date() for v in minimos if v] + [hoy])
+    ultima_reunion = Reunion.objects.aggregate(v=Max("fecha"))["v"]
+    hasta = max(hoy, timezone.localtime(ultima_reunion).date() if ultima_reunion else hoy) + timedelta(days=365)
+    return asegurar_dim_fecha(desde, hasta)
+
+
+def cargar_dim_vecinos():
+    # También los usuarios desactivados (activo=False): borrar su fila
+    # arrastraría sus hechos y al reactivarlos la marca de agua ya los pasó
+    filas = {}
+    usuarios = User.objects.values_list(
+        "id", "username", "perfil__direccion", "perfil__total_ninos", "perfil__fcm_token", "is_active"
+    )
+    for uid, username, direccion, total_ninos, fcm_token, activo in usuarios:
+        filas[uid] = {
+            "nombre_completo": username,
+            "rango_etario": "Adulto",
+            # Solo el nombre de la calle/pasaje, sin número
+            "direccion_sector": (direccion or "").strip() or "Sin Dirección",
+            "tiene_niños": (total_ninos or 0) > 0,
+            # Tiene token FCM = inició sesión en la app móvil
+            "usa_app_movil": bool(fcm_token),
+            "activo": activo,
+        }
+    return sincronizar_dimension(
+        DimVecino, "vecino_id_oltp", filas,
+        ["nombre_completo", "rango_etario", "direccion_sector", "tiene_niños", "usa_app_movil", "activo"],
+    )
+
+
+def cargar_dim_talleres():
+    filas = {
+        tid: {"nombre": nombre, "cupos_totales": cupos}
+        for tid, nombre, cupos in Taller.objects.values_list("id", "nombre", "cupos_totales")
+    }
+    return sincronizar_dimension(DimTaller, "taller_id_oltp", filas, ["nombre", "cupos_totales"])
+
+
+def cargar_dim_actas():
+    # El PK de Acta es el de su reunión
+    filas = {
+        rid: {"titulo": titulo, "fecha_reunion": timezone.localtime(fecha).date()}
+        for rid, titulo, fecha in Acta.objects.values_list("reunion_id", "reunion__titulo", "reunion__fecha")
+    }
+    # La precisión aún es simulada: se fija al crear la fila para que no cambie en cada corrida
+    return sincronizar_dimension(
+        DimActa, "acta_id_oltp", filas, ["titulo", "fecha_reunion"],
+        solo_al_insertar=lambda attrs: {"precision_transcripcion": round(random.uniform(88.0, 99.9), 1)},
+    )
+
+
+def cargar_dim_votaciones():
+    filas = {
+        vid: {"pregunta": pregunta, "fecha_inicio": fecha_cierre}
+        for vid, pregunta, fecha_cierre in Votacion.objects.values_list("id", "pregunta", "fecha_cierre")
+    }
+    return sincronizar_dimension(DimVotacion, "votacion_id_oltp", filas, ["pregunta", "fecha_inicio"])
+
+
+def cargar_dim_reuniones():
+    filas = {
+        # Fecha local (misma convención que clave_fecha / DimFecha)
+        rid: {"titulo": titulo, "fecha": timezone.localtime(fecha).date()}
+        for rid, titulo, fecha in Reunion.objects.values_list("id", "titulo", "fecha")
+    }
+    return sincronizar_dimension(DimReunion, "reunion_id_oltp", filas, ["titulo", "fecha"])
+
+
+# =========================
+# Etapas: hechos
+# =========================
+def _anexar_por_marca(tabla, origen, columnas, construir, cargado):
+    """
+    Carga incremental de un hecho append-only: recorre con .iterator() las
+    filas de 'origen' con ID mayor a la marca de agua menos MARGEN_IDS que aún
+    no tienen hecho ('cargado': el hecho filtrado por OuterRef("pk")), en
+    lotes de TAMANO_LOTE (memoria constante), y las inserta con bulk_create.
+    'construir(fila)' devuelve la instancia del hecho o None si todavía falta
+    su dimensión (p. ej. un acta creada durante la corrida). La marca queda
+    justo antes de la primera fila omitida.
+    """
+    marca = leer_marca(tabla)
+    filas = (
+        origen.filter(id__gt=marca - MARGEN_IDS)
+        .exclude(Exists(cargado))
+        .order_by("id")
+        .values_list("id", *columnas)
+        .iterator(chunk_size=TAMANO_LOTE)
+    )
+    cargadas, ultimo, omitida = 0, marca, None
+    for lote in _en_lotes(filas):
+        hechos = []
+        for fila in lote:
+            hecho = construir(fila)
+            if hecho is not None:
+                hechos.append(hecho)
+            elif omitida is None:
+                omitida = fila[0]
+        if hechos:
+            # ignore_conflicts: el ID de origen es único en el hecho (recargas idempotentes)
+            type(hechos[0]).objects.bulk_create(hechos, ignore_conflicts=True)
+        cargadas += len(hechos)
+        ultimo = max(ultimo, lote[-1][0])
+
+    if omitida is not None:
+        logger.info("ETL %s: fila %s sin dimensión, se reintenta en la próxima corrida", tabla, omitida)
+        ultimo = omitida - 1
+    guardar_marca(tabla, ultimo)
+    return cargadas
+
+
+def cargar_fact_consultas_actas():
+    """Agrega las consultas de actas registradas después de la marca de agua."""
+    vecinos = dict(DimVecino.objects.values_list("vecino_id_oltp", "id"))
+    actas = dict(DimActa.objects.values_list("acta_id_oltp", "id"))
+
+    def construir(fila):
+        log_id, vecino_id, acta_id, fecha = fila
+        if vecino_id not in vecinos or acta_id not in actas:
+            return None
+        return FactConsultaActa(
+            log_id_oltp=log_id,
+            vecino_id=vecinos[vecino_id],
+            acta_id=actas[acta_id],
+            fecha_consulta=fecha,
+            fecha_key=clave_fecha(fecha),
+        )
+
+    return _anexar_por_marca(
+        "reuniones.LogConsultaActa", LogConsultaActa.objects,
+        ["vecino_id", "acta_id", "fecha_consulta"], construir,
+        FactConsultaActa.objects.filter(log_id_oltp=OuterRef("pk")),
+    )
+
+
+def cargar_fact_inscripciones():
+    """Inscripciones nuevas (por marca de agua) y baja de las anuladas."""
+    # Anti-join: hechos cuya inscripción ya no existe (el vecino se desinscribió)
+    borradas, _ = FactInscripcionTaller.objects.exclude(
+        Exists(Inscripcion.objects.filter(pk=OuterRef("inscripcion_id_oltp")))
+    ).delete()
+
+    vecinos = dict(DimVecino.objects.values_list("vecino_id_oltp", "id"))
+    talleres = dict(DimTaller.objects.values_list("taller_id_oltp", "id"))
+
+    def construir(fila):
+        insc_id, vecino_id, taller_id, fecha = fila
+        if vecino_id not in vecinos or taller_id not in talleres:
+            return None
+        return FactInscripcionTaller(
+            inscripcion_id_oltp=insc_id,
+            vecino_id=vecinos[vecino_id],
+            taller_id=talleres[taller_id],
+            fecha_inscripcion=fecha,
+            fecha_key=clave_fecha(fecha),
+        )
+
+    return borradas + _anexar_por_marca(
+        "talleres.Inscripcion", Inscripcion.objects,
+        ["vecino_id", "taller_id", "fecha_inscripcion"], construir,
+        FactInscripcionTaller.objects.filter(inscripcion_id_oltp=OuterRef("pk")),
+    )
+
+
+def cargar_fact_votos():
+    """Votos nuevos (por marca de agua) y baja de los reemplazados."""
+    # Cambiar el voto borra el Voto anterior y crea otro: se quita su hecho
+    borrados, _ = FactParticipacionVotacion.objects.exclude(
+        Exists(Voto.objects.filter(pk=OuterRef("voto_id_oltp")))
+    ).delete()
+
+    vecinos = dict(DimVecino.objects.values_list("vecino_id_oltp", "id"))
+    votaciones = dict(DimVotacion.objects.values_list("votacion_id_oltp", "id"))
+
+    def construir(fila):
+        voto_id, vecino_id, votacion_id, fecha_voto, fecha_cierre = fila
+        if vecino_id not in vecinos or votacion_id not in votaciones:
+            return None
+        # Votos anteriores a Voto.fecha_voto: se usa el cierre de la votación
+        fecha = fecha_voto or fecha_cierre
+        return FactParticipacionVotacion(
+            voto_id_oltp=voto_id,
+            vecino_id=vecinos[vecino_id],
+            votacion_id=votaciones[votacion_id],
+            fecha_voto=fecha,
+            fecha_key=clave_fecha(fecha),
+        )
+
+    return borrados + _anexar_por_marca(
+        "votaciones.Voto", Voto.objects,
+        ["votante_id", "opcion__votacion_id", "fecha_voto", "opcion__votacion__fecha_cierre"],
+        construir, FactParticipacionVotacion.objects.filter(voto_id_oltp=OuterRef("pk")),
+    )
+
+
+def cargar_fact_asistencia():
+    """
+    La asistencia cambia (presente puede volver a False), así que no sirve
+    una marca de agua: se sincroniza con dos sentencias sobre conjuntos.
+    1. DELETE de hechos cuya asistencia ya no está presente.
+    2. INSERT ... SELECT de las presentes que aún no tienen hecho (anti-join),
+       tomando fecha_key de DimFecha por la fecha de la reunión.
+    """
+    borradas, _ = FactAsistenciaReunion.objects.exclude(
+        Exists(Asistencia.objects.filter(pk=OuterRef("asistencia_id_oltp"), presente=True))
+    ).delete()
+
+    q = connection.ops.quote_name
+    hecho = FactAsistenciaReunion._meta.db_table
+    sql = f"""
+        INSERT INTO {q(hecho)} ({q("asistencia_id_oltp")}, {q("vecino_id")}, {q("reunion_id")}, {q("fecha_key")})
+        SELECT a.{q("id")}, dv.{q("id")}, dr.{q("id")}, df.{q("fecha_key")}
+        FROM {q(Asistencia._meta.db_table)} a
+        JOIN {q(DimVecino._meta.db_table)} dv ON dv.{q("vecino_id_oltp")} = a.{q("vecino_id")}
+        JOIN {q(DimReunion._meta.db_table)} dr ON dr.{q("reunion_id_oltp")} = a.{q("reunion_id")}
+        LEFT JOIN {q(DimFecha._meta.db_table)} df ON df.{q("fecha")} = dr.{q("fecha")}
+        WHERE a.{q("presente")} = %s
+          AND NOT EXISTS (
+              SELECT 1 FROM {q(hecho)} f WHERE f.{q("asistencia_id_oltp")} = a.{q("id")}
+          )
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [True])
+        insertadas = cursor.rowcount
+    return borradas + insertadas
+
+
+def registrar_consulta_acta(log):
+    """
+    Agrega el hecho de una consulta recién registrada: dos lookups por índice
+    único y un INSERT de una fila. Si las dimensiones aún no existen (acta o
+    vecino nuevos), no hace nada: el próximo ETL la carga por marca de agua.
+    """
+    vecino_id = DimVecino.objects.filter(vecino_id_oltp=log.vecino_id).values_list("id", flat=True).first()
+    acta_id = DimActa.objects.filter(acta_id_oltp=log.acta_id).values_list("id", flat=True).first()
+    if vecino_id is None or acta_id is None:
+        return False
+    FactConsultaActa.objects.bulk_create(
+        [FactConsultaActa(
+            log_id_oltp=log.pk,
+            vecino_id=vecino_id,
+            acta_id=acta_id,
+            fecha_consulta=log.fecha_consulta,
+            fecha_key=clave_fecha(log.fecha_consulta),
+        )],
+        ignore_conflicts=True,
+    )
+    return True
+
+
+def cargar_metricas_diarias():
+    """Métricas técnicas del día a partir de lo medido por MonitorRendimientoMiddleware."""
+    filas = 0
+    rendimiento = ultimas_24_horas()
+    if rendimiento:
+        hoy = timezone.localdate()
+        FactMetricasDiarias.objects.update_or_create(
+            fecha=hoy,
+            defaults={
+                "fecha_key": clave_fecha(hoy),
+                "tiempo_respuesta_ms": round(rendimiento["tiempo_medio_ms"]),
+                "tiempo_respuesta_p95_ms": round(rendimiento["p95_ms"]),
+                "total_peticiones": rendimiento["peticiones"],
+                "disponibilidad_sistema": round(rendimiento["disponibilidad"], 2),
+                "fallos_votacion": rendimiento["fallos_votacion"],
+            },
+        )
+        filas = 1
+
+    # Las ventanas por ruta solo se guardan un tiempo (crecen con el tráfico)
+    retencion = timezone.now() - timedelta(days=settings.RENDIMIENTO_RETENCION_DIAS)
+    borradas, _ = FactRendimientoRuta.objects.filter(ventana_fin__lt=retencion).delete()
+    return filas + borradas
+
+
+def cargar_calidad_transcripcion():
+    if FactCalidadTranscripcion.objects.exists():
+        return 0
+    FactCalidadTranscripcion.objects.create(
+        fecha=timezone.now(),
+        total_palabras=100,
+        palabras_correctas=95,
+        precision_porcentaje=95.0,
+        fecha_key=clave_fecha(timezone.localdate()),
+    )
+    return 1
+
+
+# =========================
+# Etapa: rollups del panel
+# =========================
+def _limpiar_sector(direccion):
+    # El panel agrupa por calle/pasaje: se quitan los números que queden
+    return re.sub(r"\d+", "", direccion or "").strip() or "Sin Dirección"
+
+
+def cargar_rollups():
+    """
+    Recalcula las tablas Rollup* que lee el panel BI. Son pequeñas (una fila
+    por taller, acta, reunión o sector), así que se reemplazan completas.
+    """
+    filas = 0
+
+    # Ocupación de talleres
+    inscritos = dict(
+        FactInscripcionTaller.objects.values_list("taller_id").annotate(n=Count("id"))
+    )
+    RollupOcupacionTaller.objects.all().delete()
+    ocupacion = [
+        RollupOcupacionTaller(taller_id=tid, nombre=nombre, inscritos=inscritos.get(tid, 0), cupos=cupos)
+        for tid, nombre, cupos in DimTaller.objects.values_list("id", "nombre", "cupos_totales")
+    ]
+    RollupOcupacionTaller.objects.bulk_create(ocupacion, batch_size=500)
+    filas += len(ocupacion)
+
+    # Consultas por acta
+    RollupConsultaActa.objects.all().delete()
+    consultas = [
+        RollupConsultaActa(acta_id=acta_id, titulo=titulo, consultas=n)
+        for acta_id, titulo, n in FactConsultaActa.objects.values_list("acta_id", "acta__titulo").annotate(n=Count("id"))
+    ]
+    RollupConsultaActa.objects.bulk_create(consultas, batch_size=500)
+    filas += len(consultas)
+
+    # Asistencia por reunión (con fecha_key para el filtro por período del panel)
+    RollupAsistenciaReunion.objects.all().delete()
+    asistencia = [
+        RollupAsistenciaReunion(reunion_id=rid, fecha=fecha, fecha_key=clave_fecha(fecha), anio=fecha.year, total=n)
+        for rid, fecha, n in FactAsistenciaReunion.objects.values_list("reunion_id", "reunion__fecha").annotate(n=Count("id"))
+    ]
+    RollupAsistenciaReunion.objects.bulk_create(asistencia, batch_size=500)
+    filas += len(asistencia)
+
+    # Vecinos por sector (limpieza del nombre una sola vez, aquí)
+    vecinos = DimVecino.objects.filter(activo=True)
+    sectores = Counter()
+    for direccion, n in vecinos.values_list("direccion_sector").annotate(n=Count("id")):
+        sectores[_limpiar_sector(direccion)] += n
+    RollupSector.objects.all().delete()
+    RollupSector.objects.bulk_create(
+        [RollupSector(sector=sector, total_vecinos=n) for sector, n in sectores.items()],
+        batch_size=500,
+    )
+    filas += len(sectores)
+
+    # Totales globales
+    RollupResumen.objects.update_or_create(pk=1, defaults={
+        "total_vecinos": vecinos.count(),
+        "total_participantes": FactParticipacionVotacion.objects.values("vecino_id").distinct().count(),
+        "usuarios_app": vecinos.filter(usa_app_movil=True).count(),
+        "precision_promedio": DimActa.objects.aggregate(p=Avg("precision_transcripcion"))["p"] or 0,
+    })
+    return filas + 1
+
+
+# Orden de ejecución: las dimensiones antes que los hechos que las referencian,
+# el compromiso por vecino cuando ya están todos los hechos y los rollups al final
+ETAPAS = [
+    ("dim_fechas", cargar_dim_fechas),
+    ("dim_vecinos", cargar_dim_vecinos),
+    ("dim_talleres", cargar_dim_talleres),
+    ("dim_actas", cargar_dim_actas),
+    ("dim_votaciones", cargar_dim_votaciones),
+    ("dim_reuniones", cargar_dim_reuniones),
+    ("fact_consultas_actas", cargar_fact_consultas_actas),
+    ("fact_inscripciones", cargar_fact_inscripciones),
+    ("fact_votos", cargar_fact_votos),
+    ("fact_asistencia", cargar_fact_asistencia),
+    ("metricas_diarias", cargar_metricas_diarias),
+    ("calidad_transcripcion", cargar_calidad_transcripcion),
+    ("compromiso_vecinos", cargar_compromiso_vecinos),
+    ("rollups", cargar_rollups),
+]
+
+
+# =========================
+# Ejecución
+# =========================
+def vaciar_datamart():
+    """
+    Borra hechos, dimensiones y marcas de agua (para una recarga completa).
+    FactMetricasDiarias se conserva: no se puede reconstruir desde el OLTP.
+    """
+    for modelo in (
+        FactInscripcionTaller, FactConsultaActa, FactParticipacionVotacion,
+        FactAsistenciaReunion, FactCalidadTranscripcion,
+        DimVecino, DimTaller, DimActa, DimVotacion, DimReunion, EtlWatermark,
+    ):
+        modelo.objects.all().delete()
+
+
+def ejecutar_etl(completo=False, informar=None):
+    """
+    Ejecuta todas las etapas en una transacción y devuelve
+    [{"etapa", "filas", "segundos"}, ...]. 'informar' recibe cada resultado
+    apenas termina su etapa (el comando lo usa para imprimir avance).
+    """
+    etapas = ([("vaciado", vaciar_datamart)] if completo else []) + ETAPAS
+    resultados = []
+    with transaction.atomic():
+        # Al confirmar, el panel y el PDF cacheados pasan a ser de una generación vieja
+        transaction.on_commit(nueva_generacion)
+        for nombre, etapa in etapas:
+            inicio = time.perf_counter()
+            filas = etapa() or 0
+            resultado = {"etapa": nombre, "filas": filas, "segundos": time.perf_counter() - inicio}
+            resultados.append(resultado)
+            logger.info("ETL %s: %s filas en %.2f s", nombre, filas, resultado["segundos"])
+            if informar:
+                informar(resultado)
+    return resultados
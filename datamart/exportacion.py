@@ -0,0 +1,222 @@
+# datamart/exportacion.py
+"""
+Exportación del esquema estrella (Dim* / Fact*) para análisis externo.
+
+Las filas se leen por lotes con paginación por PK (keyset: pk > último visto),
+así la memoria depende del tamaño del lote y no del de la tabla, y cada lote es
+una consulta corta que usa el índice primario. Los generadores van entregando
+bytes a medida que se leen: sirven tanto para escribir un archivo como para un
+StreamingHttpResponse.
+"""
+import csv
+import json
+from datetime import datetime
+
+from django.apps import apps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet es opcional: sin pyarrow solo hay CSV
+    pa = None
+    pq = None
+
+TAMANO_LOTE = 5000
+FORMATOS = ("csv", "parquet")
+
+
+class ErrorExportacion(Exception):
+    pass
+
+
+def tablas_exportables():
+    """{nombre: modelo} con las dimensiones y hechos del datamart (sin rollups ni control del ETL)."""
+    return {
+        modelo.__name__.lower(): modelo
+        for modelo in apps.get_app_config("datamart").get_models()
+        if modelo.__name__.startswith(("Dim", "Fact"))
+    }
+
+
+def obtener_modelo(nombre):
+    modelo = tablas_exportables().get((nombre or "").lower())
+    if modelo is None:
+        raise ErrorExportacion(f"Tabla desconocida: {nombre}")
+    return modelo
+
+
+def columnas(modelo):
+    """Columnas físicas (las FK salen como <campo>_id)."""
+    return [f.attname for f in modelo._meta.concrete_fields]
+
+
+def filtra_por_fecha(modelo):
+    return any(f.name == "fecha_key" for f in modelo._meta.concrete_fields)
+
+
+def lotes(modelo, desde=None, hasta=None, tamano=TAMANO_LOTE):
+    """
+    Genera listas de tuplas (values_list) de a 'tamano' filas, en orden de PK.
+    desde/hasta (yyyymmdd) filtran por fecha_key; las tablas sin esa columna
+    (dimensiones salvo DimFecha, rendimiento) se exportan completas.
+    """
+    cols = columnas(modelo)
+    pk = modelo._meta.pk.attname
+    qs = modelo.objects.all()
+    if filtra_por_fecha(modelo):
+        if desde:
+            qs = qs.filter(fecha_key__gte=desde)
+        if hasta:
+            qs = qs.filter(fecha_key__lte=hasta)
+
+    indice_pk = cols.index(pk)
+    ultimo = None
+    while True:
+        pagina = qs if ultimo is None else qs.filter(pk__gt=ultimo)
+        filas = list(pagina.order_by(pk).values_list(*cols)[:tamano])
+        if not filas:
+            return
+        yield filas
+        if len(filas) < tamano:
+            return
+        ultimo = filas[-1][indice_pk]
+
+
+# =========================
+# CSV
+# =========================
+class _Eco:
+    """Pseudo-archivo: csv.writer escribe y la línea se devuelve tal cual."""
+
+    def write(self, valor):
+        return valor
+
+
+def _valor_csv(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False)
+    return valor
+
+
+def exportar_csv(modelo, desde=None, hasta=None, tamano=TAMANO_LOTE):
+    """Genera el CSV (UTF-8, con encabezado) en trozos de bytes, uno por lote."""
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(columnas(modelo)).encode("utf-8")
+    for filas in lotes(modelo, desde, hasta, tamano):
+        yield "".join(
+            escritor.writerow([_valor_csv(v) for v in fila]) for fila in filas
+        ).encode("utf-8")
+
+
+# =========================
+# Parquet
+# =========================
+def _tipo_arrow(campo):
+    if campo.is_relation:
+        campo = campo.target_field
+    tipo = campo.get_internal_type()
+    if tipo in ("AutoField", "BigAutoField", "SmallAutoField", "IntegerField",
+                "BigIntegerField", "SmallIntegerField", "PositiveIntegerField",
+                "PositiveSmallIntegerField", "PositiveBigIntegerField"):
+        return pa.int64()
+    if tipo in ("FloatField", "DecimalField"):
+        return pa.float64()
+    if tipo == "BooleanField":
+        return pa.bool_()
+    if tipo == "DateField":
+        return pa.date32()
+    if tipo == "DateTimeField":
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+
+def esquema_arrow(modelo):
+    """Esquema fijo desde los campos del modelo (no se infiere de un lote que podría venir con puros NULL)."""
+    return pa.schema([
+        pa.field(f.attname, _tipo_arrow(f), nullable=f.null)
+        for f in modelo._meta.concrete_fields
+    ])
+
+
+class _Tubo:
+    """Sumidero para ParquetWriter: acumula lo escrito y lo entrega en cada 'vaciar'."""
+
+    def __init__(self):
+        self.partes = []
+        self.posicion = 0
+        self.closed = False
+
+    def write(self, datos):
+        datos = bytes(datos)
+        self.partes.append(datos)
+        self.posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self.posicion
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def vaciar(self):
+        datos = b"".join(self.partes)
+        self.partes = []
+        return datos
+
+
+def exportar_parquet(modelo, desde=None, hasta=None, tamano=TAMANO_LOTE):
+    """Genera el Parquet en trozos de bytes: un row group por lote, el footer al final."""
+    esquema = esquema_arrow(modelo)
+    tubo = _Tubo()
+    escritor = pq.ParquetWriter(tubo, esquema, compression="snappy")
+    try:
+        for filas in lotes(modelo, desde, hasta, tamano):
+            columnas_lote = list(zip(*filas))
+            escritor.write_table(pa.Table.from_arrays(
+                [
+                    pa.array(
+                        [json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
+                         for v in valores],
+                        type=campo.type,
+                    )
+                    for valores, campo in zip(columnas_lote, esquema)
+                ],
+                schema=esquema,
+            ))
+            yield tubo.vaciar()
+    finally:
+        escritor.close()
+    yield tubo.vaciar()
+
+
+def exportar(modelo, formato="csv", desde=None, hasta=None, tamano=TAMANO_LOTE):
+    """Valida el formato de inmediato (los generadores recién fallarían al iterar)."""
+    if formato == "parquet":
+        if pq is None:
+            raise ErrorExportacion("Exportar a Parquet requiere pyarrow (pip install pyarrow).")
+        return exportar_parquet(modelo, desde, hasta, tamano)
+    if formato == "csv":
+        return exportar_csv(modelo, desde, hasta, tamano)
+    raise ErrorExportacion(f"Formato no soportado: {formato} (use {', '.join(FORMATOS)})")
+
+
+def nombre_archivo(modelo, formato, desde=None, hasta=None):
+    sufijo = ""
+    if desde or hasta:
+        sufijo = f"_{desde or 'inicio'}-{hasta or 'fin'}"
+    return f"{modelo.__name__.lower()}{sufijo}.{formato}"
+
+
+def leer_clave_fecha(texto):
+    """'20250131' o '2025-01-31' -> 20250131; vacío -> None."""
+    texto = (texto or "").strip().replace("-", "")
+    if not texto:
+        return None
+    if len(texto) != 8 or not texto.isdigit():
+        raise ErrorExportacion(f"Fecha inválida: {texto} (use AAAAMMDD o AAAA-MM-DD)")
+    return int(texto)
@@ -0,0 +1,142 @@
+# datamart/fechas.py
+"""
+Dimensión de fechas (DimFecha) y claves enteras yyyymmdd.
+
+Los hechos guardan 'fecha_key' (p. ej. 20251118); filtrar un período es un
+rango sobre ese entero (fecha_key BETWEEN 20251101 AND 20251130), que MySQL
+resuelve con el índice, a diferencia de __year / __month sobre una fecha.
+"""
+import calendar
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import DimFecha
+
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+
+# =========================
+# Claves
+# =========================
+def clave_fecha(valor):
+    """date o datetime (aware -> hora local) a entero yyyymmdd."""
+    if isinstance(valor, datetime):
+        if timezone.is_aware(valor):
+            valor = timezone.localtime(valor)
+        valor = valor.date()
+    return valor.year * 10000 + valor.month * 100 + valor.day
+
+
+def rango_periodo(anio, mes=None):
+    """(clave_desde, clave_hasta) de un mes, o del año completo si mes es None."""
+    if mes:
+        ultimo = calendar.monthrange(anio, mes)[1]
+        return clave_fecha(date(anio, mes, 1)), clave_fecha(date(anio, mes, ultimo))
+    return clave_fecha(date(anio, 1, 1)), clave_fecha(date(anio, 12, 31))
+
+
+# =========================
+# Feriados (Chile)
+# =========================
+def domingo_de_pascua(anio):
+    """Algoritmo de Meeus/Jones/Butcher (calendario gregoriano)."""
+    a = anio % 19
+    b, c = divmod(anio, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(anio, mes, dia + 1)
+
+
+def _trasladar_a_lunes(dia):
+    # Ley 19.668: martes a jueves -> lunes anterior; viernes -> lunes siguiente
+    wd = dia.weekday()
+    if wd in (1, 2, 3):
+        return dia - timedelta(days=wd)
+    if wd == 4:
+        return dia + timedelta(days=3)
+    return dia
+
+
+def _dia_iglesias_evangelicas(anio):
+    # Ley 20.299: si cae martes se pasa al viernes anterior; si cae miércoles, al viernes siguiente
+    dia = date(anio, 10, 31)
+    if dia.weekday() == 1:
+        return dia - timedelta(days=4)
+    if dia.weekday() == 2:
+        return dia + timedelta(days=2)
+    return dia
+
+
+def feriados_chile(anio):
+    """
+    {fecha: nombre} con los feriados nacionales de fecha fija, los de Semana
+    Santa y los trasladables. Los que dependen de un decreto (solsticio,
+    elecciones) se agregan con settings.FERIADOS_ADICIONALES ("AAAA-MM-DD").
+    """
+    pascua = domingo_de_pascua(anio)
+    feriados = {
+        date(anio, 1, 1): "Año Nuevo",
+        pascua - timedelta(days=2): "Viernes Santo",
+        pascua - timedelta(days=1): "Sábado Santo",
+        date(anio, 5, 1): "Día del Trabajo",
+        date(anio, 5, 21): "Día de las Glorias Navales",
+        _trasladar_a_lunes(date(anio, 6, 29)): "San Pedro y San Pablo",
+        date(anio, 7, 16): "Virgen del Carmen",
+        date(anio, 8, 15): "Asunción de la Virgen",
+        date(anio, 9, 18): "Independencia Nacional",
+        date(anio, 9, 19): "Glorias del Ejército",
+        _trasladar_a_lunes(date(anio, 10, 12)): "Encuentro de Dos Mundos",
+        _dia_iglesias_evangelicas(anio): "Iglesias Evangélicas y Protestantes",
+        date(anio, 11, 1): "Todos los Santos",
+        date(anio, 12, 8): "Inmaculada Concepción",
+        date(anio, 12, 25): "Navidad",
+    }
+    for texto in getattr(settings, "FERIADOS_ADICIONALES", []):
+        dia = date.fromisoformat(texto)
+        if dia.year == anio:
+            feriados.setdefault(dia, "Feriado")
+    return feriados
+
+
+# =========================
+# Carga de DimFecha
+# =========================
+def asegurar_dim_fecha(desde, hasta):
+    """Crea (en lote) las filas de DimFecha que falten entre 'desde' y 'hasta'. Devuelve cuántas creó."""
+    existentes = set(
+        DimFecha.objects.filter(fecha_key__range=(clave_fecha(desde), clave_fecha(hasta)))
+        .values_list("fecha_key", flat=True)
+    )
+    feriados = {}
+    nuevas = []
+    dia = desde
+    while dia <= hasta:
+        clave = clave_fecha(dia)
+        if clave not in existentes:
+            if dia.year not in feriados:
+                feriados[dia.year] = feriados_chile(dia.year)
+            nombre_feriado = feriados[dia.year].get(dia, "")
+            nuevas.append(DimFecha(
+                fecha_key=clave,
+                fecha=dia,
+                anio=dia.year,
+                trimestre=(dia.month - 1) // 3 + 1,
+                mes=dia.month,
+                semana_iso=dia.isocalendar()[1],
+                dia_semana=dia.isoweekday(),
+                nombre_dia=DIAS_SEMANA[dia.weekday()],
+                es_fin_de_semana=dia.weekday() >= 5,
+                es_feriado=bool(nombre_feriado),
+                nombre_feriado=nombre_feriado,
+            ))
+        dia += timedelta(days=1)
+    DimFecha.objects.bulk_create(nuevas, batch_size=1000)
+    return len(nuevas)
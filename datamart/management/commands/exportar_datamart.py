@@ -0,0 +1,50 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from datamart.exportacion import (
+    FORMATOS, ErrorExportacion, exportar, leer_clave_fecha, nombre_archivo,
+    obtener_modelo, tablas_exportables,
+)
+
+
+class Command(BaseCommand):
+    help = 'Exporta dimensiones y hechos del datamart a CSV o Parquet (por lotes, memoria constante)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tablas", nargs="*",
+            help="Tablas a exportar (p. ej. factasistenciareunion). Sin argumentos: todas las Dim* y Fact*.",
+        )
+        parser.add_argument("--formato", choices=FORMATOS, default="csv")
+        parser.add_argument("--desde", help="fecha_key inicial (AAAAMMDD o AAAA-MM-DD), inclusive.")
+        parser.add_argument("--hasta", help="fecha_key final (AAAAMMDD o AAAA-MM-DD), inclusive.")
+        parser.add_argument("--salida", default=".", help="Carpeta donde dejar los archivos.")
+
+    def handle(self, *args, **options):
+        try:
+            desde = leer_clave_fecha(options["desde"])
+            hasta = leer_clave_fecha(options["hasta"])
+            modelos = (
+                [obtener_modelo(nombre) for nombre in options["tablas"]]
+                if options["tablas"] else list(tablas_exportables().values())
+            )
+        except ErrorExportacion as e:
+            raise CommandError(str(e))
+
+        os.makedirs(options["salida"], exist_ok=True)
+        for modelo in modelos:
+            ruta = os.path.join(options["salida"], nombre_archivo(modelo, options["formato"], desde, hasta))
+            try:
+                trozos = exportar(modelo, options["formato"], desde, hasta)
+            except ErrorExportacion as e:
+                raise CommandError(str(e))
+
+            total = 0
+            with open(ruta, "wb") as archivo:
+                for trozo in trozos:
+                    archivo.write(trozo)
+                    total += len(trozo)
+            self.stdout.write(f" - {modelo.__name__:<28} {total:>12} bytes  {ruta}")
+
+        self.stdout.write(self.style.SUCCESS(f"Exportación completada ({len(modelos)} tablas)."))
@@ -11,14 +11,24 @@ class Command(BaseCommand):
         
         # LISTA COMPLETA DE TABLAS A BORRAR
         tables_to_drop = [
+            'datamart_rollupresumen',
+            'datamart_rollupocupaciontaller',
+            'datamart_rollupconsultaacta',
+            'datamart_rollupasistenciareunion',
+            'datamart_rollupsector',
             'datamart_factmetricasdiarias',       # Nueva
             'datamart_factcalidadtranscripcion',  # Nueva
             'datamart_factmetricastecnicas',      # Nueva
+            'datamart_factrendimientoruta',
+            'datamart_factcompromisovecino',
+            'datamart_etlwatermark',
+            'datamart_ejecucionetl',
             'datamart_factasistenciareunion',     # Nueva
             'datamart_factparticipacionvotacion',
             'datamart_factconsultaacta',
             'datamart_factinscripciontaller',
             'datamart_dimreunion',                # Nueva
+            'datamart_dimfecha',
             'datamart_dimacta',
             'datamart_dimtaller',
             'datamart_dimvotacion',
@@ -1,130 +1,38 @@
-import random
-from django.core.management.base import BaseCommand
-from django.db import transaction
-from django.contrib.auth.models import User
-from django.utils import timezone
+import time
 
-from core.models import Perfil
-from reuniones.models import Acta, LogConsultaActa, Reunion, Asistencia
-from talleres.models import Taller, Inscripcion
-try:
-    from votaciones.models import Votacion, Voto
-except ImportError:
-    pass
+from django.core.management.base import BaseCommand, CommandError
+
+from datamart.etl import ejecutar_etl
+from datamart.tasks import lock_etl
 
-from datamart.models import (
-    DimVecino, DimTaller, DimActa, DimVotacion, DimReunion,
-    FactInscripcionTaller, FactConsultaActa, FactParticipacionVotacion,
-    FactAsistenciaReunion, FactMetricasDiarias, FactCalidadTranscripcion
-)
 
 class Command(BaseCommand):
-    help = 'ETL para BI (Solo Usuarios Activos)'
+    help = 'ETL para BI (incremental; --full para recargar todo desde cero)'
 
-    def get_rango_etario(self, user):
-        return "Adulto"
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Vacía dimensiones, hechos y marcas de agua antes de cargar.",
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
-        self.stdout.write("Iniciando ETL...")
-
-        # 1. LIMPIEZA DE DATOS
-        FactInscripcionTaller.objects.all().delete()
-        FactConsultaActa.objects.all().delete()
-        FactParticipacionVotacion.objects.all().delete()
-        FactAsistenciaReunion.objects.all().delete()
-        FactMetricasDiarias.objects.all().delete()
-        FactCalidadTranscripcion.objects.all().delete()
-        
-        DimVecino.objects.all().delete()
-        DimTaller.objects.all().delete()
-        DimActa.objects.all().delete()
-        DimVotacion.objects.all().delete()
-        DimReunion.objects.all().delete()
-
-        # 2. CARGA DE DIMENSIONES
-
-        usuarios_activos = User.objects.filter(is_active=True)
-        
-        vecinos_creados = []
-        for user in usuarios_activos:
-            sector = "Sin Dirección"
-            ninos = False
-            usa_app = random.choice([True, False, True])  # lo puedes cambiar luego si quieres algo real
-
-            try:
-                if hasattr(user, 'perfil'):
-                    perfil = user.perfil
-                    # 🔹 AHORA: solo usamos el nombre de la calle/pasaje, SIN número
-                    if perfil.direccion:
-                        sector = perfil.direccion.strip()
-                    ninos = perfil.total_ninos > 0
-            except Exception:
-                pass
-            
-            vecinos_creados.append(DimVecino(
-                vecino_id_oltp=user.id, 
-                nombre_completo=user.username,
-                rango_etario=self.get_rango_etario(user),
-                direccion_sector=sector,
-                tiene_niños=ninos,
-                usa_app_movil=usa_app
-            ))
-        DimVecino.objects.bulk_create(vecinos_creados)
-
-        # Resto de dimensiones
-        for t in Taller.objects.all():
-            DimTaller.objects.create(
-                taller_id_oltp=t.id,
-                nombre=t.nombre,
-                cupos_totales=t.cupos_totales
-            )
-
-        for a in Acta.objects.all():
-            DimActa.objects.create(
-                acta_id_oltp=a.reunion.id,
-                titulo=a.reunion.titulo,
-                fecha_reunion=a.reunion.fecha.date(),
-                precision_transcripcion=round(random.uniform(88.0, 99.9), 1)
-            )
-            
-        try:
-            for v in Votacion.objects.all():
-                DimVotacion.objects.create(
-                    votacion_id_oltp=v.id,
-                    pregunta=v.pregunta,
-                    fecha_inicio=v.fecha_cierre
-                )
-        except Exception:
-            pass
-
-        for r in Reunion.objects.all():
-            DimReunion.objects.create(
-                reunion_id_oltp=r.id,
-                titulo=r.titulo,
-                fecha=r.fecha.date()
-            )
-
-        # 3. HECHOS (simplificado)
-        vecinos_map = {v.vecino_id_oltp: v for v in DimVecino.objects.all()}
-
-        # 🔹 Aquí iría tu lógica de carga de hechos usando vecinos_map
-
-        # 4. Métricas simuladas
-        FactMetricasDiarias.objects.create(
-            tiempo_respuesta_ms=random.randint(120, 350),
-            disponibilidad_sistema=99.9,
-            fallos_votacion=0
-        )
-        
-        if not FactCalidadTranscripcion.objects.exists():
-            FactCalidadTranscripcion.objects.create(
-                fecha=timezone.now(),
-                total_palabras=100,
-                palabras_correctas=95,
-                precision_porcentaje=95.0
+        completo = options["full"]
+        self.stdout.write("Iniciando ETL completo..." if completo else "Iniciando ETL incremental...")
+
+        inicio = time.perf_counter()
+        # Mismo lock que la tarea de Celery: no se solapa con el botón del panel ni con el nocturno
+        with lock_etl() as adquirido:
+            if not adquirido:
+                raise CommandError("Ya hay un ETL en curso.")
+            resultados = ejecutar_etl(
+                completo=completo,
+                informar=lambda r: self.stdout.write(
+                    f" - {r['etapa']:<24} {r['filas']:>8} filas  {r['segundos']:.2f} s"
+                ),
             )
 
+        total_filas = sum(r["filas"] for r in resultados)
         self.stdout.write(self.style.SUCCESS(
-            f"ETL completado. Usuarios activos cargados: {len(vecinos_creados)}"
+            f"ETL completado: {total_filas} filas en {time.perf_counter() - inicio:.2f} s"
         ))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datamart', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='factmetricasdiarias',
+            name='tiempo_respuesta_p95_ms',
+            field=models.IntegerField(blank=True, help_text='Percentil 95 en ms', null=True),
+        ),
+        migrations.AddField(
+            model_name='factmetricasdiarias',
+            name='total_peticiones',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='FactRendimientoRuta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ventana_inicio', models.DateTimeField()),
+                ('ventana_fin', models.DateTimeField()),
+                ('ruta', models.CharField(max_length=255)),
+                ('metodo', models.CharField(max_length=10)),
+                ('instancia', models.CharField(help_text='host:pid del proceso que midió', max_length=100)),
+                ('total_peticiones', models.IntegerField()),
+                ('errores_4xx', models.IntegerField(default=0)),
+                ('errores_5xx', models.IntegerField(default=0)),
+                ('suma_ms', models.FloatField(help_text='Para calcular promedios ponderados')),
+                ('p50_ms', models.FloatField()),
+                ('p95_ms', models.FloatField()),
+                ('p99_ms', models.FloatField()),
+                ('max_ms', models.FloatField()),
+                ('promedio_queries', models.FloatField(default=0)),
+                ('promedio_ms_db', models.FloatField(default=0)),
+                ('promedio_bytes', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ventana_fin', 'ruta'], name='datamart_fa_ventana_db8c4b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:15
+
+from django.db import migrations, models
+
+
+def vaciar_consultas_sin_log(apps, schema_editor):
+    # Las filas previas no tienen log_id_oltp: el próximo ETL (marca en 0) las recarga
+    FactConsultaActa = apps.get_model('datamart', 'FactConsultaActa')
+    FactConsultaActa.objects.filter(log_id_oltp__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datamart', '0002_rendimiento_ruta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EtlWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tabla', models.CharField(max_length=100, unique=True)),
+                ('ultimo_id', models.BigIntegerField(default=0)),
+                ('actualizado_el', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='dimacta',
+            name='hash_origen',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='dimreunion',
+            name='hash_origen',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='dimtaller',
+            name='hash_origen',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='dimvecino',
+            name='hash_origen',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='dimvotacion',
+            name='hash_origen',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='factconsultaacta',
+            name='log_id_oltp',
+            field=models.BigIntegerField(help_text='ID de LogConsultaActa', null=True, unique=True),
+        ),
+        migrations.RunPython(vaciar_consultas_sin_log, migrations.RunPython.noop),
+    ]
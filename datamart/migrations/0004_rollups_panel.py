@@ -0,0 +1,66 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datamart', '0003_etl_incremental'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupConsultaActa',
+            fields=[
+                ('acta', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='datamart.dimacta')),
+                ('titulo', models.CharField(max_length=255)),
+                ('consultas', models.IntegerField(db_index=True, default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupOcupacionTaller',
+            fields=[
+                ('taller', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='datamart.dimtaller')),
+                ('nombre', models.CharField(max_length=255)),
+                ('inscritos', models.IntegerField(default=0)),
+                ('cupos', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupResumen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_vecinos', models.IntegerField(default=0)),
+                ('total_participantes', models.IntegerField(default=0, help_text='Vecinos que han votado al menos una vez')),
+                ('usuarios_app', models.IntegerField(default=0)),
+                ('precision_promedio', models.FloatField(default=0.0)),
+                ('actualizado_el', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupSector',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sector', models.CharField(max_length=255, unique=True)),
+                ('total_vecinos', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupAsistenciaReunion',
+            fields=[
+                ('reunion', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='datamart.dimreunion')),
+                ('fecha', models.DateField()),
+                ('anio', models.IntegerField()),
+                ('mes', models.IntegerField()),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['anio', 'mes', 'fecha'], name='datamart_ro_anio_0ef921_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,134 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:19
+
+from datetime import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def _clave(valor):
+    if isinstance(valor, datetime):
+        if timezone.is_aware(valor):
+            valor = timezone.localtime(valor)
+        valor = valor.date()
+    return valor.year * 10000 + valor.month * 100 + valor.day
+
+
+def poblar_fecha_key(apps, schema_editor):
+    origenes = [
+        ('FactConsultaActa', 'fecha_consulta'),
+        ('FactInscripcionTaller', 'fecha_inscripcion'),
+        ('FactParticipacionVotacion', 'fecha_voto'),
+        ('FactAsistenciaReunion', 'reunion__fecha'),
+        ('FactMetricasDiarias', 'fecha'),
+        ('FactCalidadTranscripcion', 'fecha'),
+        ('RollupAsistenciaReunion', 'fecha'),
+    ]
+    for nombre, campo in origenes:
+        modelo = apps.get_model('datamart', nombre)
+        lote = []
+        for pk, valor in modelo.objects.values_list('pk', campo).iterator(chunk_size=2000):
+            lote.append(modelo(pk=pk, fecha_key=_clave(valor)))
+            if len(lote) >= 2000:
+                modelo.objects.bulk_update(lote, ['fecha_key'])
+                lote = []
+        modelo.objects.bulk_update(lote, ['fecha_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datamart', '0004_rollups_panel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DimFecha',
+            fields=[
+                ('fecha_key', models.IntegerField(primary_key=True, serialize=False)),
+                ('fecha', models.DateField(unique=True)),
+                ('anio', models.IntegerField()),
+                ('trimestre', models.IntegerField()),
+                ('mes', models.IntegerField()),
+                ('semana_iso', models.IntegerField()),
+                ('dia_semana', models.IntegerField(help_text='1 = lunes ... 7 = domingo')),
+                ('nombre_dia', models.CharField(max_length=10)),
+                ('es_fin_de_semana', models.BooleanField(default=False)),
+                ('es_feriado', models.BooleanField(default=False)),
+                ('nombre_feriado', models.CharField(blank=True, default='', max_length=100)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='rollupasistenciareunion',
+            name='datamart_ro_anio_0ef921_idx',
+        ),
+        migrations.RemoveField(
+            model_name='rollupasistenciareunion',
+            name='mes',
+        ),
+        migrations.AddField(
+            model_name='factasistenciareunion',
+            name='fecha_key',
+            field=models.IntegerField(help_text='yyyymmdd de la reunión (DimFecha)', null=True),
+        ),
+        migrations.AddField(
+            model_name='factcalidadtranscripcion',
+            name='fecha_key',
+            field=models.IntegerField(db_index=True, help_text='yyyymmdd (DimFecha)', null=True),
+        ),
+        migrations.AddField(
+            model_name='factconsultaacta',
+            name='fecha_key',
+            field=models.IntegerField(help_text='yyyymmdd (DimFecha)', null=True),
+        ),
+        migrations.AddField(
+            model_name='factinscripciontaller',
+            name='fecha_key',
+            field=models.IntegerField(help_text='yyyymmdd (DimFecha)', null=True),
+        ),
+        migrations.AddField(
+            model_name='factmetricasdiarias',
+            name='fecha_key',
+            field=models.IntegerField(db_index=True, help_text='yyyymmdd (DimFecha)', null=True),
+        ),
+        migrations.AddField(
+            model_name='factparticipacionvotacion',
+            name='fecha_key',
+            field=models.IntegerField(help_text='yyyymmdd (DimFecha)', null=True),
+        ),
+        migrations.AddField(
+            model_name='rollupasistenciareunion',
+            name='fecha_key',
+            field=models.IntegerField(default=0, help_text='yyyymmdd (DimFecha)'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='factasistenciareunion',
+            index=models.Index(fields=['fecha_key', 'reunion'], name='datamart_fa_fecha_k_1df1e2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='factconsultaacta',
+            index=models.Index(fields=['fecha_key', 'acta'], name='datamart_fa_fecha_k_f9adb7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='factinscripciontaller',
+            index=models.Index(fields=['fecha_key', 'taller'], name='datamart_fa_fecha_k_022582_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='factparticipacionvotacion',
+            index=models.Index(fields=['fecha_key', 'votacion'], name='datamart_fa_fecha_k_42b41d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rollupasistenciareunion',
+            index=models.Index(fields=['fecha_key'], name='datamart_ro_fecha_k_50e273_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rollupasistenciareunion',
+            index=models.Index(fields=['anio'], name='datamart_ro_anio_203982_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dimfecha',
+            index=models.Index(fields=['anio', 'mes'], name='datamart_di_anio_da6ab6_idx'),
+        ),
+        migrations.RunPython(poblar_fecha_key, migrations.RunPython.noop),
+    ]
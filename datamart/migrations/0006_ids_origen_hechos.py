@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datamart', '0005_dim_fecha'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='factasistenciareunion',
+            name='asistencia_id_oltp',
+            field=models.BigIntegerField(help_text='ID de Asistencia', null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='factinscripciontaller',
+            name='inscripcion_id_oltp',
+            field=models.BigIntegerField(help_text='ID de Inscripcion', null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='factparticipacionvotacion',
+            name='voto_id_oltp',
+            field=models.BigIntegerField(help_text='ID de Voto', null=True, unique=True),
+        ),
+    ]
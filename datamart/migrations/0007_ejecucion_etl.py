@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datamart', '0006_ids_origen_hechos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EjecucionEtl',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_CURSO', 'En curso'), ('COMPLETADA', 'Completada'), ('OMITIDA', 'Omitida (otra en curso)'), ('ERROR', 'Error')], default='PENDIENTE', max_length=20)),
+                ('completa', models.BooleanField(default=False, help_text='Recarga completa (--full)')),
+                ('creada_el', models.DateTimeField(auto_now_add=True)),
+                ('iniciada_el', models.DateTimeField(blank=True, null=True)),
+                ('terminada_el', models.DateTimeField(blank=True, null=True)),
+                ('resultados', models.JSONField(blank=True, default=list, help_text='Filas y segundos por etapa')),
+                ('error', models.TextField(blank=True, default='')),
+                ('solicitada_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-creada_el'],
+                'indexes': [models.Index(fields=['estado', 'creada_el'], name='datamart_ej_estado_1ca3f0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datamart', '0007_ejecucion_etl'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FactCompromisoVecino',
+            fields=[
+                ('vecino', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='datamart.dimvecino')),
+                ('fecha_key', models.IntegerField(help_text='yyyymmdd del cálculo (DimFecha)')),
+                ('asistencias', models.IntegerField(default=0)),
+                ('votos', models.IntegerField(default=0)),
+                ('inscripciones', models.IntegerField(default=0)),
+                ('consultas_actas', models.IntegerField(default=0)),
+                ('ultima_participacion_key', models.IntegerField(blank=True, help_text='yyyymmdd', null=True)),
+                ('dias_sin_participar', models.IntegerField(blank=True, null=True)),
+                ('participaciones_3m', models.IntegerField(default=0)),
+                ('participaciones_6m', models.IntegerField(default=0)),
+                ('participaciones_12m', models.IntegerField(default=0)),
+                ('puntaje_recencia', models.FloatField(default=0.0, help_text='0-1')),
+                ('puntaje_frecuencia', models.FloatField(default=0.0, help_text='0-1 (percentil en 12 meses)')),
+                ('puntaje', models.FloatField(default=0.0, help_text='0-100')),
+                ('segmento', models.CharField(choices=[('ACTIVO', 'Activo'), ('OCASIONAL', 'Ocasional'), ('EN_RIESGO', 'En riesgo (nada en 3 meses)'), ('INACTIVO', 'Inactivo (nada en 12 meses)'), ('NUNCA', 'Nunca ha participado')], default='NUNCA', max_length=10)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['segmento', 'puntaje'], name='datamart_fa_segment_02a58e_idx'), models.Index(fields=['puntaje'], name='datamart_fa_puntaje_61bc86_idx')],
+            },
+        ),
+    ]
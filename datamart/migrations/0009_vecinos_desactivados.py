@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-19 05:14
+
+from django.db import migrations, models
+
+
+def reiniciar_marcas(apps, schema_editor):
+    # Las marcas pudieron pasar filas omitidas (dimensión faltante o vecino
+    # desactivado): con marcas en 0 el próximo ETL las recupera sin duplicar
+    EtlWatermark = apps.get_model('datamart', 'EtlWatermark')
+    EtlWatermark.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datamart', '0008_compromiso_vecino'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dimvecino',
+            name='activo',
+            field=models.BooleanField(default=True, help_text='False: usuario desactivado (se conservan sus hechos)'),
+        ),
+        migrations.RunPython(reiniciar_marcas, migrations.RunPython.noop),
+    ]
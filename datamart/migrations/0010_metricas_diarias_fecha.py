@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def quitar_duplicadas(apps, schema_editor):
+    # Con auto_now_add cada corrida pudo crear otra fila del mismo día:
+    # se conserva la última (la más completa) antes de exigir fecha única
+    FactMetricasDiarias = apps.get_model('datamart', 'FactMetricasDiarias')
+    ultimas = (
+        FactMetricasDiarias.objects.values('fecha')
+        .annotate(ultima=models.Max('id'))
+        .values_list('ultima', flat=True)
+    )
+    FactMetricasDiarias.objects.exclude(id__in=list(ultimas)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datamart', '0009_vecinos_desactivados'),
+    ]
+
+    operations = [
+        migrations.RunPython(quitar_duplicadas, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='factmetricasdiarias',
+            name='fecha',
+            field=models.DateField(default=django.utils.timezone.localdate, unique=True),
+        ),
+    ]
@@ -1,8 +1,30 @@
 
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 # --- DIMENSIONES ---
 
+class DimFecha(models.Model):
+    """Dimensión de fechas conformada; la clave es el entero yyyymmdd."""
+    fecha_key = models.IntegerField(primary_key=True)
+    fecha = models.DateField(unique=True)
+    anio = models.IntegerField()
+    trimestre = models.IntegerField()
+    mes = models.IntegerField()
+    semana_iso = models.IntegerField()
+    dia_semana = models.IntegerField(help_text="1 = lunes ... 7 = domingo")
+    nombre_dia = models.CharField(max_length=10)
+    es_fin_de_semana = models.BooleanField(default=False)
+    es_feriado = models.BooleanField(default=False)
+    nombre_feriado = models.CharField(max_length=100, blank=True, default="")
+
+    class Meta:
+        indexes = [models.Index(fields=["anio", "mes"])]
+
+    def __str__(self):
+        return str(self.fecha)
+
 class DimVecino(models.Model):
     vecino_id_oltp = models.IntegerField(unique=True, help_text="ID original del modelo User")
     nombre_completo = models.CharField(max_length=255)
@@ -10,6 +32,8 @@ class DimVecino(models.Model):
     direccion_sector = models.CharField(max_length=255, blank=True, null=True)
     tiene_niños = models.BooleanField(default=False)
     usa_app_movil = models.BooleanField(default=False)
+    activo = models.BooleanField(default=True, help_text="False: usuario desactivado (se conservan sus hechos)")
+    hash_origen = models.CharField(max_length=32, blank=True, default="", editable=False)
 
     def __str__(self):
         return self.nombre_completo
@@ -18,6 +42,7 @@ class DimTaller(models.Model):
     taller_id_oltp = models.IntegerField(unique=True)
     nombre = models.CharField(max_length=255)
     cupos_totales = models.IntegerField(default=0)
+    hash_origen = models.CharField(max_length=32, blank=True, default="", editable=False)
 
     def __str__(self):
         return self.nombre
@@ -27,6 +52,7 @@ class DimActa(models.Model):
     titulo = models.CharField(max_length=255)
     fecha_reunion = models.DateField()
     precision_transcripcion = models.FloatField(default=0.0, help_text="Porcentaje 0-100")
+    hash_origen = models.CharField(max_length=32, blank=True, default="", editable=False)
 
     def __str__(self):
         return self.titulo
@@ -35,6 +61,7 @@ class DimVotacion(models.Model):
     votacion_id_oltp = models.IntegerField(unique=True)
     pregunta = models.CharField(max_length=255)
     fecha_inicio = models.DateTimeField()
+    hash_origen = models.CharField(max_length=32, blank=True, default="", editable=False)
 
     def __str__(self):
         return self.pregunta
@@ -43,30 +70,91 @@ class DimReunion(models.Model):
     reunion_id_oltp = models.IntegerField(unique=True)
     titulo = models.CharField(max_length=255)
     fecha = models.DateField()
+    hash_origen = models.CharField(max_length=32, blank=True, default="", editable=False)
 
     def __str__(self):
         return self.titulo
 
+# --- CONTROL DEL ETL ---
+
+class EtlWatermark(models.Model):
+    """Último ID de origen ya cargado, por tabla fuente (ETL incremental)."""
+    tabla = models.CharField(max_length=100, unique=True)
+    ultimo_id = models.BigIntegerField(default=0)
+    actualizado_el = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.tabla} > {self.ultimo_id}"
+
+class EjecucionEtl(models.Model):
+    """Historial de corridas del ETL (botón del panel o programación nocturna)."""
+    class Estado(models.TextChoices):
+        PENDIENTE = "PENDIENTE", "Pendiente"
+        EN_CURSO = "EN_CURSO", "En curso"
+        COMPLETADA = "COMPLETADA", "Completada"
+        OMITIDA = "OMITIDA", "Omitida (otra en curso)"
+        ERROR = "ERROR", "Error"
+
+    ACTIVOS = (Estado.PENDIENTE, Estado.EN_CURSO)
+
+    estado = models.CharField(max_length=20, choices=Estado.choices, default=Estado.PENDIENTE)
+    completa = models.BooleanField(default=False, help_text="Recarga completa (--full)")
+    solicitada_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    creada_el = models.DateTimeField(auto_now_add=True)
+    iniciada_el = models.DateTimeField(null=True, blank=True)
+    terminada_el = models.DateTimeField(null=True, blank=True)
+    resultados = models.JSONField(default=list, blank=True, help_text="Filas y segundos por etapa")
+    error = models.TextField(blank=True, default="")
+
+    class Meta:
+        ordering = ["-creada_el"]
+        indexes = [models.Index(fields=["estado", "creada_el"])]
+
+    def __str__(self):
+        return f"ETL #{self.pk} ({self.estado})"
+
 # --- HECHOS ---
 
 class FactInscripcionTaller(models.Model):
+    inscripcion_id_oltp = models.BigIntegerField(unique=True, null=True, help_text="ID de Inscripcion")
     vecino = models.ForeignKey(DimVecino, on_delete=models.CASCADE)
     taller = models.ForeignKey(DimTaller, on_delete=models.CASCADE)
     fecha_inscripcion = models.DateTimeField()
+    fecha_key = models.IntegerField(null=True, help_text="yyyymmdd (DimFecha)")
+
+    class Meta:
+        indexes = [models.Index(fields=["fecha_key", "taller"])]
 
 class FactConsultaActa(models.Model):
+    log_id_oltp = models.BigIntegerField(unique=True, null=True, help_text="ID de LogConsultaActa")
     vecino = models.ForeignKey(DimVecino, on_delete=models.CASCADE)
     acta = models.ForeignKey(DimActa, on_delete=models.CASCADE)
     fecha_consulta = models.DateTimeField()
+    fecha_key = models.IntegerField(null=True, help_text="yyyymmdd (DimFecha)")
+
+    class Meta:
+        indexes = [models.Index(fields=["fecha_key", "acta"])]
 
 class FactParticipacionVotacion(models.Model):
+    voto_id_oltp = models.BigIntegerField(unique=True, null=True, help_text="ID de Voto")
     vecino = models.ForeignKey(DimVecino, on_delete=models.CASCADE)
     votacion = models.ForeignKey(DimVotacion, on_delete=models.CASCADE)
     fecha_voto = models.DateTimeField()
+    fecha_key = models.IntegerField(null=True, help_text="yyyymmdd (DimFecha)")
+
+    class Meta:
+        indexes = [models.Index(fields=["fecha_key", "votacion"])]
 
 class FactAsistenciaReunion(models.Model):
+    asistencia_id_oltp = models.BigIntegerField(unique=True, null=True, help_text="ID de Asistencia")
     vecino = models.ForeignKey(DimVecino, on_delete=models.CASCADE)
     reunion = models.ForeignKey(DimReunion, on_delete=models.CASCADE)
+    fecha_key = models.IntegerField(null=True, help_text="yyyymmdd de la reunión (DimFecha)")
+
+    class Meta:
+        indexes = [models.Index(fields=["fecha_key", "reunion"])]
 
 # --- ¡ESTAS SON LAS TABLAS QUE TE FALTABAN! ---
 
@@ -76,16 +164,120 @@ class FactCalidadTranscripcion(models.Model):
     palabras_correctas = models.IntegerField()
     precision_porcentaje = models.FloatField()
     origen = models.CharField(max_length=100, default="SIMULADO")
+    fecha_key = models.IntegerField(null=True, db_index=True, help_text="yyyymmdd (DimFecha)")
 
 class FactMetricasDiarias(models.Model):
-    fecha = models.DateField(auto_now_add=True)
+    # Sin auto_now_add: el ETL fija el día (un auto_now_add lo pisaría con hoy al crear)
+    fecha = models.DateField(default=timezone.localdate, unique=True)
     tiempo_respuesta_ms = models.IntegerField(help_text="Promedio en ms")
+    tiempo_respuesta_p95_ms = models.IntegerField(null=True, blank=True, help_text="Percentil 95 en ms")
+    total_peticiones = models.IntegerField(default=0)
     disponibilidad_sistema = models.FloatField(help_text="Porcentaje 0-100")
     fallos_votacion = models.IntegerField(default=0)
+    fecha_key = models.IntegerField(null=True, db_index=True, help_text="yyyymmdd (DimFecha)")
+
+class FactRendimientoRuta(models.Model):
+    """Agregados por ruta que vuelca core.middleware.MonitorRendimientoMiddleware."""
+    ventana_inicio = models.DateTimeField()
+    ventana_fin = models.DateTimeField()
+    ruta = models.CharField(max_length=255)
+    metodo = models.CharField(max_length=10)
+    instancia = models.CharField(max_length=100, help_text="host:pid del proceso que midió")
+    total_peticiones = models.IntegerField()
+    errores_4xx = models.IntegerField(default=0)
+    errores_5xx = models.IntegerField(default=0)
+    suma_ms = models.FloatField(help_text="Para calcular promedios ponderados")
+    p50_ms = models.FloatField()
+    p95_ms = models.FloatField()
+    p99_ms = models.FloatField()
+    max_ms = models.FloatField()
+    promedio_queries = models.FloatField(default=0)
+    promedio_ms_db = models.FloatField(default=0)
+    promedio_bytes = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["ventana_fin", "ruta"]),
+        ]
+
+class FactCompromisoVecino(models.Model):
+    """
+    Puntaje de participación por vecino (una fila por vecino, recalculada en
+    cada ETL por datamart.compromiso) a partir de asistencia, votos,
+    inscripciones y consultas de actas.
+    """
+    class Segmento(models.TextChoices):
+        ACTIVO = "ACTIVO", "Activo"
+        OCASIONAL = "OCASIONAL", "Ocasional"
+        EN_RIESGO = "EN_RIESGO", "En riesgo (nada en 3 meses)"
+        INACTIVO = "INACTIVO", "Inactivo (nada en 12 meses)"
+        NUNCA = "NUNCA", "Nunca ha participado"
+
+    vecino = models.OneToOneField(DimVecino, on_delete=models.CASCADE, primary_key=True)
+    fecha_key = models.IntegerField(help_text="yyyymmdd del cálculo (DimFecha)")
+    asistencias = models.IntegerField(default=0)
+    votos = models.IntegerField(default=0)
+    inscripciones = models.IntegerField(default=0)
+    consultas_actas = models.IntegerField(default=0)
+    ultima_participacion_key = models.IntegerField(null=True, blank=True, help_text="yyyymmdd")
+    dias_sin_participar = models.IntegerField(null=True, blank=True)
+    participaciones_3m = models.IntegerField(default=0)
+    participaciones_6m = models.IntegerField(default=0)
+    participaciones_12m = models.IntegerField(default=0)
+    puntaje_recencia = models.FloatField(default=0.0, help_text="0-1")
+    puntaje_frecuencia = models.FloatField(default=0.0, help_text="0-1 (percentil en 12 meses)")
+    puntaje = models.FloatField(default=0.0, help_text="0-100")
+    segmento = models.CharField(max_length=10, choices=Segmento.choices, default=Segmento.NUNCA)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["segmento", "puntaje"]),
+            models.Index(fields=["puntaje"]),
+        ]
 
 # Agregamos esta también por si el ETL antiguo la llama, para evitar errores
 class FactMetricasTecnicas(models.Model):
     fecha = models.DateField(auto_now_add=True)
     tiempo_respuesta_ms = models.IntegerField()
     disponibilidad = models.FloatField()
-    fallos_votacion = models.IntegerField(default=0)
\ No newline at end of file
+    fallos_votacion = models.IntegerField(default=0)
+
+# --- ROLLUPS DEL PANEL BI ---
+# Se recalculan al final de cada ETL (datamart.etl.cargar_rollups); el panel
+# solo los lee, así su costo no depende del tamaño de las tablas de hechos.
+
+class RollupResumen(models.Model):
+    """Fila única (pk=1) con los totales globales del panel."""
+    total_vecinos = models.IntegerField(default=0)
+    total_participantes = models.IntegerField(default=0, help_text="Vecinos que han votado al menos una vez")
+    usuarios_app = models.IntegerField(default=0)
+    precision_promedio = models.FloatField(default=0.0)
+    actualizado_el = models.DateTimeField(auto_now=True)
+
+class RollupOcupacionTaller(models.Model):
+    taller = models.OneToOneField(DimTaller, on_delete=models.CASCADE, primary_key=True)
+    nombre = models.CharField(max_length=255)
+    inscritos = models.IntegerField(default=0)
+    cupos = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["nombre"]
+
+class RollupConsultaActa(models.Model):
+    acta = models.OneToOneField(DimActa, on_delete=models.CASCADE, primary_key=True)
+    titulo = models.CharField(max_length=255)
+    consultas = models.IntegerField(default=0, db_index=True)
+
+class RollupAsistenciaReunion(models.Model):
+    reunion = models.OneToOneField(DimReunion, on_delete=models.CASCADE, primary_key=True)
+    fecha = models.DateField()
+    fecha_key = models.IntegerField(help_text="yyyymmdd (DimFecha)")
+    anio = models.IntegerField()
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["fecha_key"]), models.Index(fields=["anio"])]
+
+class RollupSector(models.Model):
+    sector = models.CharField(max_length=255, unique=True)
+    total_vecinos = models.IntegerField(default=0)
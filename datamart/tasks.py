@@ -0,0 +1,137 @@
+# datamart/tasks.py
+import logging
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from .etl import ETAPAS, ejecutar_etl
+from .models import EjecucionEtl
+
+logger = logging.getLogger(__name__)
+
+CLAVE_LOCK = "datamart:etl:lock"
+
+
+def _cache():
+    # Alias propio: la cache "default" tolera caídas de Redis y el lock no debe
+    return caches["etl"]
+
+
+def clave_progreso(ejecucion_id):
+    return f"datamart:etl:progreso:{ejecucion_id}"
+
+
+@contextmanager
+def lock_etl():
+    """
+    Lock distribuido en Redis (cache.add es atómico): entrega True si se
+    obtuvo. Solo lo libera si sigue siendo nuestro (pudo expirar y tomarlo otro).
+    """
+    token = uuid.uuid4().hex
+    cache = _cache()
+    adquirido = cache.add(CLAVE_LOCK, token, timeout=settings.ETL_LOCK_SEGUNDOS)
+    try:
+        yield adquirido
+    finally:
+        if adquirido and cache.get(CLAVE_LOCK) == token:
+            cache.delete(CLAVE_LOCK)
+
+
+def ejecucion_activa():
+    """
+    Corrida pendiente o en curso, si la hay. Las que superan ETL_LOCK_SEGUNDOS
+    se ignoran (el worker que las tenía murió).
+    """
+    limite = timezone.now() - timedelta(seconds=settings.ETL_LOCK_SEGUNDOS)
+    return (
+        EjecucionEtl.objects.filter(estado__in=EjecucionEtl.ACTIVOS, creada_el__gte=limite)
+        .order_by("-creada_el")
+        .first()
+    )
+
+
+def encolar_etl(usuario=None, completa=False):
+    """
+    Registra una corrida y la encola en Celery (al confirmar la transacción).
+    Si ya hay una activa, no encola otra. Devuelve (ejecucion, encolada).
+    """
+    activa = ejecucion_activa()
+    if activa:
+        return activa, False
+    ejecucion = EjecucionEtl.objects.create(solicitada_por=usuario, completa=completa)
+    transaction.on_commit(lambda: ejecutar_etl_task.delay(ejecucion.pk))
+    return ejecucion, True
+
+
+def progreso(ejecucion):
+    """Etapas terminadas de una corrida en curso (se publica en cache, fuera de la transacción del ETL)."""
+    try:
+        datos = _cache().get(clave_progreso(ejecucion.pk)) or {}
+    except RedisError:
+        # El panel se muestra igual, sin la etapa en curso
+        datos = {}
+    return {
+        "id": ejecucion.pk,
+        "estado": ejecucion.estado,
+        "etapa": datos.get("etapa", ""),
+        "completadas": datos.get("completadas", 0),
+        "total": len(ETAPAS) + (1 if ejecucion.completa else 0),
+    }
+
+
+@shared_task(ignore_result=True)
+def ejecutar_etl_task(ejecucion_id):
+    """Corre el ETL detrás del lock, así dos corridas nunca se solapan aunque haya varios workers."""
+    ejecucion = EjecucionEtl.objects.get(pk=ejecucion_id)
+    with lock_etl() as adquirido:
+        if not adquirido:
+            ejecucion.estado = EjecucionEtl.Estado.OMITIDA
+            ejecucion.terminada_el = timezone.now()
+            ejecucion.save(update_fields=["estado", "terminada_el"])
+            logger.info("ETL #%s omitido: ya hay otro en curso.", ejecucion_id)
+            return
+
+        ejecucion.estado = EjecucionEtl.Estado.EN_CURSO
+        ejecucion.iniciada_el = timezone.now()
+        ejecucion.save(update_fields=["estado", "iniciada_el"])
+
+        resultados = []
+
+        def informar(resultado):
+            resultados.append(resultado)
+            _cache().set(
+                clave_progreso(ejecucion_id),
+                {"etapa": resultado["etapa"], "completadas": len(resultados)},
+                timeout=settings.ETL_LOCK_SEGUNDOS,
+            )
+
+        try:
+            ejecutar_etl(completo=ejecucion.completa, informar=informar)
+            ejecucion.estado = EjecucionEtl.Estado.COMPLETADA
+        except Exception as e:
+            logger.exception("Error en ETL #%s", ejecucion_id)
+            ejecucion.estado = EjecucionEtl.Estado.ERROR
+            ejecucion.error = str(e)
+        finally:
+            ejecucion.resultados = [
+                {"etapa": r["etapa"], "filas": r["filas"], "segundos": round(r["segundos"], 3)}
+                for r in resultados
+            ]
+            ejecucion.terminada_el = timezone.now()
+            ejecucion.save(update_fields=["estado", "error", "resultados", "terminada_el"])
+            _cache().delete(clave_progreso(ejecucion_id))
+
+
+@shared_task(ignore_result=True)
+def etl_nocturno():
+    """Carga incremental programada (CELERY_BEAT_SCHEDULE)."""
+    ejecucion, encolada = encolar_etl()
+    if not encolada:
+        logger.info("ETL nocturno omitido: ya hay una corrida activa (#%s).", ejecucion.pk)
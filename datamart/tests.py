@@ -1,3 +1,215 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.models import Perfil
+
+from reuniones.models import Acta, Asistencia, LogConsultaActa, Reunion
+from talleres.models import Inscripcion, Taller
+from votaciones.models import Opcion, Votacion, Voto
+
+from . import etl
+from .compromiso import dias_desde_claves
+from .exportacion import ErrorExportacion, leer_clave_fecha
+from .fechas import clave_fecha, domingo_de_pascua, feriados_chile, rango_periodo
+from .models import (
+    DimVecino, FactAsistenciaReunion, FactConsultaActa, FactInscripcionTaller,
+    FactMetricasDiarias, FactParticipacionVotacion, RollupResumen,
+)
+
+HECHOS = (FactConsultaActa, FactInscripcionTaller, FactParticipacionVotacion, FactAsistenciaReunion)
+
+
+def contar_hechos():
+    return {modelo.__name__: modelo.objects.count() for modelo in HECHOS}
+
+
+def usuario_con_rol(nombre, rol, rut):
+    usuario = User.objects.create_user(nombre, f"{nombre}@example.com", "x")
+    Perfil.objects.create(usuario=usuario, rol=rol, rut=rut)
+    return usuario
+
+
+class EtlIncrementalTests(TestCase):
+    """La carga incremental debe terminar igual que una recarga completa (--full)."""
+
+    def setUp(self):
+        self.ana = User.objects.create_user("ana", "ana@example.com", "x")
+        self.beto = User.objects.create_user("beto", "beto@example.com", "x")
+        self.acta = self._acta("Reunión de marzo")
+        self.taller = Taller.objects.create(
+            nombre="Huerto", descripcion="-", cupos_totales=10,
+            fecha_inicio=timezone.now(), fecha_termino=timezone.now() + timedelta(hours=2),
+        )
+        self.votacion = Votacion.objects.create(pregunta="¿Plaza?", fecha_cierre=timezone.now() + timedelta(days=3))
+        self.opcion = Opcion.objects.create(votacion=self.votacion, texto="Sí")
+
+        for vecino in (self.ana, self.beto):
+            LogConsultaActa.objects.create(acta=self.acta, vecino=vecino)
+            Inscripcion.objects.create(vecino=vecino, taller=self.taller)
+            Voto.objects.create(opcion=self.opcion, votante=vecino)
+            Asistencia.objects.create(reunion=self.acta.reunion, vecino=vecino, presente=True)
+
+    def _acta(self, titulo):
+        reunion = Reunion.objects.create(titulo=titulo, tabla="-", fecha=timezone.now())
+        return Acta.objects.create(reunion=reunion)
+
+    def test_incremental_igual_a_completa(self):
+        etl.ejecutar_etl()
+
+        # Vecino desactivado y reactivado entre corridas
+        User.objects.filter(pk=self.beto.pk).update(is_active=False)
+        LogConsultaActa.objects.create(acta=self.acta, vecino=self.beto)
+        etl.ejecutar_etl()
+        User.objects.filter(pk=self.beto.pk).update(is_active=True)
+        etl.ejecutar_etl()
+
+        # Acta creada durante la corrida: sus consultas llegan antes que su dimensión
+        nueva = self._acta("Reunión de abril")
+        LogConsultaActa.objects.create(acta=nueva, vecino=self.ana)
+        etl.cargar_fact_consultas_actas()
+        LogConsultaActa.objects.create(acta=self.acta, vecino=self.ana)
+        etl.ejecutar_etl()
+
+        incremental = contar_hechos()
+        etl.ejecutar_etl(completo=True)
+        self.assertEqual(incremental, contar_hechos())
+        self.assertEqual(incremental["FactConsultaActa"], 5)
+
+    def test_marca_no_pasa_filas_sin_dimension(self):
+        etl.ejecutar_etl()
+        nueva = self._acta("Reunión de abril")
+        pendiente = LogConsultaActa.objects.create(acta=nueva, vecino=self.ana)
+        LogConsultaActa.objects.create(acta=self.acta, vecino=self.ana)
+
+        self.assertEqual(etl.cargar_fact_consultas_actas(), 1)
+        self.assertEqual(etl.leer_marca("reuniones.LogConsultaActa"), pendiente.pk - 1)
+
+        etl.cargar_dim_actas()
+        etl.cargar_fact_consultas_actas()
+        self.assertTrue(FactConsultaActa.objects.filter(log_id_oltp=pendiente.pk).exists())
+        self.assertEqual(FactConsultaActa.objects.count(), 4)
+
+    def test_fila_confirmada_tarde_bajo_la_marca(self):
+        etl.ejecutar_etl()
+        marca = etl.leer_marca("reuniones.LogConsultaActa")
+        # Una transacción lenta confirma su fila después de otra con ID mayor
+        LogConsultaActa.objects.create(id=marca + 2, acta=self.acta, vecino=self.ana)
+        self.assertEqual(etl.cargar_fact_consultas_actas(), 1)
+        LogConsultaActa.objects.create(id=marca + 1, acta=self.acta, vecino=self.beto)
+
+        self.assertEqual(etl.cargar_fact_consultas_actas(), 1)
+        self.assertTrue(FactConsultaActa.objects.filter(log_id_oltp=marca + 1).exists())
+        self.assertEqual(etl.cargar_fact_consultas_actas(), 0)
+        self.assertEqual(etl.leer_marca("reuniones.LogConsultaActa"), marca + 2)
+
+    def test_vecino_desactivado_conserva_hechos(self):
+        etl.ejecutar_etl()
+        User.objects.filter(pk=self.beto.pk).update(is_active=False)
+        etl.ejecutar_etl()
+
+        vecino = DimVecino.objects.get(vecino_id_oltp=self.beto.pk)
+        self.assertFalse(vecino.activo)
+        self.assertEqual(FactConsultaActa.objects.filter(vecino=vecino).count(), 1)
+        self.assertEqual(FactParticipacionVotacion.objects.filter(vecino=vecino).count(), 1)
+        # El panel solo cuenta a los vecinos activos
+        self.assertEqual(RollupResumen.objects.get().total_vecinos, 1)
+
+    def test_baja_en_origen_quita_hechos(self):
+        etl.ejecutar_etl()
+        Inscripcion.objects.filter(vecino=self.ana).delete()
+        Voto.objects.filter(votante=self.ana).delete()
+        Asistencia.objects.filter(vecino=self.ana).update(presente=False)
+        etl.ejecutar_etl()
+        self.assertEqual(contar_hechos(), {
+            "FactConsultaActa": 2,
+            "FactInscripcionTaller": 1,
+            "FactParticipacionVotacion": 1,
+            "FactAsistenciaReunion": 1,
+        })
+
+
+RENDIMIENTO = {
+    "tiempo_medio_ms": 120.4, "p95_ms": 480.0, "peticiones": 900,
+    "disponibilidad": 99.5, "fallos_votacion": 0,
+}
+
+
+@mock.patch.object(etl, "ultimas_24_horas", lambda: RENDIMIENTO)
+class MetricasDiariasTests(TestCase):
+    def test_una_fila_por_dia(self):
+        etl.cargar_metricas_diarias()
+        etl.cargar_metricas_diarias()
+        metricas = FactMetricasDiarias.objects.get()
+        self.assertEqual((metricas.fecha, metricas.tiempo_respuesta_ms), (timezone.localdate(), 120))
+
+    def test_fecha_explicita_se_respeta(self):
+        # Un relleno de días anteriores no debe quedar con la fecha de hoy
+        ayer = timezone.localdate() - timedelta(days=1)
+        FactMetricasDiarias.objects.create(fecha=ayer, tiempo_respuesta_ms=1, disponibilidad_sistema=100)
+        etl.cargar_metricas_diarias()
+        self.assertEqual(sorted(FactMetricasDiarias.objects.values_list("fecha", flat=True)), [ayer, timezone.localdate()])
+
+
+class ExportacionTests(SimpleTestCase):
+    def test_leer_clave_fecha(self):
+        self.assertEqual(leer_clave_fecha("2025-01-31"), 20250131)
+        self.assertEqual(leer_clave_fecha("20250131"), 20250131)
+        self.assertIsNone(leer_clave_fecha(""))
+        with self.assertRaises(ErrorExportacion):
+            leer_clave_fecha("31/01/2025")
+
+
+class ExportacionPermisosTests(TestCase):
+    def setUp(self):
+        DimVecino.objects.create(vecino_id_oltp=1, nombre_completo="Ana Pérez")
+
+    def descargar(self, usuario, url):
+        token, _ = Token.objects.get_or_create(user=usuario)
+        return self.client.get(url, HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_vecino_no_exporta(self):
+        vecino = usuario_con_rol("vecino", Perfil.Roles.VECINO, "11111111-1")
+        for url in (reverse("api_exportar_tablas"), reverse("api_exportar_tabla", args=["dimvecino"])):
+            self.assertEqual(self.descargar(vecino, url).status_code, 403, url)
+
+    def test_directiva_exporta(self):
+        tesorero = usuario_con_rol("tesorero", Perfil.Roles.TESORERO, "22222222-2")
+        respuesta = self.descargar(tesorero, reverse("api_exportar_tabla", args=["dimvecino"]))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn("Ana Pérez", b"".join(respuesta.streaming_content).decode())
+
+
+class CompromisoTests(SimpleTestCase):
+    def test_dias_desde_claves(self):
+        fechas = [date(1970, 1, 1), date(2024, 2, 29), date(2024, 12, 31)]
+        esperado = [(f - date(1970, 1, 1)).days for f in fechas]
+        self.assertEqual(dias_desde_claves([clave_fecha(f) for f in fechas]).tolist(), esperado)
+
+
+class CompromisoPermisosTests(TestCase):
+    def test_solo_directiva(self):
+        url = reverse("compromiso_vecinos")
+        self.client.force_login(usuario_con_rol("vecino", Perfil.Roles.VECINO, "11111111-1"))
+        self.assertRedirects(self.client.get(url), reverse("sin_permiso"), fetch_redirect_response=False)
+
+        self.client.force_login(usuario_con_rol("secretaria", Perfil.Roles.SECRETARIA, "22222222-2"))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class FechasTests(SimpleTestCase):
+    def test_clave_fecha_y_periodos(self):
+        self.assertEqual(clave_fecha(date(2024, 3, 5)), 20240305)
+        self.assertEqual(rango_periodo(2024, 2), (20240201, 20240229))
+        self.assertEqual(rango_periodo(2024), (20240101, 20241231))
+
+    def test_feriados(self):
+        self.assertEqual(domingo_de_pascua(2024), date(2024, 3, 31))
+        self.assertEqual(feriados_chile(2024)[date(2024, 3, 29)], "Viernes Santo")
+        # San Pedro y San Pablo 2023 cayó jueves: se traslada al lunes anterior
+        self.assertEqual(feriados_chile(2023)[date(2023, 6, 26)], "San Pedro y San Pablo")
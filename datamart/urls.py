@@ -1,9 +1,13 @@
 # datamart/urls.py
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('panel-bi/', views.panel_bi_view, name='panel_bi'),
     path('ejecutar-etl/', views.ejecutar_etl_view, name='ejecutar_etl'),
+    path('estado-etl/', views.estado_etl_view, name='estado_etl'),
+    path('compromiso/', views.compromiso_vecinos_view, name='compromiso_vecinos'),
     path('descargar-informe/', views.generar_pdf_view, name='descargar_pdf'),
+    path('api/exportar/', api.api_exportar_tablas, name='api_exportar_tablas'),
+    path('api/exportar/<str:tabla>/', api.api_exportar_tabla, name='api_exportar_tabla'),
 ]
\ No newline at end of file
@@ -1,23 +1,26 @@
 import json
-import re  # para limpiar números en las direcciones
 import calendar  # (ya casi no lo usamos, pero lo puedes dejar)
+from io import BytesIO
 from datetime import timedelta
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.core.management import call_command
-from django.db.models import Count, Avg
-from django.db.models.functions import ExtractYear
-from django.http import HttpResponse
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, redirect
 from django.template.loader import get_template
 from django.utils import timezone
 from xhtml2pdf import pisa
 
+from core.authz import role_required
+from datamart import cache_panel
+from datamart.fechas import rango_periodo
+from datamart.tasks import ejecucion_activa, encolar_etl, progreso
 from datamart.models import (
-    FactInscripcionTaller, DimTaller, FactConsultaActa,
-    FactParticipacionVotacion, DimVecino, FactAsistenciaReunion,
-    DimActa, FactMetricasDiarias
+    FactCompromisoVecino, FactMetricasDiarias, RollupAsistenciaReunion, RollupConsultaActa,
+    RollupOcupacionTaller, RollupResumen, RollupSector,
 )
 
 # 🔹 Meses en español
@@ -43,101 +46,78 @@ def es_usuario_directiva(user):
 
 
 def construir_datos_panel_bi(mes=None, anio=None):
+    """
+    Arma los datos del panel desde las tablas Rollup* que recalcula el ETL
+    (lecturas por PK / índice, sin agregaciones sobre los hechos).
+    """
+    resumen = RollupResumen.objects.filter(pk=1).first() or RollupResumen()
+
     # 1. Ocupación Talleres
-    inscritos_qs = (
-        FactInscripcionTaller.objects
-        .values("taller__id")
-        .annotate(total_inscritos=Count("id"))
+    data_ocupacion_talleres = list(
+        RollupOcupacionTaller.objects.values("nombre", "inscritos", "cupos")
     )
-    inscritos_por_id = {
-        item["taller__id"]: item["total_inscritos"]
-        for item in inscritos_qs
-    }
-    data_ocupacion_talleres = []
-    for taller in DimTaller.objects.all().order_by("nombre"):
-        data_ocupacion_talleres.append({
-            "nombre": taller.nombre,
-            "inscritos": inscritos_por_id.get(taller.id, 0),
-            "cupos": taller.cupos_totales,
-        })
 
     # 2. Consulta Actas
-    data_consulta_actas = list(
-        FactConsultaActa.objects
-        .values("acta__titulo")
-        .annotate(consultas=Count("id"))
-        .order_by("-consultas")[:10]
-    )
+    data_consulta_actas = [
+        {"acta__titulo": titulo, "consultas": consultas}
+        for titulo, consultas in RollupConsultaActa.objects
+        .order_by("-consultas")
+        .values_list("titulo", "consultas")[:10]
+    ]
 
     # 3. Participación Votaciones
-    total_vecinos = DimVecino.objects.count()
-    total_participantes = (
-        FactParticipacionVotacion.objects
-        .values("vecino_id").distinct()
-        .count()
-    )
+    total_vecinos = resumen.total_vecinos
     porcentaje_actual = (
-        float(total_participantes) / float(total_vecinos) * 100.0
+        float(resumen.total_participantes) / float(total_vecinos) * 100.0
         if total_vecinos > 0 else 0.0
     )
     data_participacion = {
         "total_vecinos": total_vecinos,
-        "total_participantes": total_participantes,
+        "total_participantes": resumen.total_participantes,
         "porcentaje_actual": porcentaje_actual,
         "porcentaje_meta": 50.0,
     }
 
-    # 4. Demografía por sector
-    data_demografia_sector = list(
-        DimVecino.objects
-        .values("direccion_sector")
-        .annotate(total_vecinos=Count("id"))
+    # 4. Demografía por sector (el nombre ya viene limpio desde el ETL)
+    data_demografia_sector = [
+        {"direccion_sector": sector, "total_vecinos": n}
+        for sector, n in RollupSector.objects
         .order_by("-total_vecinos")
-    )
-
-    for row in data_demografia_sector:
-        original = row["direccion_sector"] or ""
-        solo_texto = re.sub(r"\d+", "", original).strip()
-        row["direccion_sector"] = solo_texto or "Sin Dirección"
+        .values_list("sector", "total_vecinos")
+    ]
 
     # 5. Asistencia Reuniones (filtro mes/año opcional)
-    asistencia_qs = FactAsistenciaReunion.objects.all()
-
+    asistencia_qs = RollupAsistenciaReunion.objects.all()
     if mes and anio:
-        asistencia_qs = asistencia_qs.filter(
-            reunion__fecha__year=anio,
-            reunion__fecha__month=mes,
-        )
-
-    asistencia_qs = (
-        asistencia_qs
-        .values("reunion__fecha")
-        .annotate(total=Count("id"))
-        .order_by("reunion__fecha")
-    )
+        # Rango sobre la clave entera yyyymmdd: usa el índice
+        asistencia_qs = asistencia_qs.filter(fecha_key__range=rango_periodo(anio, mes))
 
+    # Varias reuniones el mismo día se muestran como un solo punto
+    totales_por_fecha = {}
+    for fecha, total in asistencia_qs.order_by("fecha").values_list("fecha", "total"):
+        totales_por_fecha[fecha] = totales_por_fecha.get(fecha, 0) + total
     data_asistencia = [
-        {
-            "fecha": item["reunion__fecha"].strftime("%Y-%m-%d"),
-            "total": item["total"],
-        }
-        for item in asistencia_qs
+        {"fecha": fecha.strftime("%Y-%m-%d"), "total": total}
+        for fecha, total in totales_por_fecha.items()
     ]
 
     # 6. Uso App Móvil
-    usuarios_app = DimVecino.objects.filter(usa_app_movil=True).count()
     data_uso_app = {
-        "app": usuarios_app,
-        "web": total_vecinos - usuarios_app,
+        "app": resumen.usuarios_app,
+        "web": total_vecinos - resumen.usuarios_app,
     }
 
     # 7. Métricas Técnicas
     metricas = FactMetricasDiarias.objects.last()
-    precision_avg = (
-        DimActa.objects.aggregate(Avg("precision_transcripcion"))[
-            "precision_transcripcion__avg"
-        ] or 0
+
+    # 8. Compromiso de vecinos por segmento (una fila por vecino, tabla chica)
+    por_segmento = dict(
+        FactCompromisoVecino.objects.values_list("segmento").annotate(n=Count("vecino"))
     )
+    compromiso_segmentos = [
+        {"segmento": valor, "etiqueta": etiqueta, "total": por_segmento.get(valor, 0)}
+        for valor, etiqueta in FactCompromisoVecino.Segmento.choices
+    ]
 
     return {
         "ocupacion_talleres": data_ocupacion_talleres,
@@ -147,24 +127,26 @@ def construir_datos_panel_bi(mes=None, anio=None):
         "data_asistencia": data_asistencia,
         "data_uso_app": data_uso_app,
         "metricas": metricas,
-        "precision": round(precision_avg, 1),
+        "precision": round(resumen.precision_promedio, 1),
+        "compromiso_segmentos": compromiso_segmentos,
+        # Cuándo el ETL recalculó estos datos (None si aún no corre)
+        "datos_al": resumen.actualizado_el,
     }
 
 
-@login_required
-@user_passes_test(es_usuario_directiva)
-def panel_bi_view(request):
-    # Filtros
+def _filtros_periodo(request):
     mes_str = (request.GET.get("mes") or "").strip()
     anio_str = (request.GET.get("anio") or "").strip()
-
     mes = int(mes_str) if mes_str.isdigit() else None
     anio = int(anio_str) if anio_str.isdigit() else None
+    return mes, anio
+
 
+def _datos_panel(mes, anio):
+    """Todo lo que muestra el panel para un filtro (cacheable: ya serializado)."""
     # Años disponibles desde la BD
     anios_opciones = list(
-        FactAsistenciaReunion.objects
-        .annotate(anio=ExtractYear("reunion__fecha"))
+        RollupAsistenciaReunion.objects
         .values_list("anio", flat=True)
         .distinct()
         .order_by("anio")
@@ -176,16 +158,8 @@ def panel_bi_view(request):
         anio_actual = now.year
         anios_opciones = list(range(anio_actual - 2, anio_actual + 1))
 
-    # Datos del panel
     datos = construir_datos_panel_bi(mes=mes, anio=anio)
-
-    # Meses en español
-    meses_opciones = [
-        {"numero": i, "nombre": MESES_ES[i]}
-        for i in range(1, 13)
-    ]
-
-    context = {
+    return {
         "data_ocupacion_talleres": json.dumps(datos["ocupacion_talleres"]),
         "data_consulta_actas": json.dumps(datos["consulta_actas"]),
         "data_participacion": json.dumps(datos["participacion"]),
@@ -194,32 +168,103 @@ def panel_bi_view(request):
         "data_uso_app": json.dumps(datos["data_uso_app"]),
         "metricas": datos["metricas"],
         "precision": datos["precision"],
-        "meses_opciones": meses_opciones,
+        "compromiso_segmentos": datos["compromiso_segmentos"],
         "anios_opciones": anios_opciones,
+    }
+
+
+@login_required
+@user_passes_test(es_usuario_directiva)
+def panel_bi_view(request):
+    mes, anio = _filtros_periodo(request)
+
+    # Solo cambia cuando corre el ETL: se cachea por filtro y generación
+    context = dict(cache_panel.obtener_o_calcular("panel", mes, anio, lambda: _datos_panel(mes, anio)))
+
+    etl_activo = ejecucion_activa()
+    context.update({
+        # Meses en español
+        "meses_opciones": [
+            {"numero": i, "nombre": MESES_ES[i]}
+            for i in range(1, 13)
+        ],
         "mes_seleccionado": mes,
         "anio_seleccionado": anio,
-    }
+        "etl_activo": etl_activo,
+        "etl_progreso": progreso(etl_activo) if etl_activo else None,
+    })
     return render(request, "datamart/panel_bi.html", context)
 
 
+ORDEN_COMPROMISO = {
+    "puntaje": ("puntaje", "-dias_sin_participar"),
+    "-puntaje": ("-puntaje", "dias_sin_participar"),
+    "dias": ("-dias_sin_participar", "puntaje"),
+}
+
+
+@login_required
+@role_required("datamart", "compromiso")
+def compromiso_vecinos_view(request):
+    """Ranking de vecinos por puntaje de compromiso (lo calcula el ETL), con filtros."""
+    segmento = request.GET.get("segmento", "")
+    sector = (request.GET.get("sector") or "").strip()
+    orden = request.GET.get("orden", "puntaje")
+    if orden not in ORDEN_COMPROMISO:
+        orden = "puntaje"
+
+    qs = FactCompromisoVecino.objects.select_related("vecino")
+    if segmento in FactCompromisoVecino.Segmento.values:
+        qs = qs.filter(segmento=segmento)
+    if sector:
+        qs = qs.filter(vecino__direccion_sector__icontains=sector)
+    # Los que nunca participaron (dias_sin_participar NULL) quedan juntos al ordenar por puntaje
+    qs = qs.order_by(*ORDEN_COMPROMISO[orden], "vecino_id")
+
+    page_obj = Paginator(qs, 50).get_page(request.GET.get("page"))
+    filtros = request.GET.copy()
+    filtros.pop("page", None)
+
+    return render(request, "datamart/compromiso_vecinos.html", {
+        "page_obj": page_obj,
+        "segmentos": FactCompromisoVecino.Segmento.choices,
+        "segmento_seleccionado": segmento,
+        "sector": sector,
+        "orden": orden,
+        "filtros_query": filtros.urlencode(),
+    })
+
+
 @login_required
 @user_passes_test(es_usuario_directiva)
 def ejecutar_etl_view(request):
+    # Solo encola: el ETL corre en Celery (datamart.tasks.ejecutar_etl_task)
     if request.method == "POST":
-        try:
-            call_command("procesar_etl")
-            messages.success(request, "Datos actualizados correctamente.")
-        except Exception as e:
-            messages.error(request, f"Error en ETL: {e}")
+        ejecucion, encolada = encolar_etl(usuario=request.user)
+        if encolada:
+            messages.success(request, "Actualización de datos iniciada. El panel se recargará al terminar.")
+        else:
+            messages.info(request, "Ya hay una actualización de datos en curso.")
     return redirect("panel_bi")
 
 
 @login_required
 @user_passes_test(es_usuario_directiva)
-def generar_pdf_view(request):
-    datos = construir_datos_panel_bi()
+def estado_etl_view(request):
+    """Estado de la corrida activa (lo consulta el panel mientras se actualiza)."""
+    ejecucion = ejecucion_activa()
+    if ejecucion is None:
+        return JsonResponse({"activa": False})
+    return JsonResponse({"activa": True, **progreso(ejecucion)})
+
+
+def _renderizar_pdf(request, mes, anio):
+    """Devuelve los bytes del informe, o None si xhtml2pdf falla."""
+    datos = construir_datos_panel_bi(mes=mes, anio=anio)
     context = {
-        "fecha_generacion": timezone.localtime(),
+        # El PDF se cachea por generación del ETL: se imprime la fecha de los
+        # datos, no la de este render
+        "datos_al": datos["datos_al"],
         "ocupacion_talleres": datos["ocupacion_talleres"],
         "consulta_actas": datos["consulta_actas"],
         "participacion": datos["participacion"],
@@ -230,9 +275,27 @@ def generar_pdf_view(request):
     }
     template = get_template("datamart/reporte_pdf.html")
     html = template.render(context, request=request)
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = 'attachment; filename="Informe_Gestion.pdf"'
-    pisa_status = pisa.CreatePDF(html, dest=response)
+    salida = BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=salida)
     if pisa_status.err:
-        return HttpResponse("Error PDF")
+        return None
+    return salida.getvalue()
+
+
+@login_required
+@user_passes_test(es_usuario_directiva)
+def generar_pdf_view(request):
+    mes, anio = _filtros_periodo(request)
+    clave = cache_panel.clave("pdf", mes, anio)
+
+    # El PDF renderizado se cachea igual que el panel (xhtml2pdf es lo caro)
+    pdf = cache.get(clave)
+    if pdf is None:
+        pdf = _renderizar_pdf(request, mes, anio)
+        if pdf is None:
+            return HttpResponse("Error PDF")
+        cache.set(clave, pdf, timeout=cache_panel.TIMEOUT)
+
+    response = HttpResponse(pdf, content_type="application/pdf")
+    response["Content-Disposition"] = 'attachment; filename="Informe_Gestion.pdf"'
     return response
@@ -51,4 +51,5 @@ class ComentarioAdmin(admin.ModelAdmin):
 @admin.register(ArchivoAdjunto)
 class ArchivoAdjuntoAdmin(admin.ModelAdmin):
     list_display = ('archivo', 'tipo_archivo', 'publicacion', 'autor', 'es_mensaje')
-    list_filter = ('es_mensaje', 'fecha_creacion')
\ No newline at end of file
+    list_filter = ('es_mensaje', 'fecha_creacion')
+    search_fields = ('descripcion', 'transcripcion', 'autor__username')
\ No newline at end of file
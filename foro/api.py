@@ -10,11 +10,13 @@ from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.db.models import Count
-from itertools import chain
-from operator import attrgetter
 
 from foro.models import Publicacion, Comentario, ArchivoAdjunto
 from foro.forms import PublicacionForm, ComentarioCreateForm
+from foro.arbol import armar_arbol, comentarios_del_hilo
+from foro.conversacion import pagina_conversacion, total_conversacion
+from foro.likes import alternar_like
+from foro.paginacion import CursorInvalido, pagina_feed
 from core.authz import can, role_required  # 👈 ÚNICA IMPORTACIÓN CORRECTA DE 'can'
 
 from .serializers import (
@@ -34,7 +36,10 @@ class NestedComentarioSerializer(serializers.ModelSerializer):
         fields = ["id", "autor_username", "contenido", "fecha_creacion", "parent", "respuestas"]
 
     def get_respuestas(self, obj):
-        hijos = obj.respuestas.all().select_related("autor")
+        # Árbol ya armado en memoria (foro.arbol.armar_arbol); si no, se consulta el nivel
+        hijos = getattr(obj, "hijos", None)
+        if hijos is None:
+            hijos = obj.respuestas.all().select_related("autor")
         return NestedComentarioSerializer(hijos, many=True, context=self.context).data
 
 # ------------------------------------------------------------------------------
@@ -53,6 +58,13 @@ class PublicacionViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        # Feed por cursor (foro.paginacion) en vez de todas las publicaciones de una vez
+        try:
+            return Response(pagina_feed(request, Publicacion.objects.filter(visible=True)))
+        except CursorInvalido as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
     def perform_create(self, serializer):
         serializer.save(autor=self.request.user)
 
@@ -63,12 +75,15 @@ class PublicacionViewSet(viewsets.ModelViewSet):
         if request.method.lower() == "get":
             tree = request.query_params.get("tree") == "1"
             if tree:
-                raices = (
-                    Comentario.objects
-                    .filter(publicacion=publicacion, parent__isnull=True)
-                    .select_related("autor")
-                    .prefetch_related("respuestas__autor", "respuestas__respuestas__autor")
-                )
+                # Hilo completo (o el subárbol de ?raiz=<id>, hasta ?niveles=) en una consulta
+                raiz = None
+                if request.query_params.get("raiz"):
+                    raiz = get_object_or_404(Comentario, pk=request.query_params["raiz"], publicacion=publicacion)
+                try:
+                    niveles = int(request.query_params["niveles"]) if request.query_params.get("niveles") else None
+                except ValueError:
+                    return Response({"detail": "niveles debe ser un número."}, status=status.HTTP_400_BAD_REQUEST)
+                raices = armar_arbol(comentarios_del_hilo(publicacion.pk, raiz=raiz, niveles=niveles))
                 data = NestedComentarioSerializer(raices, many=True, context={"request": request}).data
                 return Response(data, status=status.HTTP_200_OK)
 
@@ -95,9 +110,10 @@ class PublicacionViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"], url_path="mias")
     def mias(self, request):
-        qs = self.get_queryset().filter(autor=request.user)
-        data = self.get_serializer(qs, many=True, context={"request": request}).data
-        return Response(data, status=status.HTTP_200_OK)
+        try:
+            return Response(pagina_feed(request, Publicacion.objects.filter(autor=request.user)))
+        except CursorInvalido as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
 # ------------------------------------------------------------------------------
@@ -180,18 +196,14 @@ def detalle_publicacion(request, pk):
     else:
         form = ComentarioCreateForm()
 
-    comentarios = publicacion.comentarios.filter(visible=True).select_related('autor')
-    adjuntos_chat = publicacion.adjuntos.filter(es_mensaje=True).select_related('autor')
-
-    conversacion = sorted(
-        chain(comentarios, adjuntos_chat),
-        key=attrgetter('fecha_creacion')
-    )
+    conversacion, anteriores = pagina_conversacion(publicacion.pk)
 
     return render(request, 'foro/detalle_publicacion.html', {
         'publicacion': publicacion,
         'form': form,
         'conversacion': conversacion, 
+        'conversacion_anteriores': anteriores,
+        'total_conversacion': total_conversacion(publicacion.pk),
         'es_moderador': es_moderador
     })
 
@@ -272,11 +284,8 @@ def eliminar_publicacion_web(request, pk):
 @login_required
 def reaccionar_comentario_web(request, pk):
     comentario = get_object_or_404(Comentario, pk=pk, visible=True)
-    if request.user in comentario.likes.all():
-        comentario.likes.remove(request.user)
-    else:
-        comentario.likes.add(request.user)
-    return redirect("foro:detalle_publicacion", pk=comentario.publicacion.pk)
+    alternar_like(comentario, request.user)
+    return redirect("foro:detalle_publicacion", pk=comentario.publicacion_id)
 
 
 # ------------------------------------------------------------------------------
@@ -419,24 +428,12 @@ def api_eliminar_adjunto(request, pk):
 @permission_classes([IsAuthenticated])
 def api_toggle_like_comentario(request, pk):
     comentario = get_object_or_404(Comentario, pk=pk, visible=True)
-    usuario = request.user
-    if usuario in comentario.likes.all():
-        comentario.likes.remove(usuario)
-        liked = False
-    else:
-        comentario.likes.add(usuario)
-        liked = True
-    return Response({"liked": liked, "total_likes": comentario.likes.count()})
+    liked, total_likes = alternar_like(comentario, request.user)
+    return Response({"liked": liked, "total_likes": total_likes})
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def api_toggle_like_adjunto(request, pk):
     adjunto = get_object_or_404(ArchivoAdjunto, pk=pk)
-    usuario = request.user
-    if usuario in adjunto.likes.all():
-        adjunto.likes.remove(usuario)
-        liked = False
-    else:
-        adjunto.likes.add(usuario)
-        liked = True
-    return Response({"liked": liked, "total_likes": adjunto.likes.count()})
\ No newline at end of file
+    liked, total_likes = alternar_like(adjunto, request.user)
+    return Response({"liked": liked, "total_likes": total_likes})
\ No newline at end of file
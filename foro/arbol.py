@@ -0,0 +1,48 @@
+# foro/arbol.py
+"""
+Hilos de comentarios a cualquier profundidad.
+
+Cada comentario guarda su ruta materializada (ver Comentario.save), así un
+hilo completo o un subárbol sale en una sola consulta ordenada por 'ruta'
+(preorden: cada padre antes que sus respuestas) y se arma en memoria en una
+pasada.
+"""
+from .models import Comentario
+
+
+def comentarios_del_hilo(publicacion_id, raiz=None, niveles=None):
+    """
+    Comentarios de la publicación en preorden. Con 'raiz' solo su subárbol
+    (incluida la raíz); con 'niveles', hasta esa cantidad de niveles bajo ella.
+    """
+    qs = Comentario.objects.filter(publicacion_id=publicacion_id).select_related("autor")
+    base = 0
+    if raiz is not None:
+        qs = qs.filter(ruta__startswith=raiz.ruta)
+        base = raiz.profundidad
+    if niveles is not None:
+        qs = qs.filter(profundidad__lte=base + niveles)
+    return qs.order_by("ruta")
+
+
+def armar_arbol(comentarios):
+    """
+    Lista en preorden -> raíces, con las respuestas de cada nodo en '.hijos'.
+    Un nodo cuyo padre no vino en la lista (raíz de un subárbol) queda como raíz.
+    """
+    nodos = {}
+    raices = []
+    for c in comentarios:
+        c.hijos = []
+        nodos[c.id] = c
+        padre = nodos.get(c.parent_id)
+        if padre is not None:
+            padre.hijos.append(c)
+        else:
+            raices.append(c)
+    return raices
+
+
+def arbol_a_dicts(raices, a_dict):
+    """Serializa el árbol con 'a_dict' por nodo, anidando en 'respuestas' (profundidad acotada por la ruta)."""
+    return [{**a_dict(c), "respuestas": arbol_a_dicts(c.hijos, a_dict)} for c in raices]
@@ -0,0 +1,208 @@
+# foro/busqueda.py
+"""
+Buscador del foro sobre un índice invertido propio (TerminoBusqueda).
+
+Se indexa el texto de las publicaciones, de los comentarios visibles y la
+descripción y transcripción de los adjuntos. El texto se normaliza igual al
+indexar y al buscar: minúsculas, sin tildes ni diéresis ("reunión" =
+"reunion", "pingüino" = "pinguino") y sin palabras vacías. Cada documento
+reescribe sus filas al guardarse (foro.signals).
+
+Una búsqueda devuelve las publicaciones cuyo hilo contiene todos los
+términos, de mayor a menor puntaje: apariciones ponderadas por tipo (el
+texto de la publicación pesa más) y por lo raro del término. Las consultas
+leen solo las filas de los términos buscados, así que el tiempo depende de
+qué tan comunes son esos términos y no del tamaño del foro.
+"""
+import base64
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+
+from core.authz import can
+
+from . import paginacion
+from .models import ArchivoAdjunto, Comentario, Publicacion, TerminoBusqueda
+from .paginacion import CursorInvalido
+
+Tipo = TerminoBusqueda.Tipo
+
+PESOS = {Tipo.PUBLICACION: 3, Tipo.COMENTARIO: 1, Tipo.ADJUNTO: 1}
+LARGO_MINIMO = 2
+LARGO_MAXIMO = TerminoBusqueda._meta.get_field("termino").max_length
+MAX_TERMINOS_CONSULTA = 8
+
+LIMITE_BUSQUEDA = 20
+LIMITE_BUSQUEDA_MAX = 50
+# Hasta aquí se pagina: más allá nadie sigue revisando resultados
+MAX_RESULTADOS = 500
+
+PALABRAS_VACIAS = frozenset("""
+    a al algo ante como con contra de del desde donde e el ella en entre era es esa ese eso esta
+    este esto fue ha hay la las le les lo los mas me mi muy ni no nos o para pero por que se ser
+    si sin sobre son su sus te tu un una uno unos unas y ya yo
+""".split())
+
+_PALABRA = re.compile(r"\w+")
+
+
+# =========================
+# Normalización
+# =========================
+def normalizar(texto):
+    """Minúsculas y sin marcas diacríticas."""
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def terminos(texto):
+    """Términos indexables de 'texto', en orden y con repeticiones."""
+    return [
+        palabra[:LARGO_MAXIMO]
+        for palabra in _PALABRA.findall(normalizar(texto))
+        if len(palabra) >= LARGO_MINIMO and palabra not in PALABRAS_VACIAS
+    ]
+
+
+# =========================
+# Índice
+# =========================
+def _tipo(obj):
+    if isinstance(obj, Publicacion):
+        return Tipo.PUBLICACION
+    if isinstance(obj, Comentario):
+        return Tipo.COMENTARIO
+    return Tipo.ADJUNTO
+
+
+def _texto(obj, tipo):
+    if tipo == Tipo.ADJUNTO:
+        return f"{obj.descripcion or ''} {obj.transcripcion or ''}"
+    if tipo == Tipo.COMENTARIO and not obj.visible:
+        # Comentario moderado: sale del índice
+        return ""
+    # Una publicación oculta se sigue indexando: se filtra al buscar (los moderadores la ven)
+    return obj.contenido
+
+
+def indexar(obj):
+    """Reescribe las filas del índice de una publicación, comentario o adjunto."""
+    tipo = _tipo(obj)
+    publicacion_id = obj.pk if tipo == Tipo.PUBLICACION else obj.publicacion_id
+    conteo = Counter(terminos(_texto(obj, tipo)))
+    with transaction.atomic():
+        TerminoBusqueda.objects.filter(tipo=tipo, objeto_id=obj.pk).delete()
+        TerminoBusqueda.objects.bulk_create(
+            TerminoBusqueda(
+                termino=termino, publicacion_id=publicacion_id, tipo=tipo,
+                objeto_id=obj.pk, peso=veces * PESOS[tipo],
+            )
+            for termino, veces in conteo.items()
+        )
+
+
+def desindexar(obj):
+    TerminoBusqueda.objects.filter(tipo=_tipo(obj), objeto_id=obj.pk).delete()
+
+
+# =========================
+# Búsqueda
+# =========================
+def _codificar_cursor(desde):
+    return base64.urlsafe_b64encode(str(desde).encode()).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor):
+    if not cursor:
+        return 0
+    try:
+        desde = int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise CursorInvalido("Cursor inválido.") from e
+    if not 0 <= desde < MAX_RESULTADOS:
+        raise CursorInvalido("Cursor inválido.")
+    return desde
+
+
+def buscar(consulta, ver_ocultas=False, cursor=None, limite=LIMITE_BUSQUEDA):
+    """
+    Publicaciones que contienen todos los términos de 'consulta'.
+    Devuelve ([(publicacion_id, puntaje), ...], cursor_siguiente).
+    """
+    desde = _decodificar_cursor(cursor)
+    buscados = list(dict.fromkeys(terminos(consulta)))[:MAX_TERMINOS_CONSULTA]
+    if not buscados:
+        return [], None
+
+    filas = TerminoBusqueda.objects.filter(termino__in=buscados)
+    if not ver_ocultas:
+        filas = filas.filter(publicacion__visible=True)
+
+    # En cuántas publicaciones aparece cada término: los raros pesan más
+    publicaciones_por_termino = dict(
+        filas.order_by().values("termino")
+        .annotate(n=Count("publicacion", distinct=True))
+        .values_list("termino", "n")
+    )
+    if len(publicaciones_por_termino) < len(buscados):
+        return [], None  # algún término no aparece en ninguna
+    rareza = Case(
+        *[When(termino=t, then=Value(1 / math.log2(1 + n))) for t, n in publicaciones_por_termino.items()],
+        output_field=FloatField(),
+    )
+
+    limite = min(limite, MAX_RESULTADOS - desde)
+    resultados = list(
+        filas.order_by().values("publicacion_id")
+        .annotate(
+            puntaje=Sum(F("peso") * rareza, output_field=FloatField()),
+            encontrados=Count("termino", distinct=True),
+        )
+        .filter(encontrados=len(buscados))
+        .order_by("-puntaje", "-publicacion_id")
+        .values_list("publicacion_id", "puntaje")[desde:desde + limite + 1]
+    )
+    siguiente = None
+    if len(resultados) > limite:
+        resultados = resultados[:limite]
+        if desde + limite < MAX_RESULTADOS:
+            siguiente = _codificar_cursor(desde + limite)
+    return resultados, siguiente
+
+
+def pagina_busqueda(request):
+    """
+    Página de resultados lista para Response: {"resultados", "siguiente"}.
+    Parámetros: ?q=, ?cursor= (el 'siguiente' anterior) y ?limite=.
+    """
+    limite = paginacion.leer_limite(request.query_params.get("limite"), LIMITE_BUSQUEDA, LIMITE_BUSQUEDA_MAX)
+    puntajes, siguiente = buscar(
+        request.query_params.get("q", ""),
+        ver_ocultas=can(request.user, "foro", "moderar"),
+        cursor=request.query_params.get("cursor"),
+        limite=limite,
+    )
+    cargadas = (
+        Publicacion.objects.select_related("autor").prefetch_related("adjuntos")
+        .in_bulk([pk for pk, _ in puntajes])
+    )
+    publicaciones = [cargadas[pk] for pk, _ in puntajes if pk in cargadas]
+    datos = paginacion.serializar_publicaciones(request, publicaciones)
+    puntaje_por_id = dict(puntajes)
+    for fila in datos:
+        fila["puntaje"] = round(puntaje_por_id[fila["id"]], 3)
+    return {"resultados": datos, "siguiente": siguiente}
+
+
+def reindexar_todo():
+    """Reconstruye el índice completo (comando reindexar_foro). Devuelve los documentos indexados."""
+    total = 0
+    for modelo in (Publicacion, Comentario, ArchivoAdjunto):
+        for obj in modelo.objects.iterator(chunk_size=500):
+            indexar(obj)
+            total += 1
+    return total
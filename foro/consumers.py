@@ -0,0 +1,42 @@
+# foro/consumers.py
+import json
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+
+class ConversacionConsumer(AsyncWebsocketConsumer):
+    """
+    Conversación de una publicación en vivo. Solo reenvía los deltas que
+    publica foro.tiempo_real (comentarios, adjuntos, likes, moderación);
+    comentar y reaccionar siguen siendo peticiones HTTP normales.
+    """
+    async def connect(self):
+        user = self.scope.get("user")
+        self.publicacion_id = self.scope["url_route"]["kwargs"]["publicacion_id"]
+        if not user or not user.is_authenticated or not await self._puede_ver(user):
+            await self.close()
+            return
+
+        from .tiempo_real import grupo_publicacion
+        self.group_name = grupo_publicacion(self.publicacion_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.send(json.dumps({"type": "conectado", "publicacion": self.publicacion_id}))
+
+    async def disconnect(self, code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def foro_delta(self, event):
+        await self.send(json.dumps(event["payload"]))
+
+    @database_sync_to_async
+    def _puede_ver(self, user):
+        # Mismo criterio que foro.views.detalle_publicacion
+        from core.authz import can
+        from .models import Publicacion
+        qs = Publicacion.objects.filter(pk=self.publicacion_id)
+        if not can(user, "foro", "moderar"):
+            qs = qs.filter(visible=True)
+        return qs.exists()
@@ -0,0 +1,177 @@
+# foro/imagenes.py
+"""
+Variantes livianas de las imágenes del foro (miniatura y media).
+
+Las fotos llegan tal cual salen del teléfono (varios MB, con EXIF y GPS).
+Un worker genera, por cada imagen, versiones WebP y JPEG con el lado mayor
+acotado, orientadas según el EXIF y sin metadatos; el feed y el chat usan
+esas y el original queda solo para "ver completa".
+
+Los archivos generados se guardan bajo el hash SHA-256 del original, así que
+la misma foto subida dos veces (o reenviada a otra conversación) reutiliza
+las variantes ya hechas en vez de procesarse otra vez.
+"""
+import hashlib
+import io
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from . import tiempo_real
+
+# nombre -> lado mayor máximo en px
+VARIANTES = {
+    "miniatura": 320,
+    "media": 1280,
+}
+FORMATOS = {
+    # extensión -> (formato Pillow, opciones)
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+CARPETA = "foro/variantes"
+# Más píxeles que esto no se procesan (protección contra "bombas" de descompresión)
+MAX_PIXELES_ORIGEN = 60_000_000
+
+
+class ImagenInvalida(Exception):
+    pass
+
+
+# =========================
+# Origen
+# =========================
+def hash_archivo(campo):
+    h = hashlib.sha256()
+    campo.open("rb")
+    try:
+        for bloque in campo.chunks():
+            h.update(bloque)
+    finally:
+        campo.close()
+    return h.hexdigest()
+
+
+def _abrir(campo):
+    campo.open("rb")
+    try:
+        imagen = Image.open(campo)
+        if imagen.width * imagen.height > MAX_PIXELES_ORIGEN:
+            raise ImagenInvalida(f"Imagen demasiado grande ({imagen.width}x{imagen.height}).")
+        imagen.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ImagenInvalida(str(e)) from e
+    finally:
+        campo.close()
+    # Gira según la orientación EXIF; después se guarda sin EXIF
+    imagen = ImageOps.exif_transpose(imagen)
+    if imagen.mode not in ("RGB", "RGBA"):
+        imagen = imagen.convert("RGBA" if "transparency" in imagen.info or imagen.mode in ("LA", "PA") else "RGB")
+    return imagen
+
+
+# =========================
+# Generación
+# =========================
+def ruta_variante(hash_origen, nombre, extension):
+    return f"{CARPETA}/{hash_origen[:2]}/{hash_origen}/{nombre}.{extension}"
+
+
+def _codificar(imagen, extension):
+    formato, opciones = FORMATOS[extension]
+    if formato == "JPEG" and imagen.mode != "RGB":
+        # JPEG no tiene transparencia: se aplana sobre blanco
+        fondo = Image.new("RGB", imagen.size, (255, 255, 255))
+        fondo.paste(imagen, mask=imagen.getchannel("A"))
+        imagen = fondo
+    salida = io.BytesIO()
+    imagen.save(salida, formato, **opciones)
+    return salida.getvalue()
+
+
+def generar(campo, hash_origen):
+    """
+    Genera (o reutiliza, si ya existen en el storage) las variantes de la
+    imagen de 'campo'. Devuelve el dict que se guarda en ArchivoAdjunto.variantes.
+    """
+    imagen = None
+    variantes = {}
+    for nombre, lado in VARIANTES.items():
+        rutas = {ext: ruta_variante(hash_origen, nombre, ext) for ext in FORMATOS}
+        if all(default_storage.exists(r) for r in rutas.values()):
+            # Ya generadas para este hash: basta leer el tamaño de la cabecera
+            with default_storage.open(rutas["jpg"], "rb") as f:
+                ancho, alto = Image.open(f).size
+        else:
+            if imagen is None:
+                imagen = _abrir(campo)
+            reducida = imagen.copy()
+            # Solo se achica: una imagen pequeña queda con su tamaño
+            reducida.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+            for ext, ruta in rutas.items():
+                if default_storage.exists(ruta):
+                    default_storage.delete(ruta)
+                default_storage.save(ruta, ContentFile(_codificar(reducida, ext)))
+            ancho, alto = reducida.size
+        variantes[nombre] = {"ancho": ancho, "alto": alto, **rutas}
+    return variantes
+
+
+def procesar_adjunto(adjunto):
+    """Calcula hash y variantes de un adjunto imagen y los guarda. Devuelve las variantes."""
+    from .models import ArchivoAdjunto
+
+    hash_origen = adjunto.hash_origen or hash_archivo(adjunto.archivo)
+    # Misma foto ya procesada en otro adjunto: se copian sus variantes
+    previo = (
+        ArchivoAdjunto.objects.filter(hash_origen=hash_origen)
+        .exclude(pk=adjunto.pk).exclude(variantes={})
+        .values_list("variantes", flat=True).first()
+    )
+    variantes = previo or generar(adjunto.archivo, hash_origen)
+    ArchivoAdjunto.objects.filter(pk=adjunto.pk).update(hash_origen=hash_origen, variantes=variantes)
+    adjunto.hash_origen, adjunto.variantes = hash_origen, variantes
+    # Quien tenga la conversación abierta cambia el original por la versión liviana
+    tiempo_real.emitir(adjunto.publicacion_id, "adjunto_variantes", id=adjunto.pk, url_media=adjunto.url_media)
+    return variantes
+
+
+# =========================
+# Encolado y URLs
+# =========================
+def clave_encolado(adjunto_id):
+    return f"foro:variantes:{adjunto_id}"
+
+
+def encolar(adjunto):
+    """
+    Pide al worker las variantes de un adjunto imagen que aún no las tiene.
+    El cache.add evita encolar lo mismo en cada request mientras se procesa.
+    """
+    if adjunto.variantes or adjunto.tipo_archivo != "imagen":
+        return
+    if not cache.add(clave_encolado(adjunto.pk), 1, timeout=600):
+        return
+    from .tasks import generar_variantes_adjunto
+    transaction.on_commit(lambda: generar_variantes_adjunto.delay(adjunto.pk))
+
+
+def encolar_faltantes(adjuntos):
+    """Generación perezosa: encola las imágenes de una página que aún no tienen variantes."""
+    for adjunto in adjuntos:
+        encolar(adjunto)
+
+
+def urls_variantes(adjunto, request=None):
+    """{nombre: {"webp", "jpg", "ancho", "alto"}} con URLs; {} mientras no existan."""
+    resultado = {}
+    for nombre, datos in (adjunto.variantes or {}).items():
+        urls = {}
+        for ext in FORMATOS:
+            url = default_storage.url(datos[ext])
+            urls[ext] = request.build_absolute_uri(url) if request else url
+        resultado[nombre] = {**urls, "ancho": datos["ancho"], "alto": datos["alto"]}
+    return resultado
@@ -0,0 +1,83 @@
+# foro/likes.py
+"""
+"Me gusta" de comentarios y adjuntos.
+
+El total se guarda en 'total_likes' y se mueve con un UPDATE ... F() en el
+mismo momento en que se inserta o borra la fila de la tabla intermedia, así
+que listar no necesita COUNT por ítem. "¿Le di like?" se resuelve para una
+página completa con una sola consulta (ids_con_like). Cada cambio de total
+se avisa a la conversación en vivo (foro.tiempo_real).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from . import tiempo_real
+from .models import ArchivoAdjunto, Comentario
+
+
+def _tabla_likes(modelo):
+    campo = modelo._meta.get_field("likes")
+    return campo.remote_field.through, f"{campo.m2m_field_name()}_id", f"{campo.m2m_reverse_field_name()}_id"
+
+
+def alternar_like(obj, usuario):
+    """
+    Quita el like si existía o lo agrega si no. Devuelve (liked, total_likes).
+    Primero intenta el DELETE: si borró una fila era un "quitar"; si no, se
+    inserta (la restricción única de la tabla intermedia resuelve la carrera
+    de dos clics simultáneos).
+    """
+    modelo = type(obj)
+    Through, col_obj, col_usuario = _tabla_likes(modelo)
+    filtro = {col_obj: obj.pk, col_usuario: usuario.pk}
+
+    with transaction.atomic():
+        borradas, _ = Through.objects.filter(**filtro).delete()
+        if borradas:
+            liked = False
+            modelo.objects.filter(pk=obj.pk, total_likes__gt=0).update(total_likes=F("total_likes") - 1)
+        else:
+            liked = True
+            try:
+                with transaction.atomic():
+                    Through.objects.create(**filtro)
+            except IntegrityError:
+                # Otra petición lo insertó recién: ya está contado
+                pass
+            else:
+                modelo.objects.filter(pk=obj.pk).update(total_likes=F("total_likes") + 1)
+        total = modelo.objects.filter(pk=obj.pk).values_list("total_likes", flat=True).first() or 0
+
+    obj.total_likes = total
+    tiempo_real.like_cambiado(obj, total)
+    return liked, total
+
+
+def ids_con_like(modelo, ids, usuario):
+    """Subconjunto de 'ids' a los que 'usuario' les dio like (una consulta)."""
+    ids = list(ids)
+    if not ids or not getattr(usuario, "is_authenticated", False):
+        return set()
+    Through, col_obj, col_usuario = _tabla_likes(modelo)
+    return set(
+        Through.objects.filter(**{f"{col_obj}__in": ids, col_usuario: usuario.pk})
+        .values_list(col_obj, flat=True)
+    )
+
+
+def contexto_likes(usuario, comentario_ids=(), adjunto_ids=()):
+    """Claves de contexto que leen los serializers para 'me_gusta_usuario' sin consultar por ítem."""
+    return {
+        "likes_comentarios": ids_con_like(Comentario, comentario_ids, usuario),
+        "likes_adjuntos": ids_con_like(ArchivoAdjunto, adjunto_ids, usuario),
+    }
+
+
+def recontar(modelo, pk):
+    """Recalcula total_likes desde la tabla intermedia (cambios hechos fuera de alternar_like)."""
+    Through, col_obj, _ = _tabla_likes(modelo)
+    total = Through.objects.filter(**{col_obj: pk}).count()
+    modelo.objects.filter(pk=pk).update(total_likes=total)
+    obj = modelo.objects.filter(pk=pk).only("pk", "publicacion_id").first()
+    if obj is not None:
+        tiempo_real.like_cambiado(obj, total)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from foro.busqueda import reindexar_todo
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice del buscador del foro (publicaciones, comentarios y adjuntos)"
+
+    def handle(self, *args, **options):
+        total = reindexar_todo()
+        self.stdout.write(self.style.SUCCESS(f"Índice del foro reconstruido: {total} documentos."))
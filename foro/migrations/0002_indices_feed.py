@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foro', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comentario',
+            index=models.Index(fields=['publicacion', 'fecha_creacion', 'id'], name='foro_com_hilo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacion',
+            index=models.Index(fields=['visible', 'fecha_creacion', 'id'], name='foro_pub_feed_idx'),
+        ),
+    ]
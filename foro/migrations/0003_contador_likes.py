@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:35
+
+from django.db import migrations, models
+
+
+def poblar_total_likes(apps, schema_editor):
+    for nombre in ('Comentario', 'ArchivoAdjunto'):
+        Modelo = apps.get_model('foro', nombre)
+        campo = Modelo._meta.get_field('likes')
+        Through = campo.remote_field.through
+        fk = campo.m2m_field_name()
+        totales = (
+            Through.objects.values(fk)
+            .annotate(n=models.Count('id'))
+            .values_list(fk, 'n')
+        )
+        for pk, n in totales:
+            Modelo.objects.filter(pk=pk).update(total_likes=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foro', '0002_indices_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivoadjunto',
+            name='total_likes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comentario',
+            name='total_likes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(poblar_total_likes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def poblar_rutas(apps, schema_editor):
+    Comentario = apps.get_model('foro', 'Comentario')
+    # El padre siempre existe antes que la respuesta: en orden de id ya está calculado
+    calculados = {}  # id -> (ruta, profundidad, parent_id)
+    for pk, parent_id in Comentario.objects.order_by('id').values_list('id', 'parent_id'):
+        padre = calculados.get(parent_id)
+        if padre and padre[1] + 1 >= 28:
+            # Igual que Comentario.save: más allá del máximo, hermano de su padre
+            parent_id = padre[2]
+            padre = calculados.get(parent_id)
+        ruta = (padre[0] if padre else "") + f"{pk:08x}/"
+        profundidad = padre[1] + 1 if padre else 0
+        calculados[pk] = (ruta, profundidad, parent_id if padre else None)
+        Comentario.objects.filter(pk=pk).update(ruta=ruta, profundidad=profundidad, parent_id=calculados[pk][2])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foro', '0003_contador_likes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comentario',
+            name='profundidad',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comentario',
+            name='ruta',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(poblar_rutas, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comentario',
+            index=models.Index(fields=['publicacion', 'ruta'], name='foro_com_ruta_idx'),
+        ),
+    ]
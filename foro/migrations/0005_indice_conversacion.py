@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foro', '0004_ruta_comentarios'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivoadjunto',
+            index=models.Index(fields=['publicacion', 'es_mensaje', 'fecha_creacion', 'id'], name='foro_adj_chat_idx'),
+        ),
+    ]
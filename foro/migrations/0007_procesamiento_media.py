@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foro', '0006_variantes_imagenes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivoadjunto',
+            name='estado_procesamiento',
+            field=models.CharField(blank=True, choices=[('', 'No aplica'), ('PENDIENTE', 'Pendiente'), ('PROCESANDO', 'Procesando'), ('LISTO', 'Listo'), ('ERROR', 'Error')], default='', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='archivoadjunto',
+            name='progreso_procesamiento',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='archivoadjunto',
+            name='tamano_original',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foro', '0007_procesamiento_media'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivoadjunto',
+            name='estado_transcripcion',
+            field=models.CharField(blank=True, choices=[('', 'No aplica'), ('PENDIENTE', 'Pendiente'), ('PROCESANDO', 'Procesando'), ('LISTO', 'Listo'), ('ERROR', 'Error')], default='', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='archivoadjunto',
+            name='transcripcion',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foro', '0008_transcripcion_notas_voz'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TerminoBusqueda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=40)),
+                ('tipo', models.CharField(choices=[('publicacion', 'Publicación'), ('comentario', 'Comentario'), ('adjunto', 'Adjunto')], max_length=12)),
+                ('objeto_id', models.PositiveIntegerField()),
+                ('peso', models.PositiveIntegerField(default=1)),
+                ('publicacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='foro.publicacion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['termino', 'publicacion', 'peso'], name='foro_termino_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'objeto_id', 'termino'), name='foro_termino_doc_uniq')],
+            },
+        ),
+    ]
@@ -12,10 +12,26 @@ class Publicacion(models.Model):
 
     visible = models.BooleanField(default=True, db_index=True)
     eliminado = models.BooleanField(default=False)
+    # Sincronización incremental de la app (core.sincronizacion)
+    actualizado_el = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Feed por cursor: WHERE visible ORDER BY fecha_creacion DESC, id DESC
+            models.Index(fields=["visible", "fecha_creacion", "id"], name="foro_pub_feed_idx"),
+        ]
+
     def __str__(self):
         return f'Publicación de {self.autor.username}'
 
 class ArchivoAdjunto(models.Model):
+    class EstadoProcesamiento(models.TextChoices):
+        NO_APLICA = "", "No aplica"
+        PENDIENTE = "PENDIENTE", "Pendiente"
+        PROCESANDO = "PROCESANDO", "Procesando"
+        LISTO = "LISTO", "Listo"
+        ERROR = "ERROR", "Error"
+
     publicacion = models.ForeignKey(
         Publicacion,
         on_delete=models.CASCADE,
@@ -36,6 +52,29 @@ class ArchivoAdjunto(models.Model):
     )
     descripcion = models.TextField(null=True, blank=True)
     likes = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='adjuntos_liked', blank=True)
+    # Se mantiene en foro.likes.alternar_like (evita COUNT por adjunto al listar)
+    total_likes = models.PositiveIntegerField(default=0)
+    # Imágenes: SHA-256 del original y rutas de sus variantes (las llena foro.imagenes en el worker)
+    hash_origen = models.CharField(max_length=64, blank=True, default="", db_index=True, editable=False)
+    variantes = models.JSONField(default=dict, blank=True, editable=False)
+    # Audio y video: compresión en el worker (foro.transcodificacion); el original se reemplaza al terminar
+    estado_procesamiento = models.CharField(
+        max_length=12, choices=EstadoProcesamiento.choices, default=EstadoProcesamiento.NO_APLICA, blank=True,
+    )
+    progreso_procesamiento = models.PositiveSmallIntegerField(default=0)
+    tamano_original = models.BigIntegerField(null=True, blank=True, editable=False)
+    # Notas de voz: texto reconocido por Vosk en la cola de baja prioridad (foro.transcripcion)
+    transcripcion = models.TextField(blank=True, default="")
+    estado_transcripcion = models.CharField(
+        max_length=12, choices=EstadoProcesamiento.choices, default=EstadoProcesamiento.NO_APLICA, blank=True,
+    )
+
+    class Meta:
+        indexes = [
+            # Adjuntos tipo mensaje en la línea de tiempo de la conversación (foro.conversacion)
+            models.Index(fields=["publicacion", "es_mensaje", "fecha_creacion", "id"], name="foro_adj_chat_idx"),
+        ]
+
     def __str__(self):
         return self.archivo.name
 
@@ -53,18 +92,111 @@ class ArchivoAdjunto(models.Model):
         else:
             return 'otro'
 
+    def url_variante(self, nombre, extension="jpg"):
+        """URL de una variante ('miniatura' | 'media'); el original mientras no esté generada."""
+        datos = (self.variantes or {}).get(nombre)
+        if not datos:
+            return self.archivo.url
+        return self.archivo.storage.url(datos[extension])
+
+    @property
+    def url_miniatura(self):
+        return self.url_variante("miniatura")
+
+    @property
+    def url_miniatura_webp(self):
+        return self.url_variante("miniatura", "webp")
+
+    @property
+    def url_media(self):
+        return self.url_variante("media")
+
+    @property
+    def url_media_webp(self):
+        return self.url_variante("media", "webp")
+
     @admin.display(description="Tipo de archivo")
     def tipo_archivo_admin(self):
         return self.tipo_archivo
         
+# Ruta materializada de los comentarios: un segmento de ancho fijo por nivel
+# (id en hexadecimal), así ordenar por 'ruta' recorre el árbol en preorden y
+# un subárbol es un rango (ruta LIKE 'prefijo%') sobre el índice.
+ANCHO_SEGMENTO_RUTA = 9  # 8 dígitos hex + "/"
+LARGO_RUTA = 255
+PROFUNDIDAD_MAXIMA = LARGO_RUTA // ANCHO_SEGMENTO_RUTA
+
+
+def segmento_ruta(pk):
+    return f"{pk:08x}/"
+
+
 class Comentario(models.Model):
     publicacion = models.ForeignKey("Publicacion", on_delete=models.CASCADE, related_name="comentarios")
     autor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     contenido = models.TextField()
     parent = models.ForeignKey("self", null=True, blank=True, on_delete=models.CASCADE, related_name="respuestas")
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Se calculan al insertar (save); ver foro.arbol
+    ruta = models.CharField(max_length=LARGO_RUTA, blank=True, default="", editable=False)
+    profundidad = models.PositiveSmallIntegerField(default=0, editable=False)
 
     visible = models.BooleanField(default=True, db_index=True)
     likes = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='comentarios_liked', blank=True)
+    # Se mantiene en foro.likes.alternar_like (evita COUNT por comentario al listar)
+    total_likes = models.PositiveIntegerField(default=0)
     class Meta:
-        ordering = ["fecha_creacion"]
\ No newline at end of file
+        ordering = ["fecha_creacion"]
+        indexes = [
+            # Primeros N comentarios por publicación y cursor de "ver más"
+            models.Index(fields=["publicacion", "fecha_creacion", "id"], name="foro_com_hilo_idx"),
+            # Hilo completo o subárbol en una consulta ordenada
+            models.Index(fields=["publicacion", "ruta"], name="foro_com_ruta_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        nuevo = self._state.adding and not self.ruta
+        padre = None
+        if nuevo and self.parent_id:
+            padre = self.parent
+            if padre.profundidad + 1 >= PROFUNDIDAD_MAXIMA:
+                # Hilo demasiado profundo: la respuesta queda como hermana de su padre
+                padre = padre.parent
+                self.parent = padre
+        if nuevo:
+            self.profundidad = padre.profundidad + 1 if padre else 0
+        super().save(*args, **kwargs)
+        if nuevo:
+            # La ruta lleva el propio id, que recién existe después del INSERT
+            self.ruta = (padre.ruta if padre else "") + segmento_ruta(self.pk)
+            type(self).objects.filter(pk=self.pk).update(ruta=self.ruta)
+
+class TerminoBusqueda(models.Model):
+    """
+    Índice invertido del buscador del foro (ver foro.busqueda): una fila por
+    término normalizado (minúsculas, sin tildes) de cada publicación,
+    comentario visible o adjunto. Se reescribe al guardar el documento.
+    """
+    class Tipo(models.TextChoices):
+        PUBLICACION = "publicacion", "Publicación"
+        COMENTARIO = "comentario", "Comentario"
+        ADJUNTO = "adjunto", "Adjunto"
+
+    termino = models.CharField(max_length=40)
+    publicacion = models.ForeignKey(Publicacion, on_delete=models.CASCADE, related_name="+")
+    tipo = models.CharField(max_length=12, choices=Tipo.choices)
+    objeto_id = models.PositiveIntegerField()
+    # Veces que aparece el término en el documento, multiplicado por el peso del tipo
+    peso = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tipo", "objeto_id", "termino"], name="foro_termino_doc_uniq"),
+        ]
+        indexes = [
+            # Búsqueda: WHERE termino IN (...) agrupado por publicación
+            models.Index(fields=["termino", "publicacion", "peso"], name="foro_termino_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.termino} ({self.tipo} {self.objeto_id})"
@@ -0,0 +1,167 @@
+# foro/paginacion.py
+"""
+Paginación por cursor (keyset) del feed del foro.
+
+El feed se ordena por (fecha_creacion, id) descendente y cada página pide
+"lo anterior a la última fila vista", que el índice compuesto resuelve sin
+OFFSET: el costo de una página no depende de cuántas publicaciones haya.
+Los comentarios de cada publicación se recortan a los primeros N (RowNumber
+por publicación) y se entrega un cursor para pedir el resto.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import F, Prefetch, Q, Window
+from django.db.models.functions import RowNumber
+
+from .likes import contexto_likes
+from .models import Comentario, Publicacion
+from .serializers import PublicacionFeedSerializer, PublicacionSerializer
+
+LIMITE_FEED = 20
+LIMITE_FEED_MAX = 50
+COMENTARIOS_POR_PUBLICACION = 3
+LIMITE_COMENTARIOS_MAX = 100
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+# =========================
+# Cursores
+# =========================
+def codificar_cursor(fecha, pk):
+    texto = f"{fecha.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    """'cursor' opaco -> (fecha, id). None si viene vacío."""
+    if not cursor:
+        return None
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha, pk = base64.urlsafe_b64decode(cursor + relleno).decode().split("|")
+        return datetime.fromisoformat(fecha), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise CursorInvalido("Cursor inválido.") from e
+
+
+def leer_limite(valor, por_defecto, maximo):
+    try:
+        limite = int(valor)
+    except (TypeError, ValueError):
+        return por_defecto
+    return max(1, min(limite, maximo))
+
+
+# =========================
+# Páginas
+# =========================
+def pagina_descendente(qs, cursor, limite):
+    """Filas más nuevas primero, anteriores al cursor. Devuelve (filas, siguiente_cursor)."""
+    posicion = decodificar_cursor(cursor)
+    if posicion:
+        fecha, pk = posicion
+        qs = qs.filter(Q(fecha_creacion__lt=fecha) | Q(fecha_creacion=fecha, id__lt=pk))
+    filas = list(qs.order_by("-fecha_creacion", "-id")[:limite + 1])
+    return _recortar(filas, limite)
+
+
+def pagina_ascendente(qs, cursor, limite):
+    """Filas más antiguas primero, posteriores al cursor (hilos de comentarios)."""
+    posicion = decodificar_cursor(cursor)
+    if posicion:
+        fecha, pk = posicion
+        qs = qs.filter(Q(fecha_creacion__gt=fecha) | Q(fecha_creacion=fecha, id__gt=pk))
+    filas = list(qs.order_by("fecha_creacion", "id")[:limite + 1])
+    return _recortar(filas, limite)
+
+
+def _recortar(filas, limite):
+    # Se pidió una fila de más solo para saber si hay otra página
+    if len(filas) > limite:
+        filas = filas[:limite]
+        return filas, codificar_cursor(filas[-1].fecha_creacion, filas[-1].id)
+    return filas, None
+
+
+def primeros_comentarios(publicacion_ids, limite=COMENTARIOS_POR_PUBLICACION):
+    """
+    {publicacion_id: (comentarios, cursor_mas)} con los primeros 'limite'
+    comentarios visibles de cada publicación, en una sola consulta.
+    """
+    if not publicacion_ids:
+        return {}
+    qs = (
+        Comentario.objects
+        .filter(publicacion_id__in=publicacion_ids, visible=True)
+        .select_related("autor")
+        .annotate(fila=Window(
+            RowNumber(),
+            partition_by=F("publicacion_id"),
+            order_by=[F("fecha_creacion").asc(), F("id").asc()],
+        ))
+        .filter(fila__lte=limite + 1)
+        .order_by("publicacion_id", "fecha_creacion", "id")
+    )
+    agrupados = {pid: [] for pid in publicacion_ids}
+    for c in qs:
+        agrupados[c.publicacion_id].append(c)
+    return {pid: _recortar(comentarios, limite) for pid, comentarios in agrupados.items()}
+
+
+def pagina_feed(request, qs=None):
+    """
+    Página del feed lista para Response: {"resultados", "siguiente"}.
+    Parámetros: ?cursor= (el 'siguiente' anterior) y ?limite=.
+    """
+    if qs is None:
+        qs = Publicacion.objects.filter(visible=True)
+    limite = leer_limite(request.query_params.get("limite"), LIMITE_FEED, LIMITE_FEED_MAX)
+    publicaciones, siguiente = pagina_descendente(
+        qs.select_related("autor").prefetch_related("adjuntos"),
+        request.query_params.get("cursor"),
+        limite,
+    )
+    return {"resultados": serializar_publicaciones(request, publicaciones), "siguiente": siguiente}
+
+
+def serializar_publicaciones(request, publicaciones):
+    """Publicaciones (con adjuntos precargados) con sus primeros comentarios y los likes del usuario."""
+    comentarios = primeros_comentarios([p.id for p in publicaciones])
+    contexto = {
+        "request": request,
+        "comentarios": comentarios,
+        # "Me gusta" del usuario para toda la página: una consulta por tipo
+        **contexto_likes(
+            request.user,
+            comentario_ids=[c.id for lista, _ in comentarios.values() for c in lista],
+            adjunto_ids=[a.id for p in publicaciones for a in p.adjuntos.all()],
+        ),
+    }
+    return PublicacionFeedSerializer(publicaciones, many=True, context=contexto).data
+
+
+def serializar_publicaciones_completas(request, qs):
+    """Publicaciones de 'qs' con todos sus comentarios visibles (lista completa y sincronización)."""
+    publicaciones = list(
+        qs.select_related("autor").prefetch_related(
+            "adjuntos",
+            Prefetch(
+                "comentarios",
+                queryset=Comentario.objects.filter(visible=True).select_related("autor").order_by("fecha_creacion"),
+                to_attr="comentarios_visibles",
+            ),
+        )
+    )
+    contexto = {
+        "request": request,
+        **contexto_likes(
+            request.user,
+            comentario_ids=[c.id for p in publicaciones for c in p.comentarios_visibles],
+            adjunto_ids=[a.id for p in publicaciones for a in p.adjuntos.all()],
+        ),
+    }
+    return PublicacionSerializer(publicaciones, many=True, context=contexto).data
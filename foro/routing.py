@@ -0,0 +1,7 @@
+# foro/routing.py
+from django.urls import path
+from .consumers import ConversacionConsumer
+
+websocket_urlpatterns = [
+    path("ws/foro/<int:publicacion_id>/", ConversacionConsumer.as_asgi()),
+]
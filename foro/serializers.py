@@ -1,25 +1,46 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from foro import imagenes
 from foro.models import Publicacion, Comentario, ArchivoAdjunto
 
 User = get_user_model()
 
+
+def _me_gusta(context, clave, obj):
+    # Las listas traen en el contexto los ids con like del usuario (foro.likes.contexto_likes);
+    # un ítem suelto se consulta directo
+    ids = context.get(clave)
+    if ids is not None:
+        return obj.id in ids
+    request = context.get("request")
+    if request and request.user.is_authenticated:
+        return obj.likes.filter(pk=request.user.pk).exists()
+    return False
+
 class ArchivoAdjuntoSerializer(serializers.ModelSerializer):
     autor = serializers.CharField(source="autor.username", read_only=True)
     url = serializers.SerializerMethodField()
     fecha_creacion = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
     
     # 🔹 Campos para likes en fotos
-    total_likes = serializers.SerializerMethodField()
+    total_likes = serializers.IntegerField(read_only=True)
     me_gusta_usuario = serializers.SerializerMethodField()
 
+    # Miniatura y versión media (WebP/JPEG); {} mientras el worker las genera
+    variantes = serializers.SerializerMethodField()
+
     class Meta:
         model = ArchivoAdjunto
         # 🔹 CORRECCIÓN: Se agregan los campos de likes a la lista
         fields = (
             "id", "autor", "tipo_archivo", "url", 
             "fecha_creacion", "archivo", "es_mensaje", "descripcion",
-            "total_likes", "me_gusta_usuario"
+            "total_likes", "me_gusta_usuario", "variantes",
+            "estado_procesamiento", "progreso_procesamiento",
+            "transcripcion", "estado_transcripcion",
+        )
+        read_only_fields = (
+            "estado_procesamiento", "progreso_procesamiento", "transcripcion", "estado_transcripcion",
         )
 
     def get_url(self, obj):
@@ -29,21 +50,20 @@ class ArchivoAdjuntoSerializer(serializers.ModelSerializer):
         return obj.archivo.url
 
     # 🔹 Métodos necesarios para SerializerMethodField
-    def get_total_likes(self, obj):
-        return obj.likes.count()
-
     def get_me_gusta_usuario(self, obj):
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(pk=request.user.pk).exists()
-        return False
+        return _me_gusta(self.context, "likes_adjuntos", obj)
+
+    def get_variantes(self, obj):
+        if not obj.variantes:
+            imagenes.encolar(obj)
+        return imagenes.urls_variantes(obj, self.context.get("request"))
 
 class ComentarioSerializer(serializers.ModelSerializer):
     autor_username = serializers.CharField(source="autor.username", read_only=True)
     fecha_creacion = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
     
     # 🔹 Campos para likes en comentarios de texto
-    total_likes = serializers.SerializerMethodField()
+    total_likes = serializers.IntegerField(read_only=True)
     me_gusta_usuario = serializers.SerializerMethodField()
 
     class Meta:
@@ -54,14 +74,8 @@ class ComentarioSerializer(serializers.ModelSerializer):
             "total_likes", "me_gusta_usuario"
         )
 
-    def get_total_likes(self, obj):
-        return obj.likes.count()
-
     def get_me_gusta_usuario(self, obj):
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(pk=request.user.pk).exists()
-        return False
+        return _me_gusta(self.context, "likes_comentarios", obj)
 
 class ComentarioCreateSerializer(serializers.Serializer):
     # Este serializer solo se usa para validar la entrada (POST)
@@ -87,7 +101,26 @@ class PublicacionSerializer(serializers.ModelSerializer):
         )
 
     def get_comentarios(self, obj):
-        # Filtramos solo los comentarios visibles
-        qs = obj.comentarios.filter(visible=True).order_by('fecha_creacion')
+        # Filtramos solo los comentarios visibles (o los ya precargados en 'comentarios_visibles')
+        qs = getattr(obj, "comentarios_visibles", None)
+        if qs is None:
+            qs = obj.comentarios.filter(visible=True).select_related("autor").order_by('fecha_creacion')
         # 🔹 IMPORTANTE: Pasamos el contexto para que funcionen los likes
-        return ComentarioSerializer(qs, many=True, context=self.context).data
\ No newline at end of file
+        return ComentarioSerializer(qs, many=True, context=self.context).data
+
+class PublicacionFeedSerializer(PublicacionSerializer):
+    """
+    Publicación del feed paginado: trae solo los primeros comentarios (ya
+    cargados en context["comentarios"]) y el cursor para pedir el resto.
+    """
+    comentarios_siguiente = serializers.SerializerMethodField()
+
+    class Meta(PublicacionSerializer.Meta):
+        fields = PublicacionSerializer.Meta.fields + ("comentarios_siguiente",)
+
+    def get_comentarios(self, obj):
+        comentarios, _ = self.context["comentarios"].get(obj.id, ([], None))
+        return ComentarioSerializer(comentarios, many=True, context=self.context).data
+
+    def get_comentarios_siguiente(self, obj):
+        return self.context["comentarios"].get(obj.id, ([], None))[1]
@@ -1,8 +1,10 @@
 # proyecto-tesis/foro/signals.py
 
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
-from .models import Publicacion, Comentario
+from . import busqueda, imagenes, tiempo_real, transcodificacion, transcripcion
+from .likes import recontar
+from .models import ArchivoAdjunto, Publicacion, Comentario
 # from .tasks import notificar_nueva_publicacion, notificar_nuevo_comentario  <-- COMENTA ESTA IMPORTACIÓN SI DA ERROR LUEGO
 
 @receiver(post_save, sender=Publicacion)
@@ -25,4 +27,78 @@ def trigger_notificacion_comentario(sender, instance, created, **kwargs):
         pass
         # COMENTA LAS LÍNEAS DE ABAJO:
         # print(f" Nuevo comentario en post {instance.publicacion.id}. Encolando notificación...")
-        # notificar_nuevo_comentario.delay(instance.id)
\ No newline at end of file
+        # notificar_nuevo_comentario.delay(instance.id)
+
+@receiver(m2m_changed, sender=Comentario.likes.through)
+@receiver(m2m_changed, sender=ArchivoAdjunto.likes.through)
+def recontar_likes(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Likes cambiados con .add()/.remove() (admin, shell): se recuenta el total.
+    foro.likes.alternar_like escribe la tabla intermedia directo y no pasa por aquí.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        recontar(type(instance), instance.pk)
+    elif pk_set:
+        for pk in pk_set:
+            recontar(model, pk)
+
+
+# --- Conversación en vivo (foro.tiempo_real) ---
+
+@receiver(post_save, sender=Comentario)
+def emitir_comentario(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        tiempo_real.comentario_guardado(instance, created)
+
+@receiver(post_save, sender=ArchivoAdjunto)
+def emitir_adjunto(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        tiempo_real.adjunto_guardado(instance, created)
+
+@receiver(post_save, sender=ArchivoAdjunto)
+def encolar_procesamiento(sender, instance, created, raw=False, **kwargs):
+    """
+    Adjunto nuevo: el worker genera las variantes de una imagen (foro.imagenes),
+    comprime un audio/video (foro.transcodificacion) y transcribe las notas de
+    voz (foro.transcripcion).
+    """
+    if created and not raw:
+        imagenes.encolar(instance)
+        transcodificacion.encolar(instance)
+        transcripcion.encolar(instance)
+
+@receiver(post_delete, sender=ArchivoAdjunto)
+def emitir_adjunto_eliminado(sender, instance, **kwargs):
+    tiempo_real.adjunto_eliminado(instance)
+
+@receiver(post_save, sender=Publicacion)
+def emitir_publicacion(sender, instance, created, raw=False, **kwargs):
+    # Recién creada nadie está suscrito todavía; interesa ocultar/restaurar
+    if not created and not raw:
+        tiempo_real.publicacion_guardada(instance)
+
+@receiver(post_delete, sender=Publicacion)
+def emitir_publicacion_eliminada(sender, instance, **kwargs):
+    tiempo_real.publicacion_eliminada(instance.pk)
+
+
+# --- Índice del buscador (foro.busqueda) ---
+
+# Campos que cambian el texto indexado o si el comentario se ve
+CAMPOS_INDEXADOS = {"contenido", "visible", "descripcion", "transcripcion"}
+
+@receiver(post_save, sender=Publicacion)
+@receiver(post_save, sender=Comentario)
+@receiver(post_save, sender=ArchivoAdjunto)
+def indexar_busqueda(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields and not CAMPOS_INDEXADOS & set(update_fields)):
+        return
+    busqueda.indexar(instance)
+
+@receiver(post_delete, sender=Comentario)
+@receiver(post_delete, sender=ArchivoAdjunto)
+def desindexar_busqueda(sender, instance, **kwargs):
+    # Las filas de una publicación borrada se van en cascada
+    busqueda.desindexar(instance)
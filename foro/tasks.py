@@ -91,4 +91,61 @@ def notificar_nuevo_comentario(comentario_id):
         messaging.send(message)
         return "Notificación de Comentario enviada."
     except Exception as e:
-        return f"Error enviando notif comentario: {e}"
\ No newline at end of file
+        return f"Error enviando notif comentario: {e}"
+
+@shared_task(ignore_result=True, autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+def generar_variantes_adjunto(adjunto_id):
+    """Miniatura y versión media (WebP/JPEG, sin EXIF) de un adjunto imagen; ver foro.imagenes."""
+    from django.core.cache import cache
+    from .imagenes import ImagenInvalida, clave_encolado, procesar_adjunto
+    from .models import ArchivoAdjunto
+
+    adjunto = ArchivoAdjunto.objects.filter(pk=adjunto_id).first()
+    if adjunto is None or adjunto.variantes or adjunto.tipo_archivo != "imagen":
+        return
+    try:
+        procesar_adjunto(adjunto)
+    except ImagenInvalida as e:
+        # Archivo corrupto o gigante: se sigue mostrando el original y no se reintenta por un día
+        logger.warning("Adjunto %s sin variantes: %s", adjunto_id, e)
+        cache.set(clave_encolado(adjunto_id), 1, timeout=60 * 60 * 24)
+
+
+@shared_task(ignore_result=True, soft_time_limit=30 * 60)
+def transcodificar_adjunto(adjunto_id):
+    """Audio -> Opus, video -> H.264 acotado; reemplaza el original (ver foro.transcodificacion)."""
+    from .models import ArchivoAdjunto
+    from .transcodificacion import procesar_adjunto
+
+    adjunto = ArchivoAdjunto.objects.filter(pk=adjunto_id).first()
+    if adjunto is None or adjunto.estado_procesamiento == ArchivoAdjunto.EstadoProcesamiento.LISTO:
+        return
+    try:
+        procesar_adjunto(adjunto)
+    except Exception:
+        # Que no quede "Procesando" para siempre; el original sigue disponible
+        ArchivoAdjunto.objects.filter(pk=adjunto_id).update(
+            estado_procesamiento=ArchivoAdjunto.EstadoProcesamiento.ERROR
+        )
+        raise
+
+
+@shared_task(bind=True, ignore_result=True, autoretry_for=(OSError,), retry_backoff=True,
+             max_retries=5, soft_time_limit=15 * 60)
+def transcribir_adjunto(self, adjunto_id):
+    """Texto de una nota de voz con Vosk; corre en la cola de baja prioridad (ver foro.transcripcion)."""
+    from .models import ArchivoAdjunto
+    from .transcripcion import procesar_adjunto
+
+    Estado = ArchivoAdjunto.EstadoProcesamiento
+    adjunto = ArchivoAdjunto.objects.filter(pk=adjunto_id).first()
+    if adjunto is None or adjunto.tipo_archivo != "audio" or adjunto.estado_transcripcion == Estado.LISTO:
+        return
+    if adjunto.estado_procesamiento in (Estado.PENDIENTE, Estado.PROCESANDO):
+        # Se está comprimiendo y el archivo va a cambiar: se transcribe la versión final
+        raise self.retry(countdown=60, max_retries=30)
+    try:
+        procesar_adjunto(adjunto)
+    except Exception:
+        ArchivoAdjunto.objects.filter(pk=adjunto_id).update(estado_transcripcion=Estado.ERROR)
+        raise
@@ -1,3 +1,94 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your tests here.
+from . import busqueda, conversacion, paginacion
+from .models import Comentario, Publicacion
+from .paginacion import CursorInvalido
+
+
+class CursoresTests(SimpleTestCase):
+    def test_feed_ida_y_vuelta(self):
+        ahora = timezone.now()
+        cursor = paginacion.codificar_cursor(ahora, 42)
+        self.assertEqual(paginacion.decodificar_cursor(cursor), (ahora, 42))
+        self.assertIsNone(paginacion.decodificar_cursor(""))
+
+    def test_conversacion_ida_y_vuelta(self):
+        ahora = timezone.now()
+        cursor = conversacion.codificar_cursor(ahora, conversacion.ADJUNTO, 7)
+        self.assertEqual(conversacion.decodificar_cursor(cursor), (ahora, conversacion.ADJUNTO, 7))
+
+    def test_cursores_invalidos(self):
+        ajeno = conversacion.codificar_cursor(timezone.now(), "otro", 1)
+        for decodificar, cursor in (
+            (paginacion.decodificar_cursor, "%%%"),
+            (paginacion.decodificar_cursor, "bm9wZQ"),
+            (conversacion.decodificar_cursor, ajeno),
+            (busqueda._decodificar_cursor, "bm9wZQ"),
+            (busqueda._decodificar_cursor, busqueda._codificar_cursor(busqueda.MAX_RESULTADOS)),
+        ):
+            with self.assertRaises(CursorInvalido, msg=cursor):
+                decodificar(cursor)
+
+    def test_leer_limite(self):
+        self.assertEqual(paginacion.leer_limite(None, 20, 50), 20)
+        self.assertEqual(paginacion.leer_limite("abc", 20, 50), 20)
+        self.assertEqual(paginacion.leer_limite("500", 20, 50), 50)
+        self.assertEqual(paginacion.leer_limite("0", 20, 50), 1)
+
+
+class ListaObsoletaTests(TestCase):
+    def test_lista_acotada(self):
+        autor = User.objects.create_user("autor", "autor@example.com", "x")
+        for i in range(paginacion.LIMITE_FEED + 5):
+            Publicacion.objects.create(autor=autor, contenido=f"Aviso {i}")
+        url = reverse("foro:api_publicaciones_list")
+
+        respuesta = self.client.get(url)
+        self.assertEqual(len(respuesta.json()), paginacion.LIMITE_FEED)
+        self.assertEqual(respuesta.json()[0]["contenido"], f"Aviso {paginacion.LIMITE_FEED + 4}")
+        self.assertEqual(respuesta["Deprecation"], "true")
+        self.assertEqual(len(self.client.get(url, {"limite": 500}).json()), paginacion.LIMITE_FEED + 5)
+
+
+class NormalizacionTests(SimpleTestCase):
+    def test_sin_tildes_ni_mayusculas(self):
+        self.assertEqual(busqueda.normalizar("Reunión del Pingüino"), "reunion del pinguino")
+
+    def test_terminos(self):
+        # Sin palabras vacías ni términos de una letra, con repeticiones
+        self.assertEqual(busqueda.terminos("La reunión y la REUNION de mañana a las 8"), ["reunion", "reunion", "manana"])
+
+
+class BusquedaTests(TestCase):
+    def setUp(self):
+        self.autor = User.objects.create_user("autor", "autor@example.com", "x")
+
+    def ids(self, consulta, **kwargs):
+        resultados, _ = busqueda.buscar(consulta, **kwargs)
+        return [pk for pk, _ in resultados]
+
+    def test_todos_los_terminos_y_orden(self):
+        en_texto = Publicacion.objects.create(autor=self.autor, contenido="Reunión por la plaza")
+        en_comentario = Publicacion.objects.create(autor=self.autor, contenido="Aviso")
+        Comentario.objects.create(publicacion=en_comentario, autor=self.autor, contenido="¿la reunion es en la plaza?")
+        Publicacion.objects.create(autor=self.autor, contenido="Solo reunión")
+
+        # El texto de la publicación pesa más que un comentario
+        self.assertEqual(self.ids("reunion plaza"), [en_texto.pk, en_comentario.pk])
+        self.assertEqual(self.ids("piscina"), [])
+
+    def test_ocultas_solo_para_moderadores(self):
+        oculta = Publicacion.objects.create(autor=self.autor, contenido="Feria oculta", visible=False)
+        self.assertEqual(self.ids("feria"), [])
+        self.assertEqual(self.ids("feria", ver_ocultas=True), [oculta.pk])
+
+    def test_paginas(self):
+        for i in range(5):
+            Publicacion.objects.create(autor=self.autor, contenido=f"Feria número {i}")
+        pagina, siguiente = busqueda.buscar("feria", limite=3)
+        resto, fin = busqueda.buscar("feria", cursor=siguiente, limite=3)
+        self.assertEqual((len(pagina), len(resto), fin), (3, 2, None))
+        self.assertFalse({pk for pk, _ in pagina} & {pk for pk, _ in resto})
@@ -0,0 +1,107 @@
+# foro/tiempo_real.py
+"""
+Conversación de una publicación en vivo (ver foro.consumers.ConversacionConsumer).
+
+Cada cambio (comentario o adjunto nuevo, "me gusta", moderación) se emite al
+grupo de la publicación como un delta pequeño cuando la transacción confirma.
+El cliente lo aplica sobre lo que ya tiene en pantalla, sin recargar la página
+ni volver a pedir api_publicacion_comentarios.
+"""
+from core import sincronizacion
+from core.condicional import subir_version
+from core.tiempo_real import emitir_al_confirmar
+
+from .models import Publicacion
+
+# Nombre del handler en el consumer (Channels cambia '.' por '_')
+TIPO_EVENTO = "foro.delta"
+
+
+def grupo_publicacion(publicacion_id):
+    return f"foro-publicacion-{publicacion_id}"
+
+
+# Eventos que cambian lo que la app sincroniza de la publicación. Los likes
+# no (van en vivo y en el feed) y los de la publicación misma ya pasan por save()
+EVENTOS_SINCRONIZADOS = {
+    "comentario_nuevo", "comentario_visible", "comentario_oculto",
+    "adjunto_nuevo", "adjunto_eliminado", "adjunto_procesado",
+    "adjunto_variantes", "adjunto_transcrito",
+}
+
+
+def emitir(publicacion_id, tipo, **datos):
+    # Lo que cambia en vivo también cambia las listas: incluye los UPDATE sin
+    # post_save (likes, variantes, compresión, transcripción)
+    subir_version("foro")
+    if tipo in EVENTOS_SINCRONIZADOS:
+        sincronizacion.tocar(Publicacion.objects.filter(pk=publicacion_id))
+    emitir_al_confirmar(grupo_publicacion(publicacion_id), TIPO_EVENTO, {"type": tipo, **datos})
+
+
+# =========================
+# Deltas
+# =========================
+def comentario_a_dict(c):
+    return {
+        "id": c.id,
+        "autor_username": c.autor.username,
+        "contenido": c.contenido,
+        "fecha_creacion": c.fecha_creacion.isoformat(),
+        "parent": c.parent_id,
+        "profundidad": c.profundidad,
+        "total_likes": c.total_likes,
+    }
+
+
+def adjunto_a_dict(a):
+    return {
+        "id": a.id,
+        "autor_username": a.autor.username,
+        "url": a.archivo.url,
+        "url_media": a.url_media,
+        "tipo_archivo": a.tipo_archivo,
+        "descripcion": a.descripcion,
+        "es_mensaje": a.es_mensaje,
+        "estado_procesamiento": a.estado_procesamiento,
+        "transcripcion": a.transcripcion,
+        "fecha_creacion": a.fecha_creacion.isoformat(),
+        "total_likes": a.total_likes,
+    }
+
+
+def comentario_guardado(comentario, creado):
+    if creado:
+        if comentario.visible:
+            emitir(comentario.publicacion_id, "comentario_nuevo", comentario=comentario_a_dict(comentario))
+    elif comentario.visible:
+        # Restaurado o editado: va completo para que el cliente lo inserte o reemplace
+        emitir(comentario.publicacion_id, "comentario_visible", comentario=comentario_a_dict(comentario))
+    else:
+        # Moderado: solo el id, el contenido oculto no sale del servidor
+        emitir(comentario.publicacion_id, "comentario_oculto", id=comentario.id)
+
+
+def adjunto_guardado(adjunto, creado):
+    if creado:
+        emitir(adjunto.publicacion_id, "adjunto_nuevo", adjunto=adjunto_a_dict(adjunto))
+
+
+def adjunto_eliminado(adjunto):
+    emitir(adjunto.publicacion_id, "adjunto_eliminado", id=adjunto.id)
+
+
+def like_cambiado(obj, total):
+    modelo = obj._meta.model_name  # "comentario" | "archivoadjunto"
+    emitir(
+        obj.publicacion_id, "likes",
+        objeto="adjunto" if modelo == "archivoadjunto" else modelo, id=obj.pk, total_likes=total,
+    )
+
+
+def publicacion_guardada(publicacion):
+    emitir(publicacion.pk, "publicacion_visible" if publicacion.visible else "publicacion_oculta", id=publicacion.pk)
+
+
+def publicacion_eliminada(publicacion_id):
+    emitir(publicacion_id, "publicacion_eliminada", id=publicacion_id)
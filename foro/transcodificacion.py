@@ -0,0 +1,203 @@
+# foro/transcodificacion.py
+"""
+Compresión de audios y videos del foro con ffmpeg (en el worker).
+
+Lo que suben la web y la app se guarda tal cual (WAV de notas de voz, videos
+4K del teléfono) y después se lee completo en cada reproducción. Aquí se
+convierte a formatos compactos:
+
+- audio -> Opus en WebM, mono, 32 kbps (suficiente para voz);
+- video -> H.264 + AAC en MP4, lado mayor acotado a 1280 px, CRF con tope de
+  bitrate y 'faststart' para empezar a reproducir antes de bajarlo entero.
+
+El avance se guarda en ArchivoAdjunto.progreso_procesamiento leyendo la
+salida '-progress' de ffmpeg. Al terminar, el archivo comprimido reemplaza al
+original solo si es más liviano; si ffmpeg falla se sigue usando el original.
+"""
+import logging
+import os
+import tempfile
+
+import ffmpeg
+from django.core.files import File
+from django.db import transaction
+
+from . import tiempo_real
+from .models import ArchivoAdjunto
+
+logger = logging.getLogger(__name__)
+
+Estado = ArchivoAdjunto.EstadoProcesamiento
+
+LADO_MAXIMO_VIDEO = 1280
+AUDIO_BITRATE = "32k"
+# Un audio ya en Opus con este bitrate o menos se deja como está
+AUDIO_BITRATE_MAXIMO = 64_000
+VIDEO_CRF = 28
+VIDEO_BITRATE_MAXIMO = "2M"
+
+SALIDAS = {
+    "audio": {
+        "extension": ".webm",
+        "opciones": {"vn": None, "acodec": "libopus", "audio_bitrate": AUDIO_BITRATE, "ac": 1, "f": "webm"},
+    },
+    "video": {
+        "extension": ".mp4",
+        "opciones": {
+            "vcodec": "libx264", "preset": "veryfast", "crf": VIDEO_CRF,
+            "maxrate": VIDEO_BITRATE_MAXIMO, "bufsize": "4M", "pix_fmt": "yuv420p",
+            # Lado mayor <= LADO_MAXIMO_VIDEO, sin agrandar, dimensiones pares
+            "vf": (
+                f"scale='if(gte(iw,ih),min({LADO_MAXIMO_VIDEO},iw),-2)'"
+                f":'if(gte(iw,ih),-2,min({LADO_MAXIMO_VIDEO},ih))'"
+            ),
+            "acodec": "aac", "audio_bitrate": "96k",
+            "movflags": "+faststart", "f": "mp4",
+        },
+    },
+}
+
+
+def tipo_media(adjunto):
+    return adjunto.tipo_archivo if adjunto.tipo_archivo in SALIDAS else None
+
+
+# =========================
+# Encolado
+# =========================
+def encolar(adjunto):
+    """Marca un audio/video recién subido como PENDIENTE y lo manda al worker al confirmar."""
+    if tipo_media(adjunto) is None:
+        return
+    ArchivoAdjunto.objects.filter(pk=adjunto.pk).update(
+        estado_procesamiento=Estado.PENDIENTE, progreso_procesamiento=0
+    )
+    adjunto.estado_procesamiento = Estado.PENDIENTE
+    from .tasks import transcodificar_adjunto
+    transaction.on_commit(lambda: transcodificar_adjunto.delay(adjunto.pk))
+
+
+# =========================
+# ffmpeg
+# =========================
+def _ya_compacto(tipo, info):
+    """Evita recomprimir lo que ya viene liviano (p. ej. notas de voz Opus del navegador)."""
+    pistas = info.get("streams", [])
+    if tipo == "audio":
+        audio = next((s for s in pistas if s.get("codec_type") == "audio"), None)
+        bitrate = int(audio.get("bit_rate") or info.get("format", {}).get("bit_rate") or 0) if audio else 0
+        return bool(audio) and audio.get("codec_name") == "opus" and 0 < bitrate <= AUDIO_BITRATE_MAXIMO
+    video = next((s for s in pistas if s.get("codec_type") == "video"), None)
+    return (
+        bool(video) and video.get("codec_name") == "h264"
+        and max(int(video.get("width") or 0), int(video.get("height") or 0)) <= LADO_MAXIMO_VIDEO
+    )
+
+
+def _duracion(info):
+    try:
+        return float(info["format"]["duration"])
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def convertir(origen, destino, tipo, duracion, al_avanzar=None):
+    """
+    Corre ffmpeg leyendo '-progress pipe:1'; llama al_avanzar(porcentaje)
+    cada vez que sube al menos 5 puntos. Lanza ffmpeg.Error si falla.
+    """
+    proceso = (
+        ffmpeg
+        .input(origen)
+        .output(destino, **SALIDAS[tipo]["opciones"])
+        .global_args("-progress", "pipe:1", "-nostats", "-loglevel", "error")
+        .overwrite_output()
+        .run_async(pipe_stdout=True, pipe_stderr=True)
+    )
+    informado = 0
+    for linea in proceso.stdout:
+        clave, _, valor = linea.decode(errors="replace").strip().partition("=")
+        # out_time_us (ffmpeg >= 5) y out_time_ms (anteriores) vienen ambos en microsegundos
+        if clave in ("out_time_us", "out_time_ms") and duracion and valor.isdigit():
+            porcentaje = min(99, int(int(valor) / 1_000_000 / duracion * 100))
+            if al_avanzar and porcentaje >= informado + 5:
+                informado = porcentaje
+                al_avanzar(porcentaje)
+    errores = proceso.stderr.read()
+    if proceso.wait() != 0:
+        raise ffmpeg.Error("ffmpeg", b"", errores)
+
+
+# =========================
+# Proceso completo
+# =========================
+def _guardar_progreso(adjunto_id, porcentaje):
+    ArchivoAdjunto.objects.filter(pk=adjunto_id).update(progreso_procesamiento=porcentaje)
+
+
+def procesar_adjunto(adjunto):
+    """Comprime el audio/video de 'adjunto' y reemplaza el original si conviene."""
+    tipo = tipo_media(adjunto)
+    if tipo is None:
+        return
+    ArchivoAdjunto.objects.filter(pk=adjunto.pk).update(estado_procesamiento=Estado.PROCESANDO)
+
+    sufijo = os.path.splitext(adjunto.archivo.name)[1]
+    with tempfile.TemporaryDirectory() as carpeta:
+        origen = os.path.join(carpeta, "origen" + sufijo)
+        destino = os.path.join(carpeta, "destino" + SALIDAS[tipo]["extension"])
+        with adjunto.archivo.open("rb") as f, open(origen, "wb") as copia:
+            for bloque in f.chunks():
+                copia.write(bloque)
+        tamano_original = os.path.getsize(origen)
+
+        try:
+            info = ffmpeg.probe(origen)
+            if _ya_compacto(tipo, info):
+                _terminar(adjunto, tamano_original)
+                return
+            convertir(origen, destino, tipo, _duracion(info), lambda p: _guardar_progreso(adjunto.pk, p))
+            tamano_nuevo = os.path.getsize(destino)
+        except (ffmpeg.Error, OSError) as e:
+            detalle = getattr(e, "stderr", b"") or b""
+            logger.warning(
+                "No se pudo comprimir el adjunto %s: %s %s",
+                adjunto.pk, e, detalle.decode(errors="replace")[-500:],
+            )
+            ArchivoAdjunto.objects.filter(pk=adjunto.pk).update(estado_procesamiento=Estado.ERROR)
+            return
+
+        if tamano_nuevo >= tamano_original:
+            # Ya venía comprimido de otra forma: el original se queda
+            _terminar(adjunto, tamano_original)
+            return
+
+        anterior = adjunto.archivo.name
+        base = os.path.splitext(os.path.basename(anterior))[0]
+        with open(destino, "rb") as f:
+            # save=False: solo se escribe el archivo; la fila se actualiza abajo sin disparar post_save
+            adjunto.archivo.save(base + SALIDAS[tipo]["extension"], File(f), save=False)
+
+    if _terminar(adjunto, tamano_original, archivo=adjunto.archivo.name):
+        adjunto.archivo.storage.delete(anterior)
+    else:
+        # Lo borraron mientras se procesaba: no dejar el comprimido huérfano
+        adjunto.archivo.storage.delete(adjunto.archivo.name)
+
+
+def _terminar(adjunto, tamano_original, archivo=None):
+    cambios = {
+        "estado_procesamiento": Estado.LISTO,
+        "progreso_procesamiento": 100,
+        "tamano_original": tamano_original,
+    }
+    if archivo:
+        cambios["archivo"] = archivo
+    if not ArchivoAdjunto.objects.filter(pk=adjunto.pk).update(**cambios):
+        return False
+    # Quien tenga la conversación abierta pasa a reproducir la versión comprimida
+    tiempo_real.emitir(
+        adjunto.publicacion_id, "adjunto_procesado",
+        id=adjunto.pk, url=adjunto.archivo.url, tipo_archivo=adjunto.tipo_archivo,
+    )
+    return True
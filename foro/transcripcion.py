@@ -0,0 +1,70 @@
+# foro/transcripcion.py
+"""
+Transcripción de las notas de voz del foro con el modelo Vosk compartido
+(core.vosk_modelo).
+
+Va en la cola de baja prioridad "foro_transcripcion" (CELERY_TASK_ROUTES),
+que atiende un worker aparte con concurrencia 1: las notas de voz nunca le quitan turno a la transcripción
+de las actas de reunión. El worker carga el modelo una vez y lo reutiliza en
+todas las tareas. De cada audio se transcriben solo los primeros
+DURACION_MAXIMA segundos.
+"""
+import logging
+import os
+import tempfile
+
+import ffmpeg
+from django.conf import settings
+from django.db import transaction
+
+from core import vosk_modelo
+
+from . import busqueda, tiempo_real
+from .models import ArchivoAdjunto
+
+logger = logging.getLogger(__name__)
+
+Estado = ArchivoAdjunto.EstadoProcesamiento
+
+DURACION_MAXIMA = getattr(settings, "FORO_TRANSCRIPCION_DURACION_MAX", 300)
+
+
+def encolar(adjunto):
+    """Marca una nota de voz recién subida como PENDIENTE y la manda a la cola al confirmar."""
+    if adjunto.tipo_archivo != "audio":
+        return
+    ArchivoAdjunto.objects.filter(pk=adjunto.pk).update(estado_transcripcion=Estado.PENDIENTE)
+    adjunto.estado_transcripcion = Estado.PENDIENTE
+    from .tasks import transcribir_adjunto
+    transaction.on_commit(lambda: transcribir_adjunto.delay(adjunto.pk))
+
+
+def procesar_adjunto(adjunto):
+    """Transcribe la nota de voz de 'adjunto' y guarda el texto. Devuelve el texto o None si falló."""
+    ArchivoAdjunto.objects.filter(pk=adjunto.pk).update(estado_transcripcion=Estado.PROCESANDO)
+
+    sufijo = os.path.splitext(adjunto.archivo.name)[1]
+    with tempfile.TemporaryDirectory() as carpeta:
+        origen = os.path.join(carpeta, "origen" + sufijo)
+        wav = os.path.join(carpeta, "audio.wav")
+        with adjunto.archivo.open("rb") as f, open(origen, "wb") as copia:
+            for bloque in f.chunks():
+                copia.write(bloque)
+        try:
+            vosk_modelo.a_wav(origen, wav, DURACION_MAXIMA)
+        except ffmpeg.Error as e:
+            logger.warning(
+                "No se pudo convertir la nota de voz %s: %s",
+                adjunto.pk, (e.stderr or b"").decode(errors="replace")[-500:],
+            )
+            ArchivoAdjunto.objects.filter(pk=adjunto.pk).update(estado_transcripcion=Estado.ERROR)
+            return None
+        texto = vosk_modelo.transcribir_wav(wav)
+
+    ArchivoAdjunto.objects.filter(pk=adjunto.pk).update(transcripcion=texto, estado_transcripcion=Estado.LISTO)
+    adjunto.transcripcion = texto
+    # El update no pasa por post_save: se indexa aquí para que la nota de voz aparezca en el buscador
+    busqueda.indexar(adjunto)
+    if texto:
+        tiempo_real.emitir(adjunto.publicacion_id, "adjunto_transcrito", id=adjunto.pk, transcripcion=texto)
+    return texto
@@ -12,6 +12,7 @@ urlpatterns = [
     path("publicacion/<int:pk>/", views.detalle_publicacion, name="detalle_publicacion"),
     path("publicacion/<int:pk>/alternar/", views.alternar_publicacion_web, name="alternar_publicacion_web"),
     path("publicacion/<int:pk>/eliminar/", views.eliminar_publicacion_web, name="eliminar_publicacion_web"),
+    path("publicacion/<int:pk>/conversacion/", views.conversacion_anteriores, name="conversacion_anteriores"),
     path("comentario/<int:pk>/eliminar/", views.eliminar_comentario_web, name="eliminar_comentario_web"),
     path("comentario/<int:pk>/restaurar/", views.restaurar_comentario_web, name="restaurar_comentario_web"),
 
@@ -19,9 +20,18 @@ urlpatterns = [
     # GET /foro/api/v1/publicaciones/
     path("api/v1/publicaciones/", views.api_publicaciones_list, name="api_publicaciones_list"),
 
+    # GET /foro/api/v1/feed/?cursor=...&limite=20  (paginado por cursor)
+    path("api/v1/feed/", views.api_feed_publicaciones, name="api_feed_publicaciones"),
+
+    # GET /foro/api/v1/buscar/?q=reunion&cursor=...&limite=20  (por relevancia, sin tildes)
+    path("api/v1/buscar/", views.api_buscar_publicaciones, name="api_buscar_publicaciones"),
+
     # GET  /foro/api/v1/publicaciones/<id>/comentarios/
     # POST /foro/api/v1/publicaciones/<id>/comentarios/
     path("api/v1/publicaciones/<int:pk>/comentarios/", views.api_publicacion_comentarios, name="api_publicacion_comentarios"),
+
+    # GET /foro/api/v1/publicaciones/<id>/conversacion/?cursor=...&limite=30  (últimos N, luego los anteriores)
+    path("api/v1/publicaciones/<int:pk>/conversacion/", views.api_publicacion_conversacion, name="api_publicacion_conversacion"),
     path(
             "api/v1/publicaciones/<int:pk>/adjuntos/",
             views.api_subir_adjunto,
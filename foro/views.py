@@ -1,15 +1,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.contrib import messages
-from django.http import HttpResponse, Http404
-from django.template.loader import render_to_string
-from django.db.models import Count, Q
+from django.http import HttpResponse, Http404, JsonResponse
+from django.template.loader import get_template, render_to_string
+from django.db.models import Count, Prefetch, Q
 import json
 
 from .models import Publicacion, ArchivoAdjunto, Comentario
 from .forms import PublicacionForm, ComentarioCreateForm
+from . import busqueda, imagenes, paginacion
+from .arbol import arbol_a_dicts, armar_arbol, comentarios_del_hilo
+from .conversacion import COMENTARIO, LIMITE_CONVERSACION, LIMITE_CONVERSACION_MAX, pagina_conversacion, total_conversacion
+from .likes import alternar_like, contexto_likes, ids_con_like
 from core.authz import can, role_required
+from core.condicional import etag_lista
 
 # ==== API (DRF) ====
 from rest_framework.decorators import api_view, permission_classes, authentication_classes, parser_classes
@@ -21,7 +27,6 @@ from .serializers import PublicacionSerializer, ArchivoAdjuntoSerializer, Coment
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from core.templatetags.can import can
 from itertools import chain
-from operator import attrgetter
 from core.authz import can, role_required
 # ------------------------------------------------------------------------------
 #                                   WEB
@@ -56,6 +61,9 @@ def lista_publicaciones(request):
     else:
         form = PublicacionForm()
 
+    # Imágenes subidas antes de existir las variantes: se generan al primer uso
+    imagenes.encolar_faltantes(a for p in publicaciones for a in p.adjuntos.all())
+
     context = {
         "publicaciones": publicaciones,
         "form": form,
@@ -93,6 +101,19 @@ def crear_mensaje(request):
         )
 
     return Response({"mensaje": "ok"})
+def _es_fetch(request):
+    return request.headers.get("x-requested-with") == "XMLHttpRequest"
+
+
+def _resultado_post(request, publicacion, nivel, texto):
+    """JSON para fetch; mensaje + redirect al detalle para el formulario clásico."""
+    if _es_fetch(request):
+        ok = nivel == messages.SUCCESS
+        return JsonResponse({"ok": ok, "mensaje": texto}, status=200 if ok else 400)
+    messages.add_message(request, nivel, texto)
+    return redirect("foro:detalle_publicacion", pk=publicacion.pk)
+
+
 @login_required
 def detalle_publicacion(request, pk):
     es_moderador = can(request.user, "foro", "moderar")
@@ -109,6 +130,8 @@ def detalle_publicacion(request, pk):
         return redirect("foro:lista_publicaciones")
 
     # 2. Lógica para ENVIAR un comentario o archivo (POST desde la Web)
+    # Si llega por fetch (foro_detalle.js) se responde JSON: el comentario nuevo
+    # aparece en pantalla por el WebSocket de la conversación, sin recargar.
     if request.method == "POST":
         parent_id = request.POST.get('parent_id') # <--- NUEVA LÍNEA CLAVE
 
@@ -117,8 +140,7 @@ def detalle_publicacion(request, pk):
             contenido = request.POST.get('contenido', '').strip()
             
             if not contenido:
-                messages.error(request, "El contenido de la respuesta no puede estar vacío.")
-                return redirect("foro:detalle_publicacion", pk=publicacion.pk)
+                return _resultado_post(request, publicacion, messages.ERROR, "El contenido de la respuesta no puede estar vacío.")
 
             try:
                 # El campo parent solo puede apuntar a otro Comentario (no ArchivoAdjunto)
@@ -130,12 +152,10 @@ def detalle_publicacion(request, pk):
                     contenido=contenido,
                     parent=parent_comment  # <--- GUARDAMOS LA REFERENCIA DEL PADRE
                 )
-                messages.success(request, "Respuesta publicada.")
-                return redirect("foro:detalle_publicacion", pk=publicacion.pk)
+                return _resultado_post(request, publicacion, messages.SUCCESS, "Respuesta publicada.")
 
             except Comentario.DoesNotExist:
-                messages.error(request, "Error al responder: El comentario original no es válido o ha sido eliminado.")
-                return redirect("foro:detalle_publicacion", pk=publicacion.pk)
+                return _resultado_post(request, publicacion, messages.ERROR, "Error al responder: El comentario original no es válido o ha sido eliminado.")
 
         
         # CASO B: Es el formulario PRINCIPAL (al pie de página)
@@ -158,19 +178,18 @@ def detalle_publicacion(request, pk):
                     es_mensaje=True,       # Esto hace que salga en el chat
                     descripcion=contenido  # Unimos el texto a la foto
                 )
-                messages.success(request, "Archivo publicado.")
+                return _resultado_post(request, publicacion, messages.SUCCESS, "Archivo publicado.")
             
             elif contenido:
                 # CASO B: Es solo texto
                 # Usamos el método save del form que crea un Comentario normal
                 form.save(publicacion=publicacion, autor=request.user)
-                messages.success(request, "Comentario publicado.")
+                return _resultado_post(request, publicacion, messages.SUCCESS, "Comentario publicado.")
 
             # En ambos casos (A o B) debe haber contenido o archivo
-            elif not archivo and not contenido:
-                 messages.error(request, "Debes ingresar contenido o adjuntar un archivo.")
-                 
-            return redirect("foro:detalle_publicacion", pk=publicacion.pk)
+            return _resultado_post(request, publicacion, messages.ERROR, "Debes ingresar contenido o adjuntar un archivo.")
+        elif _es_fetch(request):
+            return JsonResponse({"ok": False, "mensaje": "No se pudo publicar el comentario.", "errores": form.errors}, status=400)
         else:
             messages.error(request, "No se pudo publicar el comentario.")
 
@@ -179,28 +198,50 @@ def detalle_publicacion(request, pk):
         form = ComentarioCreateForm()
 
     # ---------------------------------------------------------
-    # 3. LÓGICA DE FUSIÓN (CHAT)
+    # 3. CONVERSACIÓN (CHAT)
     # ---------------------------------------------------------
-    
-    # A. Comentarios de texto
-    # Incluimos parent__autor para mostrar el nombre del padre en la plantilla web.
-    comentarios = publicacion.comentarios.filter(visible=True).select_related('autor', 'parent__autor')
-    
-    # B. Archivos adjuntos del chat (App y Web)
-    adjuntos_chat = publicacion.adjuntos.filter(es_mensaje=True).select_related('autor')
-
-    # C. Fusionamos y ordenamos por fecha
-    conversacion = sorted(
-        chain(comentarios, adjuntos_chat),
-        key=attrgetter('fecha_creacion')
+    # Comentarios y adjuntos del chat en una sola línea de tiempo paginada:
+    # solo los últimos N; los anteriores se piden con "Cargar mensajes anteriores".
+    conversacion, anteriores = pagina_conversacion(publicacion.pk)
+    imagenes.encolar_faltantes(
+        chain(publicacion.adjuntos.all(), (i for i in conversacion if i.tipo_item != COMENTARIO))
     )
 
     return render(request, 'foro/detalle_publicacion.html', {
         'publicacion': publicacion,
         'form': form,
         'conversacion': conversacion, 
-        'es_moderador': es_moderador
+        'conversacion_anteriores': anteriores,
+        'total_conversacion': total_conversacion(publicacion.pk),
+        'es_moderador': es_moderador,
+        # Comentarios con "me gusta" del usuario (una consulta para toda la página)
+        'comentarios_con_like': _comentarios_con_like(conversacion, request.user),
     })
+
+
+def _comentarios_con_like(items, usuario):
+    return ids_con_like(Comentario, [i.pk for i in items if i.tipo_item == COMENTARIO], usuario)
+
+
+@login_required
+def conversacion_anteriores(request, pk):
+    """Página anterior de la conversación ya renderizada (botón "Cargar mensajes anteriores")."""
+    qs = Publicacion.objects.all()
+    if not can(request.user, "foro", "moderar"):
+        qs = qs.filter(visible=True)
+    publicacion = get_object_or_404(qs, pk=pk)
+    try:
+        items, anteriores = pagina_conversacion(publicacion.pk, request.GET.get("cursor"))
+    except paginacion.CursorInvalido as e:
+        return JsonResponse({"detail": str(e)}, status=400)
+
+    contexto = {
+        'publicacion': publicacion,
+        'comentarios_con_like': _comentarios_con_like(items, request.user),
+    }
+    plantilla = get_template('foro/_item_conversacion.html')
+    html = "".join(plantilla.render({**contexto, 'item': item}, request) for item in items)
+    return JsonResponse({"html": html, "anteriores": anteriores})
 # --- VISTAS DE MODERACIÓN (WEB) ---
 
 @require_POST
@@ -324,15 +365,80 @@ def crear_publicacion(request):
 @api_view(["GET"])
 @authentication_classes([TokenAuthentication, SessionAuthentication])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@etag_lista("foro", por_usuario=True)
 def api_publicaciones_list(request):
-    qs = (
-        Publicacion.objects.filter(visible=True)
-        .select_related("autor")
-        .prefetch_related("adjuntos", "comentarios__autor")
-        .order_by("-fecha_creacion")
+    """
+    Obsoleta (la app usa api_feed_publicaciones): queda para las versiones
+    ya instaladas, acotada a las ?limite= publicaciones más recientes
+    (LIMITE_FEED por defecto, a lo más LIMITE_FEED_MAX).
+    """
+    limite = paginacion.leer_limite(
+        request.query_params.get("limite"), paginacion.LIMITE_FEED, paginacion.LIMITE_FEED_MAX
     )
-    serializer = PublicacionSerializer(qs, many=True, context={"request": request})
-    return Response(serializer.data)
+    qs = Publicacion.objects.filter(visible=True).order_by("-fecha_creacion", "-id")[:limite]
+    response = Response(paginacion.serializar_publicaciones_completas(request, qs))
+    response["Deprecation"] = "true"
+    response["Link"] = f'<{reverse("foro:api_feed_publicaciones")}>; rel="successor-version"'
+    return response
+
+@api_view(["GET"])
+@authentication_classes([TokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def api_feed_publicaciones(request):
+    """
+    Feed paginado por cursor: ?cursor=<siguiente de la página anterior>&limite=20.
+    Cada publicación trae sus primeros comentarios y 'comentarios_siguiente'
+    para seguir con api_publicacion_comentarios.
+    """
+    try:
+        return Response(paginacion.pagina_feed(request))
+    except paginacion.CursorInvalido as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(["GET"])
+@authentication_classes([TokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def api_buscar_publicaciones(request):
+    """
+    Búsqueda en el foro: ?q=<texto>&cursor=<siguiente>&limite=20.
+    Publicaciones cuyo hilo contiene todos los términos, por relevancia
+    ('puntaje'), con el mismo formato que el feed.
+    """
+    try:
+        return Response(busqueda.pagina_busqueda(request))
+    except paginacion.CursorInvalido as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(["GET"])
+@authentication_classes([TokenAuthentication, SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def api_publicacion_conversacion(request, pk: int):
+    """
+    Conversación (comentarios + adjuntos tipo mensaje) de más nueva a más
+    antigua por páginas: sin ?cursor= trae los últimos ?limite= ítems y
+    'anteriores' es el cursor de la página previa (null si no hay más).
+    Cada ítem lleva "tipo": "comentario" | "adjunto".
+    """
+    pub = get_object_or_404(Publicacion, pk=pk, visible=True)
+    limite = paginacion.leer_limite(request.query_params.get("limite"), LIMITE_CONVERSACION, LIMITE_CONVERSACION_MAX)
+    try:
+        items, anteriores = pagina_conversacion(pub.pk, request.query_params.get("cursor"), limite)
+    except paginacion.CursorInvalido as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    contexto = {
+        "request": request,
+        **contexto_likes(
+            request.user,
+            comentario_ids=[i.pk for i in items if i.tipo_item == COMENTARIO],
+            adjunto_ids=[i.pk for i in items if i.tipo_item != COMENTARIO],
+        ),
+    }
+    resultados = []
+    for item in items:
+        serializer = ComentarioSerializer if item.tipo_item == COMENTARIO else ArchivoAdjuntoSerializer
+        resultados.append({"tipo": item.tipo_item, **serializer(item, context=contexto).data})
+    return Response({"resultados": resultados, "anteriores": anteriores})
 
 @api_view(["GET", "POST"])
 @authentication_classes([TokenAuthentication, SessionAuthentication])
@@ -340,7 +446,31 @@ def api_publicacion_comentarios(request, pk: int):
     pub = get_object_or_404(Publicacion, pk=pk)
 
     if request.method == "GET":
+        # ?tree=1: hilo anidado a cualquier profundidad (o el subárbol de ?raiz=<id>) en una consulta
+        if request.query_params.get("tree") == "1":
+            raiz = None
+            if request.query_params.get("raiz"):
+                raiz = get_object_or_404(Comentario, pk=request.query_params["raiz"], publicacion=pub)
+            raices = armar_arbol(comentarios_del_hilo(pub.pk, raiz=raiz).filter(visible=True))
+            return Response(arbol_a_dicts(raices, _comentario_to_dict))
+
         qs = pub.comentarios.select_related("autor").order_by("fecha_creacion")
+        # Con ?cursor= o ?limite= se pagina ("ver más" del feed); sin ellos, la lista completa de siempre
+        if "cursor" in request.query_params or "limite" in request.query_params:
+            limite = paginacion.leer_limite(
+                request.query_params.get("limite"),
+                paginacion.LIMITE_COMENTARIOS_MAX, paginacion.LIMITE_COMENTARIOS_MAX,
+            )
+            try:
+                comentarios, siguiente = paginacion.pagina_ascendente(
+                    qs.filter(visible=True), request.query_params.get("cursor"), limite
+                )
+            except paginacion.CursorInvalido as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({
+                "resultados": [_comentario_to_dict(c) for c in comentarios],
+                "siguiente": siguiente,
+            })
         return Response([_comentario_to_dict(c) for c in qs])
 
     if not request.user.is_authenticated:
@@ -475,30 +605,21 @@ def api_eliminar_comentario(request, pk):
 @permission_classes([IsAuthenticated])
 def api_toggle_like_comentario(request, pk):
     comentario = get_object_or_404(Comentario, pk=pk, visible=True)
-    usuario = request.user
-
-    if usuario in comentario.likes.all():
-        comentario.likes.remove(usuario)
-        liked = False
-    else:
-        comentario.likes.add(usuario)
-        liked = True
+    liked, total_likes = alternar_like(comentario, request.user)
 
     return Response({
         "liked": liked,
-        "total_likes": comentario.likes.count()
+        "total_likes": total_likes
     })
 
 @login_required
 def reaccionar_comentario_web(request, pk):
     comentario = get_object_or_404(Comentario, pk=pk, visible=True)
-    
-    if request.user in comentario.likes.all():
-        comentario.likes.remove(request.user)
-    else:
-        comentario.likes.add(request.user)
+    liked, total_likes = alternar_like(comentario, request.user)
+    if _es_fetch(request):
+        return JsonResponse({"liked": liked, "total_likes": total_likes})
         
-    return redirect("foro:detalle_publicacion", pk=comentario.publicacion.pk)
+    return redirect("foro:detalle_publicacion", pk=comentario.publicacion_id)
 
 @api_view(["DELETE"])
 @authentication_classes([TokenAuthentication, SessionAuthentication])
@@ -523,16 +644,9 @@ def api_eliminar_adjunto(request, pk):
 @permission_classes([IsAuthenticated])
 def api_toggle_like_adjunto(request, pk):
     adjunto = get_object_or_404(ArchivoAdjunto, pk=pk)
-    usuario = request.user
-
-    if usuario in adjunto.likes.all():
-        adjunto.likes.remove(usuario)
-        liked = False
-    else:
-        adjunto.likes.add(usuario)
-        liked = True
+    liked, total_likes = alternar_like(adjunto, request.user)
 
     return Response({
         "liked": liked,
-        "total_likes": adjunto.likes.count()
+        "total_likes": total_likes
     })
\ No newline at end of file
@@ -3,13 +3,16 @@ import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
-from reuniones.routing import websocket_urlpatterns
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "proyecto_tesis.settings")
 
 django_asgi = get_asgi_application()
 
+from core.ws_auth import TokenAuthMiddleware
+from foro.routing import websocket_urlpatterns as foro_ws
+from reuniones.routing import websocket_urlpatterns as reuniones_ws
+
 application = ProtocolTypeRouter({
     "http": django_asgi,
-    "websocket": AuthMiddlewareStack(URLRouter(websocket_urlpatterns)),
+    "websocket": AuthMiddlewareStack(TokenAuthMiddleware(URLRouter(reuniones_ws + foro_ws))),
 })
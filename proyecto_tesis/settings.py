@@ -5,6 +5,7 @@ Django 5.x
 
 from pathlib import Path
 import os
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 # ==============================================================
@@ -78,6 +79,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # Lo más arriba posible para medir toda la petición (los estáticos ya los sirve WhiteNoise)
+    "core.middleware.MonitorRendimientoMiddleware",
 
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -87,7 +90,6 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 
     "core.middleware.ForcePasswordChangeMiddleware",
-    # "core.middleware.MonitorRendimientoMiddleware",
 ]
 
 ROOT_URLCONF = "proyecto_tesis.urls"
@@ -211,6 +213,13 @@ else:
     MEDIA_URL = "/media/"
     MEDIA_ROOT = BASE_DIR / "media"
 
+# Entrega de /media/ (core.media). Vacío: Django envía los bytes (con Range).
+# "x-accel": nginx con un location interno, por ejemplo
+#     location /media-interno/ { internal; alias /ruta/a/media/; }
+# "x-sendfile": apache (mod_xsendfile) o similar.
+MEDIA_SENDFILE = os.getenv("MEDIA_SENDFILE", "").lower()
+MEDIA_ACCEL_PREFIJO = os.getenv("MEDIA_ACCEL_PREFIJO", "/media-interno/")
+
 # Límite de subida (50 MB)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024
 FILE_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024
@@ -258,6 +267,47 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+# Notas de voz y compresión de audios/videos del foro: colas aparte de baja
+# prioridad (worker_foro y worker_media en el Procfile), así no compiten con
+# la transcripción de las actas de reunión
+CELERY_TASK_ROUTES = {
+    "foro.tasks.transcribir_adjunto": {"queue": "foro_transcripcion"},
+    "foro.tasks.transcodificar_adjunto": {"queue": "foro_media"},
+}
+
+# Cache compartida entre procesos (web, worker, beat)
+CACHES = {
+    # Contadores, versiones de ETag, panel BI y PDF: todo recalculable, así
+    # que si Redis cae se sigue sin cache en vez de responder 500
+    "default": {
+        "BACKEND": "core.cache_redis.RedisCacheTolerante",
+        "LOCATION": os.getenv("REDIS_CACHE_URL", REDIS_URL),
+        "KEY_PREFIX": "junta",
+        "OPTIONS": {"socket_connect_timeout": 1, "socket_timeout": 1},
+    },
+    # Lock y progreso del ETL (datamart.tasks): el lock no puede fallar en silencio
+    "etl": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_CACHE_URL", REDIS_URL),
+        "KEY_PREFIX": "junta:etl",
+    },
+}
+
+CELERY_BEAT_SCHEDULE = {
+    # ETL incremental del datamart todas las noches
+    "etl-datamart-nocturno": {
+        "task": "datamart.tasks.etl_nocturno",
+        "schedule": crontab(
+            hour=int(os.getenv("ETL_NOCTURNO_HORA", "3")),
+            minute=int(os.getenv("ETL_NOCTURNO_MINUTO", "0")),
+        ),
+    },
+    # Lápidas de la sincronización de la app más viejas que la retención
+    "purgar-eliminaciones-sync": {
+        "task": "core.tasks.purgar_eliminaciones_antiguas",
+        "schedule": crontab(hour=4, minute=30),
+    },
+}
 
 # ==============================================================
 # CHANNELS
@@ -276,6 +326,51 @@ CHANNEL_LAYERS = {
 # ==============================================================
 MODEL_PATH_RELATIVO = Path("vosk-model-small-es-0.42")
 MODEL_PATH = BASE_DIR / MODEL_PATH_RELATIVO
+# Segundos de cada nota de voz del foro que se transcriben (el resto se omite)
+FORO_TRANSCRIPCION_DURACION_MAX = int(os.getenv("FORO_TRANSCRIPCION_DURACION_MAX", "300"))
+
+# ==============================================================
+# REUNIONES
+# ==============================================================
+# Porcentaje del padrón que debe estar presente para tener quórum
+QUORUM_REUNION_PORCENTAJE = int(os.getenv("QUORUM_REUNION_PORCENTAJE", "50"))
+
+# ==============================================================
+# INICIO
+# ==============================================================
+# Segundos que viven en cache los contadores de las tarjetas del inicio
+# (las señales de los modelos igual los borran apenas algo cambia)
+CONTADORES_INICIO_TTL = int(os.getenv("CONTADORES_INICIO_TTL", "60"))
+
+# ==============================================================
+# SINCRONIZACIÓN DE LA APP
+# ==============================================================
+# Días que se guardan las bajas; un teléfono que no sincroniza hace más
+# tiempo vuelve a bajar todo (core.sincronizacion)
+SYNC_RETENCION_ELIMINACIONES_DIAS = int(os.getenv("SYNC_RETENCION_ELIMINACIONES_DIAS", "90"))
+
+# ==============================================================
+# MONITOREO DE RENDIMIENTO
+# ==============================================================
+# Muestras por proceso antes de descartar las más antiguas, y cada cuántos
+# segundos se vuelcan los agregados a datamart.FactRendimientoRuta
+RENDIMIENTO_TAMANO_BUFFER = int(os.getenv("RENDIMIENTO_TAMANO_BUFFER", "20000"))
+RENDIMIENTO_INTERVALO_FLUSH = int(os.getenv("RENDIMIENTO_INTERVALO_FLUSH", "60"))
+# procesar_etl borra las ventanas más antiguas que esto
+RENDIMIENTO_RETENCION_DIAS = int(os.getenv("RENDIMIENTO_RETENCION_DIAS", "30"))
+
+# ==============================================================
+# DATAMART
+# ==============================================================
+# Feriados que se fijan por decreto cada año (solsticio, elecciones...):
+# "2025-06-20,2025-11-16"
+FERIADOS_ADICIONALES = [f for f in os.getenv("FERIADOS_ADICIONALES", "").split(",") if f.strip()]
+
+# Duración máxima del lock del ETL: si un worker muere, otro puede correrlo pasado este tiempo
+ETL_LOCK_SEGUNDOS = int(os.getenv("ETL_LOCK_SEGUNDOS", str(60 * 60)))
+
+# Vigencia máxima del panel BI / PDF en cache (igual se invalidan al terminar cada ETL)
+PANEL_BI_CACHE_SEGUNDOS = int(os.getenv("PANEL_BI_CACHE_SEGUNDOS", str(60 * 60 * 24)))
 
 # ==============================================================
 # VARIOS
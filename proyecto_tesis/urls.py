@@ -19,7 +19,7 @@ from django.urls import path, include
 from django.conf import settings 
 from django.conf.urls.static import static 
 from anuncios.api import lista_anuncios_api
-from django.views.static import serve 
+from core.media import servir_media
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("", include("core.urls")),  
@@ -37,12 +37,12 @@ urlpatterns = [
 ]
 
 # esto es para que los archivos subidos (MEDIA) funcionen
-# Solo para servir media desde Django (dev / proyectos pequeños)
+# Con Range/ETag y, detrás de nginx, X-Accel-Redirect (ver core.media y MEDIA_SENDFILE)
 if settings.MEDIA_ROOT:
     urlpatterns += [
         path(
             "media/<path:path>",
-            serve,
+            servir_media,
             {"document_root": settings.MEDIA_ROOT},
             name="media",
         ),
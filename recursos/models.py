@@ -11,6 +11,8 @@ class Recurso(models.Model):
     
     # Campo para que la directiva decida si el recurso está activo o no
     disponible = models.BooleanField(default=True, help_text="Marcar si el recurso está disponible para ser reservado.")
+    # Sincronización incremental de la app (core.sincronizacion)
+    actualizado_el = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.nombre
@@ -6,60 +6,32 @@ from .models import Reunion, Acta, Asistencia, LogConsultaActa
 from .serializers import ReunionSerializer, ActaSerializer,AsistenciaSerializer
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Q, Count
-from django.db import transaction # <-- Necesario para asegurar la consistencia del ETL
+from django.db.models import Q
 from .models import Reunion, EstadoReunion
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response 
+from django.utils.decorators import method_decorator
+from core.authz import can
+from core.condicional import etag_lista
+from .asistencia import registrar_checkins, resolver_ruts, resumen_asistencia
 
-# 🆕 IMPORTACIONES DEL DATA MART (Necesarias para el mini-ETL síncrono)
-from datamart.models import FactConsultaActa, DimVecino, DimActa 
-
-# =========================================================================
-# 🆕 FUNCIÓN AUXILIAR: Mini-ETL SÍNCRONO para Consultas de Actas
-# =========================================================================
-# Esta lógica debe ser idéntica a la que está en procesar_etl.py para este hecho.
-def actualizar_fact_consulta_actas_sincrono():
-    """
-    Realiza una carga completa (full load) de FactConsultaActa basada en LogConsultaActa.
-    ASUME que las dimensiones DimVecino y DimActa ya han sido pobladas.
-    """
-    with transaction.atomic():
-        # 1. Eliminar datos antiguos (full load)
-        FactConsultaActa.objects.all().delete()
-        
-        # 2. Extracción y mapeo de dimensiones (Data Mart ID -> Objeto Dimensión)
-        vecino_map = {d.vecino_id_oltp: d for d in DimVecino.objects.all()}
-        acta_map = {d.acta_id_oltp: d for d in DimActa.objects.all()}
-
-        # 3. Extraer logs transaccionales
-        logs = LogConsultaActa.objects.all().select_related('acta', 'vecino')
-
-        # 4. Transformación y Carga
-        fact_consultas = []
-        for log in logs:
-            dim_vecino = vecino_map.get(log.vecino_id) 
-            dim_acta = acta_map.get(log.acta_id)
-
-            if dim_vecino and dim_acta:
-                fact_consultas.append(FactConsultaActa(
-                    vecino=dim_vecino,
-                    acta=dim_acta,
-                    fecha_consulta=log.fecha_consulta
-                ))
-                
-        FactConsultaActa.objects.bulk_create(fact_consultas)
-
-# =========================================================================
-# FIN DE FUNCIÓN AUXILIAR
-# =========================================================================
+from datamart.etl import registrar_consulta_acta
+
+
+def _como_lista(valor):
+    if valor in (None, ""):
+        return []
+    if isinstance(valor, (list, tuple)):
+        return list(valor)
+    return [valor]
 
 class DefaultPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
     
+@method_decorator(etag_lista("reuniones"), name="list")
 class ReunionViewSet(viewsets.ReadOnlyModelViewSet):
     # ... (código ReunionViewSet existente)
     serializer_class = ReunionSerializer
@@ -73,7 +45,6 @@ class ReunionViewSet(viewsets.ReadOnlyModelViewSet):
         qs = (
             Reunion.objects.all()
             .select_related("acta")
-            .annotate(asistentes_count=Count("asistentes"))
             .order_by("-fecha")
         )
 
@@ -89,6 +60,56 @@ class ReunionViewSet(viewsets.ReadOnlyModelViewSet):
             return qs.filter(estado=EstadoReunion.REALIZADA)
         return qs
 
+    # --- CHECK-IN EN PUERTA (QR / RUT desde la app) ---
+    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated], url_path="checkin")
+    def checkin(self, request, pk=None):
+        """
+        Registra uno o varios check-ins y devuelve el contador de quórum.
+        Acepta: {"rut": "..."}, {"ruts": [...]}, {"vecino_id": 1} o {"vecino_ids": [...]}.
+        La lista permite a la app enviar en lote los escaneos hechos sin conexión.
+        """
+        if not can(request.user, "reuniones", "asistencia"):
+            return Response({"detail": "No tienes permiso para registrar asistencia."}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            reunion = Reunion.objects.get(pk=pk)
+        except Reunion.DoesNotExist:
+            return Response({"detail": "Reunión no encontrada."}, status=status.HTTP_404_NOT_FOUND)
+
+        if reunion.estado not in (EstadoReunion.PROGRAMADA, EstadoReunion.EN_CURSO):
+            return Response({"detail": "La reunión no admite registro de asistencia."}, status=status.HTTP_400_BAD_REQUEST)
+
+        ruts = _como_lista(request.data.get("ruts")) + _como_lista(request.data.get("rut"))
+        usuario_ids = _como_lista(request.data.get("vecino_ids")) + _como_lista(request.data.get("vecino_id"))
+
+        if not ruts and not usuario_ids:
+            return Response({"detail": "Debes enviar 'rut' o 'vecino_id'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        no_encontrados, invalidos = [], []
+        if ruts:
+            encontrados, no_encontrados, invalidos = resolver_ruts(ruts)
+            usuario_ids.extend(encontrados)
+
+        # Los RUT ya se resuelven contra Perfil; los IDs se filtran por el padrón
+        nuevos, fuera_de_padron = registrar_checkins(reunion, usuario_ids)
+
+        data = resumen_asistencia(reunion)
+        data.update({
+            "registrados": nuevos,
+            "no_encontrados": no_encontrados,
+            "invalidos": invalidos,
+            "fuera_de_padron": fuera_de_padron,
+        })
+        return Response(data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated], url_path="quorum")
+    def quorum(self, request, pk=None):
+        try:
+            reunion = Reunion.objects.get(pk=pk)
+        except Reunion.DoesNotExist:
+            return Response({"detail": "Reunión no encontrada."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(resumen_asistencia(reunion))
+
 class ActaViewSet(viewsets.ReadOnlyModelViewSet):
     # ... (código ActaViewSet existente)
     serializer_class = ActaSerializer
@@ -117,13 +138,13 @@ class ActaViewSet(viewsets.ReadOnlyModelViewSet):
             return Response({"detail": "Acta no encontrada."}, status=status.HTTP_404_NOT_FOUND)
 
         # 1. CREAR EL REGISTRO TRANSACCIONAL (OLTP)
-        LogConsultaActa.objects.create(
+        log = LogConsultaActa.objects.create(
             acta=acta,
             vecino=request.user # Asumiendo que request.user es el vecino que consulta
         )
 
-        # 2. EJECUTAR EL MINI-ETL SÍNCRONO PARA EL ANÁLISIS (Data Mart)
-        actualizar_fact_consulta_actas_sincrono() 
+        # 2. AGREGAR SOLO ESTE HECHO AL DATA MART (una fila, sin recargar la tabla)
+        registrar_consulta_acta(log)
         
         # 3. FIX: SERIALIZAR Y DEVOLVER LOS DATOS DEL ACTA (Cambio de 204 No Content a 200 OK + Data)
         serializer = self.get_serializer(acta)
@@ -0,0 +1,195 @@
+# reuniones/asistencia.py
+"""
+Escritura de asistencia basada en conjuntos.
+
+Tanto la lista de asistencia (web) como el check-in en puerta (app móvil)
+pasan por aquí, para que nunca se escriba fila por fila con update_or_create.
+Además se mantienen Reunion.asistentes_presentes / total_padron y se publica
+el contador en el grupo de Channels "asistencia-<id>".
+"""
+import math
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Perfil
+from core.condicional import subir_version
+from core.rut import normalizar_rut
+from core.tiempo_real import emitir_al_confirmar
+from .models import Asistencia, Reunion
+
+QUORUM_PORCENTAJE = getattr(settings, "QUORUM_REUNION_PORCENTAJE", 50)
+
+
+# =========================
+# Helpers
+# =========================
+def _upsert_asistencias(filas):
+    """
+    INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE sobre el unique
+    (reunion, vecino). MySQL no acepta 'unique_fields' (usa cualquier
+    índice único), por eso solo lo pasamos si el motor lo soporta.
+    """
+    kwargs = {"update_conflicts": True, "update_fields": ["presente"]}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = ["reunion", "vecino"]
+    Asistencia.objects.bulk_create(filas, batch_size=500, **kwargs)
+
+
+def grupo_asistencia(reunion_id):
+    return f"asistencia-{reunion_id}"
+
+
+def _publicar_contador(reunion_id):
+    """Lee el contador (lookup por PK) y lo emite al confirmar la transacción."""
+    presentes, total = Reunion.objects.filter(pk=reunion_id).values_list(
+        "asistentes_presentes", "total_padron"
+    ).get()
+    datos = armar_resumen(reunion_id, presentes, total)
+    emitir_al_confirmar(grupo_asistencia(reunion_id), "quorum_actualizado", datos)
+    # Escrituras masivas sin post_save: el contador de la lista de reuniones cambió
+    subir_version("reuniones")
+    return datos
+
+
+def _a_enteros(valores):
+    ids = set()
+    for v in valores:
+        try:
+            ids.add(int(v))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+# =========================
+# Escritura
+# =========================
+def guardar_lista_asistencia(reunion, perfiles_presentes):
+    """
+    Guarda la lista completa de asistencia de una reunión.
+
+    'perfiles_presentes' son PKs de Perfil (lo que envía el formulario web).
+    Todo el padrón queda registrado: presentes=True y el resto False.
+    Cuesta una consulta para leer el padrón y un upsert por lotes.
+    """
+    presentes = _a_enteros(perfiles_presentes)
+    padron = list(Perfil.objects.values_list("id", "usuario_id"))
+
+    filas = [
+        Asistencia(reunion=reunion, vecino_id=usuario_id, presente=perfil_id in presentes)
+        for perfil_id, usuario_id in padron
+    ]
+    with transaction.atomic():
+        _upsert_asistencias(filas)
+        # Guardado masivo (poco frecuente): se recalcula una vez y se fija el valor absoluto
+        n_presentes = Asistencia.objects.filter(reunion=reunion, presente=True).count()
+        Reunion.objects.filter(pk=reunion.pk).update(
+            asistentes_presentes=n_presentes, total_padron=len(padron), actualizado_el=timezone.now()
+        )
+        return _publicar_contador(reunion.pk)
+
+
+def registrar_checkins(reunion, usuario_ids):
+    """
+    Marca como presentes a los usuarios indicados (idempotente).
+
+    0. Descarta los IDs que no están en el padrón (usuarios sin Perfil, los
+       mismos que cuenta actualizar_padron): así presentes no pasa del total.
+    1. Asegura que exista la fila (INSERT IGNORE sobre el unique).
+    2. UPDATE condicional presente=False -> True.
+
+    El rowcount del UPDATE es exactamente el número de vecinos que
+    pasaron a estar presentes, aunque lleguen check-ins concurrentes
+    de la misma persona. Devuelve (ese número, IDs fuera del padrón).
+    """
+    ids = _a_enteros(usuario_ids)
+    if not ids:
+        return 0, []
+
+    en_padron = set(Perfil.objects.filter(usuario_id__in=ids).values_list("usuario_id", flat=True))
+    rechazados = sorted(ids - en_padron)
+    if not en_padron:
+        return 0, rechazados
+
+    with transaction.atomic():
+        Asistencia.objects.bulk_create(
+            [Asistencia(reunion=reunion, vecino_id=uid, presente=False) for uid in en_padron],
+            ignore_conflicts=True,
+        )
+        nuevos = Asistencia.objects.filter(
+            reunion=reunion, vecino_id__in=en_padron, presente=False
+        ).update(presente=True)
+
+        if nuevos:
+            # O(1): incremento atómico en la fila de la reunión
+            Reunion.objects.filter(pk=reunion.pk).update(
+                asistentes_presentes=F("asistentes_presentes") + nuevos, actualizado_el=timezone.now()
+            )
+            _publicar_contador(reunion.pk)
+    return nuevos, rechazados
+
+
+def actualizar_padron(reunion):
+    """
+    Fija el tamaño del padrón con el que se calcula el quórum.
+    Se llama al crear e iniciar la reunión y al guardar la lista completa.
+    """
+    total = Perfil.objects.count()
+    Reunion.objects.filter(pk=reunion.pk).update(total_padron=total, actualizado_el=timezone.now())
+    reunion.total_padron = total
+    with transaction.atomic():
+        _publicar_contador(reunion.pk)
+    return total
+
+
+def resolver_ruts(ruts):
+    """
+    Traduce RUTs (tal como los lee el escáner) a IDs de usuario.
+    Devuelve (ids_encontrados, ruts_no_encontrados, ruts_invalidos)
+    usando una sola consulta sobre el índice único de Perfil.rut.
+    """
+    normalizados = {}
+    invalidos = []
+    for rut in ruts:
+        try:
+            normalizados[normalizar_rut(str(rut))] = rut
+        except ValueError:
+            invalidos.append(rut)
+
+    encontrados = dict(
+        Perfil.objects.filter(rut__in=list(normalizados)).values_list("rut", "usuario_id")
+    )
+    no_encontrados = [orig for norm, orig in normalizados.items() if norm not in encontrados]
+    return list(encontrados.values()), no_encontrados, invalidos
+
+
+# =========================
+# Lectura
+# =========================
+def quorum_requerido(total):
+    return math.ceil(total * QUORUM_PORCENTAJE / 100)
+
+
+def armar_resumen(reunion_id, presentes, total):
+    requerido = quorum_requerido(total)
+    return {
+        "reunion_id": reunion_id,
+        "presentes": presentes,
+        "total": total,
+        "quorum_requerido": requerido,
+        "hay_quorum": total > 0 and presentes >= requerido,
+    }
+
+
+def resumen_asistencia(reunion, refrescar=True):
+    """
+    Contador presentes / padrón / quórum de una reunión, leído de los
+    campos mantenidos (sin agregaciones). Con refrescar=False usa los
+    valores que ya trae la instancia.
+    """
+    if refrescar:
+        reunion.refresh_from_db(fields=["asistentes_presentes", "total_padron"])
+    return armar_resumen(reunion.pk, reunion.asistentes_presentes, reunion.total_padron)
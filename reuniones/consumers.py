@@ -1,14 +1,15 @@
 # reuniones/consumers.py
 import asyncio, json, logging
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from concurrent.futures import ThreadPoolExecutor
-from django.conf import settings
+
+from core import vosk_modelo
 
 logger = logging.getLogger(__name__)
 
 SAMPLE_RATE = 16000
 EXECUTOR = ThreadPoolExecutor(max_workers=2)
-_VOSK_MODEL = None  # carga perezosa y compartida
 
 class STTConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -19,14 +20,8 @@ class STTConsumer(AsyncWebsocketConsumer):
 
         # Cargar Vosk con manejo de errores
         try:
-            global _VOSK_MODEL
-            if _VOSK_MODEL is None:
-                from vosk import Model
-                logger.info("Cargando modelo Vosk: %s", settings.MODEL_PATH_RELATIVO)
-                _VOSK_MODEL = Model(str(settings.MODEL_PATH_RELATIVO))
-            from vosk import KaldiRecognizer
-            self.rec = KaldiRecognizer(_VOSK_MODEL, SAMPLE_RATE)
-            self.rec.SetWords(True)
+            # Modelo cargado una vez por proceso y compartido (core.vosk_modelo)
+            self.rec = vosk_modelo.reconocedor(SAMPLE_RATE)
         except Exception as e:
             await self.accept()
             await self.send(json.dumps({"type":"status","msg":f"Error Vosk: {e}"}))
@@ -62,3 +57,51 @@ class STTConsumer(AsyncWebsocketConsumer):
 
     async def stt_broadcast(self, event):
         await self.send(json.dumps(event["payload"]))
+
+
+class QuorumConsumer(AsyncWebsocketConsumer):
+    """
+    Contador de asistencia / quórum en vivo para la pantalla de la reunión.
+    Al conectar envía el estado actual; después solo reenvía los
+    'quorum_actualizado' que publica reuniones.asistencia.
+    """
+    async def connect(self):
+        user = self.scope.get("user")
+        if not user or not user.is_authenticated or not await self._puede_ver(user):
+            await self.close()
+            return
+
+        self.reunion_id = self.scope["url_route"]["kwargs"]["reunion_id"]
+        snapshot = await self._snapshot()
+        if snapshot is None:
+            await self.close()
+            return
+
+        from .asistencia import grupo_asistencia
+        self.group_name = grupo_asistencia(self.reunion_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.send(json.dumps({"type": "quorum", **snapshot}))
+
+    async def disconnect(self, code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def quorum_actualizado(self, event):
+        await self.send(json.dumps({"type": "quorum", **event["payload"]}))
+
+    @database_sync_to_async
+    def _puede_ver(self, user):
+        from core.authz import can
+        return can(user, "reuniones", "view")
+
+    @database_sync_to_async
+    def _snapshot(self):
+        from .asistencia import armar_resumen
+        from .models import Reunion
+        fila = Reunion.objects.filter(pk=self.reunion_id).values_list(
+            "asistentes_presentes", "total_padron"
+        ).first()
+        if fila is None:
+            return None
+        return armar_resumen(self.reunion_id, *fila)
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:08
+
+from django.db import migrations, models
+
+
+def poblar_contadores(apps, schema_editor):
+    Reunion = apps.get_model('reuniones', 'Reunion')
+    Asistencia = apps.get_model('reuniones', 'Asistencia')
+    Perfil = apps.get_model('core', 'Perfil')
+
+    Reunion.objects.update(total_padron=Perfil.objects.count())
+
+    presentes = (
+        Asistencia.objects.filter(presente=True)
+        .values('reunion_id')
+        .annotate(n=models.Count('id'))
+        .values_list('reunion_id', 'n')
+    )
+    for reunion_id, n in presentes:
+        Reunion.objects.filter(pk=reunion_id).update(asistentes_presentes=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('reuniones', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reunion',
+            name='asistentes_presentes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reunion',
+            name='total_padron',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
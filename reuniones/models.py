@@ -23,6 +23,8 @@ class Reunion(models.Model):
     tabla = models.TextField(verbose_name="Tabla de contenidos")
     creada_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name="reuniones_creadas")
     creada_el = models.DateTimeField(auto_now_add=True)
+    # Sincronización incremental de la app (core.sincronizacion)
+    actualizado_el = models.DateTimeField(auto_now=True, db_index=True)
 
     # Este campo ya lo tenías, está perfecto
     estado = models.CharField(
@@ -32,6 +34,10 @@ class Reunion(models.Model):
         verbose_name="Estado"
     )
 
+    # Contadores mantenidos por reuniones.asistencia (evitan COUNT en cada render)
+    asistentes_presentes = models.PositiveIntegerField(default=0, editable=False)
+    total_padron = models.PositiveIntegerField(default=0, editable=False)
+
     def __str__(self):
         return f"{self.titulo} - {self.fecha.strftime('%d/%m/%Y')}"
 
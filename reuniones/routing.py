@@ -1,7 +1,8 @@
 # reuniones/routing.py
 from django.urls import path
-from .consumers import STTConsumer
+from .consumers import QuorumConsumer, STTConsumer
 
 websocket_urlpatterns = [
     path("ws/transcribir/<int:reunion_id>/", STTConsumer.as_asgi()),
+    path("ws/asistencia/<int:reunion_id>/", QuorumConsumer.as_asgi()),
 ]
\ No newline at end of file
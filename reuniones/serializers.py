@@ -60,10 +60,8 @@ class ReunionSerializer(serializers.ModelSerializer):
         return 0
     
     def get_asistentes_count(self, obj):
-        try:
-            return obj.asistentes.filter(presente=True).count()
-        except Exception:
-            return 0
+        # Contador mantenido por reuniones.asistencia: sin consulta por fila
+        return obj.asistentes_presentes
 
     def get_acta_aprobada(self, obj):
         """
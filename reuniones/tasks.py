@@ -1,9 +1,6 @@
 from celery import shared_task
 import time
 import os
-import json
-import wave
-import ffmpeg
 import tempfile
 import traceback
 import logging
@@ -13,9 +10,7 @@ from django.utils import timezone
 
 from .models import Acta, Reunion
 from core.models import Perfil
-
-# VOSK
-from vosk import Model, KaldiRecognizer
+from core import vosk_modelo
 
 # FIREBASE
 import firebase_admin
@@ -23,8 +18,6 @@ from firebase_admin import messaging, credentials
 
 logger = logging.getLogger(__name__)
 
-VOSK_MODEL_PATH = os.path.join(settings.BASE_DIR, "vosk-model-small-es-0.42")
-vosk_model = None
 firebase_app = None
 
 def inicializar_firebase():
@@ -168,12 +161,9 @@ def enviar_notificacion_acta_aprobada(acta_id):
 
 @shared_task(name="procesar_audio_vosk")
 def procesar_audio_vosk(acta_pk):
-    global vosk_model
     try:
-        if vosk_model is None:
-            if not os.path.exists(VOSK_MODEL_PATH):
-                raise FileNotFoundError(f"Modelo VOSK no encontrado en {VOSK_MODEL_PATH}")
-            vosk_model = Model(VOSK_MODEL_PATH)
+        # Una sola carga por proceso del worker (core.vosk_modelo)
+        vosk_modelo.modelo()
 
         acta = Acta.objects.get(pk=acta_pk)
         acta.estado_transcripcion = Acta.ESTADO_PROCESANDO
@@ -188,29 +178,10 @@ def procesar_audio_vosk(acta_pk):
             output_wav_path = f_out.name
 
         # Convertir con FFMPEG
-        (
-            ffmpeg
-            .input(input_webm_path)
-            .output(output_wav_path, format="wav", acodec="pcm_s16le", ac=1, ar="16000")
-            .run(capture_stdout=True, capture_stderr=True, overwrite_output=True)
-        )
+        vosk_modelo.a_wav(input_webm_path, output_wav_path)
 
         # Transcribir
-        wf = wave.open(output_wav_path, "rb")
-        rec = KaldiRecognizer(vosk_model, wf.getframerate())
-        rec.SetWords(True)
-        
-        full_text = ""
-        while True:
-            data = wf.readframes(4000)
-            if len(data) == 0: break
-            if rec.AcceptWaveform(data):
-                res = json.loads(rec.Result())
-                full_text += res.get("text", "") + " "
-        
-        final_res = json.loads(rec.FinalResult())
-        full_text += final_res.get("text", "")
-        wf.close()
+        full_text = vosk_modelo.transcribir_wav(output_wav_path)
 
         acta.contenido = full_text
         acta.estado_transcripcion = Acta.ESTADO_COMPLETADO
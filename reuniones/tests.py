@@ -1,3 +1,57 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
 
-# Create your tests here.
+from core.models import Perfil
+
+from .asistencia import quorum_requerido, registrar_checkins, resumen_asistencia
+from .models import Asistencia, Reunion
+
+
+class CheckinTests(TestCase):
+    def setUp(self):
+        self.reunion = Reunion.objects.create(titulo="Asamblea", tabla="-", fecha=timezone.now())
+        self.vecinos = [User.objects.create_user(f"v{i}", f"v{i}@example.com", "x") for i in range(3)]
+        for i, vecino in enumerate(self.vecinos):
+            Perfil.objects.create(usuario=vecino, rol=Perfil.Roles.VECINO, rut=f"{str(i + 1) * 8}-{i + 1}")
+
+    def test_checkin_idempotente(self):
+        ids = [v.pk for v in self.vecinos]
+        self.assertEqual(registrar_checkins(self.reunion, ids), (3, []))
+        # El mismo escaneo repetido (o concurrente) no vuelve a contar
+        self.assertEqual(registrar_checkins(self.reunion, ids + [str(ids[0])]), (0, []))
+
+        self.assertEqual(Asistencia.objects.filter(reunion=self.reunion, presente=True).count(), 3)
+        self.assertEqual(resumen_asistencia(self.reunion)["presentes"], 3)
+
+    def test_ids_invalidos_se_ignoran(self):
+        self.assertEqual(registrar_checkins(self.reunion, ["x", None]), (0, []))
+        self.assertFalse(Asistencia.objects.exists())
+
+    def test_fuera_del_padron(self):
+        sin_perfil = User.objects.create_user("visita", "visita@example.com", "x")
+        ids = [self.vecinos[0].pk, sin_perfil.pk, 999999]
+        self.assertEqual(registrar_checkins(self.reunion, ids), (1, sorted([sin_perfil.pk, 999999])))
+        self.assertEqual(list(Asistencia.objects.values_list("vecino_id", flat=True)), [self.vecinos[0].pk])
+
+    def test_api_informa_fuera_del_padron(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "x"))
+        respuesta = self.client.post(
+            f"/reuniones/api/reuniones/{self.reunion.pk}/checkin/",
+            {"vecino_ids": [self.vecinos[0].pk, 999999]}, content_type="application/json",
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual((respuesta.json()["registrados"], respuesta.json()["fuera_de_padron"]), (1, [999999]))
+
+    def test_quorum_requiere_sesion(self):
+        url = f"/reuniones/api/reuniones/{self.reunion.pk}/quorum/"
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.force_login(self.vecinos[0])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class QuorumTests(SimpleTestCase):
+    def test_quorum_redondea_hacia_arriba(self):
+        self.assertEqual(quorum_requerido(0), 0)
+        self.assertEqual(quorum_requerido(9), 5)
+        self.assertEqual(quorum_requerido(10), 5)
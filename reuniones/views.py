@@ -16,6 +16,12 @@ from datetime import timedelta
 # Importamos el nuevo EstadoReunion
 from .models import Reunion, Asistencia, Acta, EstadoReunion
 from .forms import ReunionForm, ActaForm
+from .asistencia import (
+    actualizar_padron,
+    guardar_lista_asistencia,
+    registrar_checkins,
+    resumen_asistencia,
+)
 from core.authz import role_required
 from core.models import Perfil
 import json
@@ -87,6 +93,7 @@ def reunion_create(request):
             reunion = form.save(commit=False)
             reunion.creada_por = request.user
             reunion.save()
+            actualizar_padron(reunion)
             messages.success(request, "Reunión creada exitosamente.")
             return redirect("reuniones:lista_reuniones")
     else:
@@ -122,7 +129,9 @@ def reunion_detail(request, pk):
         "acta_form": acta_form,
         "asistentes": asistentes,
         "vecinos_para_email": vecinos_para_email,
-        "total_vecinos": Perfil.objects.all().count(), # Contamos a todos
+        # Contadores mantenidos en la propia reunión (sin COUNT por render)
+        "total_vecinos": reunion.total_padron,
+        "quorum": resumen_asistencia(reunion, refrescar=False),
     }
     return render(request, "reuniones/reunion_detail.html", context)
 
@@ -219,20 +228,8 @@ def asistencia_list(request, pk):
     # --- FIN CORRECCIÓN 2 ---
 
     if request.method == "POST":
-        
-        presentes_pks = request.POST.getlist('presentes') 
-        presentes_pks_set = set(str(pk) for pk in presentes_pks)
-
-        for perfil in vecinos:
-            esta_presente = str(perfil.pk) in presentes_pks_set
-            
-            # --- CORRECCIÓN 3 (Quitar 'metodo_registro') ---
-            Asistencia.objects.update_or_create(
-                reunion=reunion,
-                vecino=perfil.usuario,
-                defaults={'presente': esta_presente} # <-- CAMPO INCORRECTO ELIMINADO
-            )
-            # --- FIN CORRECCIÓN 3 ---
+        # Upsert por lotes de todo el padrón (antes: un update_or_create por vecino)
+        guardar_lista_asistencia(reunion, request.POST.getlist('presentes'))
             
         messages.success(request, "Asistencia guardada correctamente.")
         return redirect('reuniones:detalle_reunion', pk=pk)
@@ -273,20 +270,12 @@ def registrar_asistencia_manual(request, pk):
     perfil_vecino = get_object_or_404(Perfil, id=vecino_id)
     usuario_vecino = perfil_vecino.usuario
     
-    # --- CORRECCIÓN 4 (Quitar 'metodo_registro') ---
-    asistencia, created = Asistencia.objects.get_or_create(
-        reunion=reunion,
-        vecino=usuario_vecino, 
-        defaults={'presente': True} # <-- CAMPO INCORRECTO ELIMINADO
-    )
-    # --- FIN CORRECCIÓN 4 ---
+    nuevos, _ = registrar_checkins(reunion, [usuario_vecino.pk])
     
-    if created:
+    if nuevos:
         messages.success(request, f"Se registró la asistencia de {perfil_vecino.usuario.get_full_name()}.")
     else:
-        asistencia.presente = True
-        asistencia.save()
-        messages.info(request, f"{perfil_vecino.usuario.get_full_name()} ya estaba en la lista, se marcó como presente.")
+        messages.info(request, f"{perfil_vecino.usuario.get_full_name()} ya estaba marcado como presente.")
         
     return redirect('reuniones:lista_asistencia', pk=pk)
 
@@ -385,7 +374,10 @@ def iniciar_reunion(request, pk):
     
     if reunion.estado == EstadoReunion.PROGRAMADA:
         reunion.estado = EstadoReunion.EN_CURSO
-        reunion.save()
+        # update_fields: no pisar los contadores de asistencia con valores viejos;
+        # actualizado_el va explícito (auto_now solo se escribe si está en la lista)
+        reunion.save(update_fields=["estado", "actualizado_el"])
+        actualizar_padron(reunion)
         messages.success(request, f"La reunión '{reunion.titulo}' ha sido iniciada.")
     else:
         messages.warning(request, "Esta reunión no se puede iniciar.")
@@ -401,7 +393,7 @@ def finalizar_reunion(request, pk):
     
     if reunion.estado == EstadoReunion.EN_CURSO:
         reunion.estado = EstadoReunion.REALIZADA
-        reunion.save()
+        reunion.save(update_fields=["estado", "actualizado_el"])
         messages.success(request, f"La reunión '{reunion.titulo}' ha finalizado.")
     else:
         messages.warning(request, "Esta reunión no se puede finalizar.")
@@ -417,7 +409,7 @@ def cancelar_reunion(request, pk):
     
     if reunion.estado == EstadoReunion.PROGRAMADA:
         reunion.estado = EstadoReunion.CANCELADA
-        reunion.save()
+        reunion.save(update_fields=["estado", "actualizado_el"])
         messages.warning(request, f"La reunión '{reunion.titulo}' ha sido cancelada.")
     else:
         messages.error(request, "Solo se pueden cancelar reuniones que están 'Programadas'.")
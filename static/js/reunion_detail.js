@@ -282,4 +282,42 @@ document.addEventListener('DOMContentLoaded', () => {
             }
         }, 5000);
     }
+
+    // --- 4. Contador de Quórum en vivo (WebSocket) ---
+    const quorumCard = document.getElementById('quorum-card');
+    if (quorumCard && config.wsQuorum) {
+        const elPresentes = document.getElementById('quorum-presentes');
+        const elTotal = document.getElementById('quorum-total');
+        const elRequerido = document.getElementById('quorum-requerido');
+        const elEstado = document.getElementById('quorum-estado');
+        let reintento = 1000;
+
+        function pintarQuorum(data) {
+            elPresentes.textContent = data.presentes;
+            elTotal.textContent = data.total;
+            elRequerido.textContent = data.quorum_requerido;
+            document.querySelectorAll('.js-quorum-presentes').forEach(el => {
+                el.textContent = data.presentes;
+            });
+            elEstado.textContent = data.hay_quorum ? 'Hay quórum' : 'Sin quórum';
+            elEstado.classList.toggle('bg-success', data.hay_quorum);
+            elEstado.classList.toggle('bg-secondary', !data.hay_quorum);
+        }
+
+        function conectarQuorum() {
+            const proto = window.location.protocol === 'https:' ? 'wss' : 'ws';
+            const ws = new WebSocket(`${proto}://${window.location.host}${config.wsQuorum}`);
+            ws.onopen = () => { reintento = 1000; };
+            ws.onmessage = (e) => {
+                const data = JSON.parse(e.data);
+                if (data.type === 'quorum') pintarQuorum(data);
+            };
+            // Reconexión con espera creciente (máx. 30 s)
+            ws.onclose = () => {
+                setTimeout(conectarQuorum, reintento);
+                reintento = Math.min(reintento * 2, 30000);
+            };
+        }
+        conectarQuorum();
+    }
 });
\ No newline at end of file
@@ -118,4 +118,273 @@ document.addEventListener('DOMContentLoaded', () => {
             resetRecorder();
         }
     });
-});
\ No newline at end of file
+});
+// ===================================================================
+// Conversación en vivo (WebSocket /ws/foro/<id>/)
+// Los comentarios, adjuntos, "me gusta" y la moderación llegan como deltas
+// y se aplican sobre la página; los formularios se envían por fetch.
+// ===================================================================
+
+document.addEventListener('DOMContentLoaded', () => {
+    const stream = document.getElementById('conversacion');
+    if (!stream || !stream.dataset.ws) return;
+
+    const avisoOculta = document.getElementById('publicacion-oculta');
+    let ws = null;
+    let reintento = 1000;
+
+    const conectado = () => ws && ws.readyState === WebSocket.OPEN;
+
+    function csrf(form) {
+        const input = form.querySelector('input[name="csrfmiddlewaretoken"]');
+        return input ? input.value : '';
+    }
+
+    function el(tag, clases, texto) {
+        const nodo = document.createElement(tag);
+        if (clases) nodo.className = clases;
+        if (texto !== undefined && texto !== null) nodo.textContent = texto;
+        return nodo;
+    }
+
+    // Misma estructura que un ítem de la plantilla, armado con textContent
+    function crearItem(clave, datos, cuerpo) {
+        const fila = el('div', 'd-flex mb-4 animate__animated animate__fadeIn');
+        fila.dataset.item = clave;
+
+        const avatar = el('div', 'rounded-circle text-white d-flex justify-content-center align-items-center fw-bold shadow-sm',
+            (datos.autor_username || '?').charAt(0).toUpperCase());
+        avatar.style.cssText = 'width: 40px; height: 40px; background-color: #6c757d;';
+        const col = el('div', 'flex-shrink-0');
+        col.appendChild(avatar);
+
+        const contenido = el('div', 'flex-grow-1 ms-3');
+        const cabecera = el('div', 'd-flex justify-content-between align-items-center mb-1');
+        cabecera.appendChild(el('span', 'fw-bold text-dark', datos.autor_username));
+        cabecera.appendChild(el('small', 'text-muted', 'recién'));
+        contenido.appendChild(cabecera);
+        contenido.appendChild(cuerpo);
+
+        fila.appendChild(col);
+        fila.appendChild(contenido);
+        return fila;
+    }
+
+    function itemComentario(c) {
+        const cuerpo = el('div');
+        const burbuja = el('div', 'bg-light p-3 rounded text-dark border', c.contenido);
+        burbuja.style.cssText = 'display: inline-block; max-width: 90%; white-space: pre-wrap;';
+        cuerpo.appendChild(burbuja);
+
+        const acciones = el('div', 'd-flex justify-content-start align-items-center mt-1');
+        const form = document.createElement('form');
+        form.method = 'post';
+        form.action = stream.dataset.urlReaccionar.replace('/0/', `/${c.id}/`);
+        form.className = 'js-like-form';
+        form.style.display = 'inline';
+        const boton = el('button', 'btn btn-sm btn-link text-decoration-none');
+        boton.type = 'submit';
+        boton.appendChild(el('i', 'far fa-thumbs-up me-1 text-muted'));
+        const total = el('span', 'text-muted', c.total_likes);
+        total.dataset.likes = `comentario-${c.id}`;
+        boton.appendChild(total);
+        form.appendChild(boton);
+        acciones.appendChild(form);
+        cuerpo.appendChild(acciones);
+
+        const fila = crearItem(`comentario-${c.id}`, c, cuerpo);
+        if (c.parent) fila.classList.add('ms-5', 'border-start', 'ps-3', 'border-secondary');
+        return fila;
+    }
+
+    function itemAdjunto(a) {
+        const caja = el('div', 'd-inline-block p-2 rounded border bg-white shadow-sm');
+        caja.style.cssText = 'max-width: 80%; min-width: 200px;';
+        if (a.tipo_archivo === 'imagen') {
+            const enlace = el('a');
+            enlace.href = a.url;
+            enlace.target = '_blank';
+            const img = el('img', 'img-fluid rounded');
+            img.src = a.url_media || a.url;
+            img.alt = 'Imagen chat';
+            img.style.cssText = 'max-height: 300px; width: 100%; object-fit: cover;';
+            enlace.appendChild(img);
+            caja.appendChild(enlace);
+        } else if (a.tipo_archivo === 'audio') {
+            const audio = el('audio', 'w-100');
+            audio.controls = true;
+            audio.preload = 'metadata';
+            audio.src = a.url;
+            caja.appendChild(audio);
+            const transcripcion = el('p', 'small text-muted fst-italic mt-1 mb-0 js-transcripcion', a.transcripcion || '');
+            if (!a.transcripcion) transcripcion.classList.add('d-none');
+            caja.appendChild(transcripcion);
+        } else {
+            const enlace = el('a', 'text-decoration-none text-dark p-2 d-block bg-light rounded border', 'Ver archivo');
+            enlace.href = a.url;
+            enlace.target = '_blank';
+            caja.appendChild(enlace);
+        }
+        if (a.descripcion) {
+            const texto = el('div', 'mt-2 pt-2 border-top text-dark', a.descripcion);
+            texto.style.whiteSpace = 'pre-wrap';
+            caja.appendChild(texto);
+        }
+        return crearItem(`adjunto-${a.id}`, a, caja);
+    }
+
+    function agregar(clave, crear) {
+        if (stream.querySelector(`[data-item="${clave}"]`)) return;
+        const vacia = document.getElementById('conversacion-vacia');
+        if (vacia) vacia.remove();
+        stream.appendChild(crear());
+    }
+
+    function quitar(clave) {
+        const fila = stream.querySelector(`[data-item="${clave}"]`);
+        if (fila) fila.remove();
+    }
+
+    function aplicar(data) {
+        switch (data.type) {
+            case 'comentario_nuevo':
+            case 'comentario_visible':
+                agregar(`comentario-${data.comentario.id}`, () => itemComentario(data.comentario));
+                break;
+            case 'comentario_oculto':
+                quitar(`comentario-${data.id}`);
+                break;
+            case 'adjunto_nuevo':
+                if (data.adjunto.es_mensaje) agregar(`adjunto-${data.adjunto.id}`, () => itemAdjunto(data.adjunto));
+                break;
+            case 'adjunto_eliminado':
+                quitar(`adjunto-${data.id}`);
+                break;
+            case 'adjunto_procesado':
+                // Audio/video comprimido: se reproduce la versión nueva
+                stream.querySelectorAll(`[data-item="adjunto-${data.id}"]`).forEach(fila => {
+                    fila.querySelectorAll('audio, video').forEach(media => {
+                        media.querySelectorAll('source').forEach(s => s.remove());
+                        media.src = data.url;
+                        media.load();
+                    });
+                    fila.querySelectorAll('a[href]').forEach(a => { a.href = data.url; });
+                });
+                break;
+            case 'adjunto_transcrito':
+                stream.querySelectorAll(`[data-item="adjunto-${data.id}"] .js-transcripcion`).forEach(p => {
+                    p.textContent = data.transcripcion;
+                    p.classList.remove('d-none');
+                });
+                break;
+            case 'adjunto_variantes':
+                // La versión liviana quedó lista: reemplaza al original
+                stream.querySelectorAll(`[data-item="adjunto-${data.id}"] img`).forEach(img => {
+                    const picture = img.closest('picture');
+                    if (picture) picture.querySelectorAll('source').forEach(s => s.remove());
+                    img.src = data.url_media;
+                });
+                break;
+            case 'likes':
+                document.querySelectorAll(`[data-likes="${data.objeto}-${data.id}"]`).forEach(span => {
+                    span.textContent = data.total_likes;
+                });
+                break;
+            case 'publicacion_oculta':
+            case 'publicacion_eliminada':
+                if (avisoOculta) avisoOculta.style.display = 'block';
+                break;
+            case 'publicacion_visible':
+                if (avisoOculta) avisoOculta.style.display = 'none';
+                break;
+        }
+    }
+
+    function conectar() {
+        const proto = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        ws = new WebSocket(`${proto}://${window.location.host}${stream.dataset.ws}`);
+        ws.onopen = () => { reintento = 1000; };
+        ws.onmessage = (e) => aplicar(JSON.parse(e.data));
+        // Reconexión con espera creciente (máx. 30 s)
+        ws.onclose = () => {
+            setTimeout(conectar, reintento);
+            reintento = Math.min(reintento * 2, 30000);
+        };
+    }
+    conectar();
+
+    function enviar(form) {
+        return fetch(form.action, {
+            method: 'POST',
+            body: new FormData(form),
+            headers: { 'X-CSRFToken': csrf(form), 'X-Requested-With': 'XMLHttpRequest' },
+        }).then(r => r.json().then(data => ({ ok: r.ok, data })));
+    }
+
+    // Sin WebSocket abierto los formularios se envían como siempre (recarga)
+    document.addEventListener('submit', (e) => {
+        const form = e.target;
+        if (!conectado()) return;
+
+        if (form.classList.contains('js-comentar-form')) {
+            e.preventDefault();
+            const boton = form.querySelector('button[type="submit"]');
+            if (boton) boton.disabled = true;
+            enviar(form).then(({ ok, data }) => {
+                if (!ok) {
+                    alert(data.mensaje || 'No se pudo publicar el comentario.');
+                    return;
+                }
+                form.reset();
+                const respuesta = form.closest('[data-parent-id]');
+                if (respuesta) respuesta.style.display = 'none';
+            }).catch(() => form.submit()).finally(() => {
+                if (boton) boton.disabled = false;
+            });
+        } else if (form.classList.contains('js-like-form')) {
+            e.preventDefault();
+            enviar(form).then(({ ok, data }) => {
+                if (!ok) return;
+                const icono = form.querySelector('i');
+                icono.classList.toggle('fas', data.liked);
+                icono.classList.toggle('text-primary', data.liked);
+                icono.classList.toggle('far', !data.liked);
+                icono.classList.toggle('text-muted', !data.liked);
+                const total = form.querySelector('[data-likes]');
+                if (total) total.textContent = data.total_likes;
+            });
+        }
+    });
+});
+
+// ===================================================================
+// "Cargar mensajes anteriores": la página trae solo los últimos mensajes
+// y los anteriores se piden por cursor y se insertan arriba.
+// ===================================================================
+
+document.addEventListener('DOMContentLoaded', () => {
+    const boton = document.getElementById('cargar-anteriores');
+    const stream = document.getElementById('conversacion');
+    if (!boton || !stream) return;
+
+    boton.addEventListener('click', () => {
+        boton.disabled = true;
+        const url = `${boton.dataset.url}?cursor=${encodeURIComponent(boton.dataset.cursor)}`;
+        fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then(r => r.json())
+            .then(data => {
+                // Mantener a la vista lo que el usuario estaba leyendo
+                const alto = document.documentElement.scrollHeight;
+                stream.insertAdjacentHTML('afterbegin', data.html || '');
+                window.scrollBy(0, document.documentElement.scrollHeight - alto);
+
+                if (data.anteriores) {
+                    boton.dataset.cursor = data.anteriores;
+                    boton.disabled = false;
+                } else {
+                    boton.parentElement.remove();
+                }
+            })
+            .catch(() => { boton.disabled = false; });
+    });
+});
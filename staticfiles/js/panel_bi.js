@@ -116,4 +116,29 @@ function dibujarUsoApp(data) {
         },
         options: { responsive: true }
     });
-}
\ No newline at end of file
+}
+
+// Mientras el ETL corre en segundo plano, consulta su estado y recarga al terminar
+document.addEventListener('DOMContentLoaded', () => {
+    const aviso = document.getElementById('etl-en-curso');
+    if (!aviso) return;
+    const etapa = document.getElementById('etl-etapa');
+    const completadas = document.getElementById('etl-completadas');
+
+    const timer = setInterval(async () => {
+        try {
+            const resp = await fetch(aviso.dataset.urlEstado);
+            if (!resp.ok) return;
+            const data = await resp.json();
+            if (!data.activa) {
+                clearInterval(timer);
+                window.location.reload();
+                return;
+            }
+            if (data.etapa) etapa.textContent = data.etapa;
+            completadas.textContent = data.completadas;
+        } catch (err) {
+            clearInterval(timer);
+        }
+    }, 3000);
+});
@@ -7,8 +7,12 @@ from rest_framework.authentication import TokenAuthentication, SessionAuthentica
 from django.shortcuts import get_object_or_404
 from django.db.models import Count # <-- Importación necesaria para optimización
 from .models import Taller, Inscripcion
+from django.utils.decorators import method_decorator
+from core.condicional import etag_lista
 from .serializers import TallerSerializer
 
+# 'esta_inscrito' depende del usuario
+@method_decorator(etag_lista("talleres", por_usuario=True), name="list")
 class TallerViewSet(viewsets.ReadOnlyModelViewSet):
     # Eliminamos el atributo 'queryset' de clase
     serializer_class = TallerSerializer
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 05:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talleres', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taller',
+            name='actualizado_el',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
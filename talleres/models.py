@@ -32,6 +32,8 @@ class Taller(models.Model):
         related_name="talleres_creados"
     )
     creado_el = models.DateTimeField(auto_now_add=True)
+    # Sincronización incremental de la app (core.sincronizacion)
+    actualizado_el = models.DateTimeField(auto_now=True, db_index=True)
 
     # --- NUEVOS CAMPOS ---
     estado = models.CharField(
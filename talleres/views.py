@@ -30,7 +30,7 @@ def lista_talleres(request):
     # Los marca como FINALIZADO
     for taller in talleres_para_finalizar:
         taller.estado = Taller.Estado.FINALIZADO
-        taller.save(update_fields=['estado'])
+        taller.save(update_fields=['estado', 'actualizado_el'])
 
     # Mostramos solo los que siguen programados
     # Usamos .annotate() para cargar 'inscritos_count' en cada taller
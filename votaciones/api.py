@@ -18,6 +18,17 @@ from .models import Votacion, Opcion, Voto
 from django.db import transaction
 from django.core.mail import send_mail 
 from django.conf import settings
+from django.db.models import Min
+from core.condicional import etag_lista
+
+
+def _abiertas_ahora(request):
+    # Una votación que vence sale de la lista sin que nadie escriba nada
+    return tuple(
+        Votacion.objects.filter(activa=True, fecha_cierre__gt=timezone.now())
+        .aggregate(n=Count("id"), proxima=Min("fecha_cierre")).values()
+    )
+
 def _dto_votacion(v, user):
     # ¿ya votó este usuario?
     voto = Voto.objects.filter(votante=user, opcion__votacion=v).select_related('opcion').first()
@@ -35,6 +46,7 @@ def _dto_votacion(v, user):
 @api_view(["GET"])
 @authentication_classes([TokenAuthentication])
 @permission_classes([IsAuthenticated])
+@etag_lista("votaciones", por_usuario=True, validador=_abiertas_ahora)
 def abiertas(request):
     qs = (Votacion.objects
           .filter(activa=True, fecha_cierre__gt=timezone.now())
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votaciones', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voto',
+            name='fecha_voto',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+    ]
@@ -13,6 +13,8 @@ class Votacion(models.Model):
         verbose_name="Creada por"
     )
     activa = models.BooleanField(default=True, db_index=True)
+    # Sincronización incremental de la app (core.sincronizacion)
+    actualizado_el = models.DateTimeField(auto_now=True, db_index=True)
 
     def esta_abierta(self) -> bool:
         """True si está activa y aún no llega la fecha de cierre."""
@@ -40,6 +42,8 @@ class Opcion(models.Model):
 class Voto(models.Model):
     opcion = models.ForeignKey(Opcion, related_name='votos', on_delete=models.CASCADE)
     votante = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # null: votos emitidos antes de que existiera el campo
+    fecha_voto = models.DateTimeField(auto_now_add=True, null=True)
 
     class Meta:
         unique_together = [['opcion', 'votante']]
\ No newline at end of file
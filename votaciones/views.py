@@ -23,7 +23,7 @@ def lista_votaciones(request):
     Votacion.objects.filter(
         activa=True,
         fecha_cierre__lte=timezone.now()
-    ).update(activa=False)
+    ).update(activa=False, actualizado_el=timezone.now())
 
     # 2) Listar separadas para la plantilla
     votaciones_abiertas = (